@@ -0,0 +1,58 @@
+"""Name the meetingroom name unique constraint
+
+Revision ID: b7d4e1a9c3f5
+Revises: f3a7c1d9b6e2
+Create Date: 2026-10-18 21:14:36.820517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d4e1a9c3f5'
+down_revision = 'f3a7c1d9b6e2'
+branch_labels = None
+depends_on = None
+
+NAME_UNIQUE_NAME = 'uq_meetingroom_name'
+# Имя, которое PostgreSQL дал безымянному UNIQUE (name).
+POSTGRES_DEFAULT_NAME = 'meetingroom_name_key'
+
+
+def meetingroom_table(unique_name):
+    return sa.Table(
+        'meetingroom', sa.MetaData(),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name', name=unique_name),
+    )
+
+
+def rename_unique(old_name, new_name, sqlite_name):
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            f'ALTER TABLE meetingroom RENAME CONSTRAINT {old_name} '
+            f'TO {new_name}'
+        )
+    else:
+        # В SQLite ограничение не переименовать - пересоздаём таблицу.
+        # Безымянное ограничение не отражается по имени, поэтому схема
+        # берётся не из базы, а задаётся здесь.
+        with op.batch_alter_table(
+            'meetingroom',
+            recreate='always',
+            copy_from=meetingroom_table(sqlite_name),
+        ):
+            pass
+
+
+def upgrade():
+    rename_unique(POSTGRES_DEFAULT_NAME, NAME_UNIQUE_NAME, NAME_UNIQUE_NAME)
+
+
+def downgrade():
+    # В SQLite ограничение было безымянным.
+    rename_unique(NAME_UNIQUE_NAME, POSTGRES_DEFAULT_NAME, None)
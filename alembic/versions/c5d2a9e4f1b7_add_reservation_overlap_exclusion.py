@@ -0,0 +1,73 @@
+"""Add reservation overlap exclusion constraint
+
+Revision ID: c5d2a9e4f1b7
+Revises: 7f0ef7fa9956
+Create Date: 2026-10-18 14:03:26.118452
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d2a9e4f1b7'
+down_revision = '7f0ef7fa9956'
+branch_labels = None
+depends_on = None
+
+
+# Сколько пересекающихся пар показывать в сообщении об ошибке.
+MAX_REPORTED = 20
+
+# Пары уже пересекающихся броней одной переговорки - с ними ограничение
+# не создастся. Границы включительные, как в ограничении ('[]').
+OVERLAPS = sa.text(
+    'SELECT a.id, b.id, a.meetingroom_id FROM reservation a '
+    'JOIN reservation b ON a.meetingroom_id = b.meetingroom_id '
+    'AND a.id < b.id '
+    'AND a.from_reserve <= b.to_reserve AND b.from_reserve <= a.to_reserve '
+    'ORDER BY a.id, b.id LIMIT :limit'
+)
+
+
+def check_no_overlaps(bind) -> None:
+    """
+    Останавливает миграцию со списком пересекающихся броней.
+    Их нужно удалить или перенести вручную (например, DELETE FROM
+    reservation WHERE id = ... для более поздней брони пары)
+    и запустить миграцию снова.
+    """
+    pairs = bind.execute(OVERLAPS, {'limit': MAX_REPORTED + 1}).all()
+    if not pairs:
+        return
+    listed = '\n'.join(
+        f'  переговорка {room_id}: брони {first} и {second}'
+        for first, second, room_id in pairs[:MAX_REPORTED]
+    )
+    more = '\n  ...' if len(pairs) > MAX_REPORTED else ''
+    raise RuntimeError(
+        'Нельзя добавить reservation_no_overlap: в reservation есть '
+        'пересекающиеся брони одной переговорки. Удалите или перенесите '
+        f'одну бронь из каждой пары и повторите миграцию.\n{listed}{more}'
+    )
+
+
+# Ограничение есть только в PostgreSQL. В SQLite пересечения
+# исключает BEGIN IMMEDIATE вокруг условной вставки (CRUDReservation).
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    check_no_overlaps(bind)
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        'ALTER TABLE reservation ADD CONSTRAINT reservation_no_overlap '
+        'EXCLUDE USING gist (meetingroom_id WITH =, '
+        "tsrange(from_reserve, to_reserve, '[]') WITH &&)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_constraint('reservation_no_overlap', 'reservation')
@@ -0,0 +1,78 @@
+"""Add room_daily_stats table
+
+Revision ID: e8b4d2c7a913
+Revises: c5d2a9e4f1b7
+Create Date: 2026-10-18 16:21:09.447315
+
+"""
+from datetime import datetime, time, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b4d2c7a913'
+down_revision = 'c5d2a9e4f1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    room_daily_stats = op.create_table('room_daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('meetingroom_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('booked_minutes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['meetingroom_id'], ['meetingroom.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint(
+        'meetingroom_id', 'day', name='uq_room_daily_stats_room_day'
+    )
+    )
+    op.create_index(
+        'ix_room_daily_stats_day', 'room_daily_stats', ['day'], unique=False
+    )
+    # Заполняем счётчики по уже существующим броням - так же, как
+    # CRUDRoomDailyStats.rebuild (python -m app.cli rebuild-room-stats).
+    reservation = sa.table(
+        'reservation',
+        sa.column('meetingroom_id', sa.Integer),
+        sa.column('from_reserve', sa.DateTime),
+        sa.column('to_reserve', sa.DateTime),
+    )
+    stats = {}
+    rows = op.get_bind().execute(sa.select(
+        reservation.c.meetingroom_id,
+        reservation.c.from_reserve,
+        reservation.c.to_reserve,
+    ))
+    for meetingroom_id, start, to_reserve in rows:
+        first = True
+        while True:
+            next_day = datetime.combine(
+                start.date() + timedelta(days=1), time()
+            )
+            end = min(to_reserve, next_day)
+            counters = stats.setdefault((meetingroom_id, start.date()), [0, 0])
+            counters[0] += first
+            counters[1] += round((end - start).total_seconds() / 60)
+            if to_reserve <= next_day:
+                break
+            start, first = next_day, False
+    if stats:
+        op.bulk_insert(room_daily_stats, [
+            {
+                'meetingroom_id': meetingroom_id,
+                'day': day,
+                'count': count,
+                'booked_minutes': minutes,
+            }
+            for (meetingroom_id, day), (count, minutes) in stats.items()
+        ])
+
+
+def downgrade():
+    op.drop_index('ix_room_daily_stats_day', table_name='room_daily_stats')
+    op.drop_table('room_daily_stats')
@@ -0,0 +1,55 @@
+"""Add reservation_archive table
+
+Revision ID: f3a7c1d9b6e2
+Revises: e8b4d2c7a913
+Create Date: 2026-10-18 17:05:52.390214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a7c1d9b6e2'
+down_revision = 'e8b4d2c7a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reservation_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('from_reserve', sa.DateTime(), nullable=True),
+    sa.Column('to_reserve', sa.DateTime(), nullable=True),
+    sa.Column('meetingroom_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('series_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['meetingroom_id'], ['meetingroom.id'], ),
+    sa.ForeignKeyConstraint(['series_id'], ['reservationseries.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reservation_archive_room', 'reservation_archive', ['meetingroom_id'], unique=False)
+    op.create_index('ix_reservation_archive_user_from', 'reservation_archive', ['user_id', 'from_reserve'], unique=False)
+    # В SQLite id броней без AUTOINCREMENT переиспользуются после
+    # удаления последних строк - а архиватор может перенести все брони.
+    # Пересоздаём таблицу с AUTOINCREMENT (в PostgreSQL id выдаёт
+    # последовательность, повторов и так нет).
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table(
+            'reservation',
+            recreate='always',
+            table_kwargs={'sqlite_autoincrement': True},
+        ):
+            pass
+
+
+def downgrade():
+    # Возвращаем таблицу броней без AUTOINCREMENT: схема отражается
+    # из базы без sqlite_autoincrement, id строк копируются как есть.
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('reservation', recreate='always'):
+            pass
+    op.drop_index('ix_reservation_archive_user_from', table_name='reservation_archive')
+    op.drop_index('ix_reservation_archive_room', table_name='reservation_archive')
+    op.drop_table('reservation_archive')
@@ -0,0 +1,20 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+# Отдаёт заранее сериализованный JSON с заголовком ETag
+# или пустой ответ 304, если у клиента уже есть эта версия.
+def etag_response(
+        request: Request,
+        body: bytes,
+        etag: str,
+        headers: Optional[dict] = None,
+) -> Response:
+    headers = dict(headers or {}, ETag=etag)
+    if_none_match = request.headers.get('if-none-match', '')
+    if etag in (tag.strip() for tag in if_none_match.split(',')):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=body, media_type='application/json', headers=headers
+    )
@@ -2,3 +2,4 @@ from .reservation import router as reservation_router # noqa
 from .meeting_room import router as meeting_room_router # noqa
 from .user import router as user_router # noqa
 from .google_api import router as google_api_router # noqa
+from .metrics import router as metrics_router # noqa
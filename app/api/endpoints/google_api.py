@@ -7,18 +7,11 @@
 
 # Понадобится для того, чтобы задать временные интервалы
 from datetime import datetime
-# Класс «обёртки»
-from aiogoogle import Aiogoogle
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException
 
-from app.core.db import get_async_session
-from app.core.google_client import get_service
 from app.core.user import current_superuser
-from app.crud.reservation import reservation_crud
-from app.services.google_api import (
-    spreadsheets_create, set_user_permissions, spreadsheets_update_value
-)
+from app.schemas.report_job import ReportJobDB
+from app.services.report_jobs import report_jobs
 
 # Создаём экземпляр класса APIRouter
 router = APIRouter()
@@ -26,8 +19,9 @@ router = APIRouter()
 
 @router.post(
     '/',
-    # Тип возвращаемого эндпоинтом ответа
-    response_model=list[dict[str, int]],
+    # Отчёт строится в фоне, в ответе - задача
+    response_model=ReportJobDB,
+    status_code=202,
     # Определяем зависимости
     dependencies=[Depends(current_superuser)],
 )
@@ -36,20 +30,19 @@ async def get_report(
         from_reserve: datetime,
         # Конец периода
         to_reserve: datetime,
-        # Сессия
-        session: AsyncSession = Depends(get_async_session),
-        # «Обёртка»
-        wrapper_services: Aiogoogle = Depends(get_service)
-
 ):
-    """Только для суперюзеров."""
-    reservations = await reservation_crud.get_count_res_at_the_same_time(
-        from_reserve, to_reserve, session
-    )
+    """Только для суперюзеров. Ставит формирование отчёта в очередь."""
+    return report_jobs.submit(from_reserve, to_reserve)
+
 
-    # Вызов функций
-    spreadsheetid = await spreadsheets_create(wrapper_services)
-    await set_user_permissions(spreadsheetid, wrapper_services)
-    await spreadsheets_update_value(
-        spreadsheetid, reservations, wrapper_services)
-    return reservations
+@router.get(
+    '/jobs/{job_id}',
+    response_model=ReportJobDB,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_report_job(job_id: str):
+    """Только для суперюзеров. Состояние задачи и id таблицы."""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Задача не найдена!')
+    return job
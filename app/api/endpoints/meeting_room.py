@@ -1,16 +1,33 @@
 # app/api/meeting_room.py
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, Request, WebSocket, status
+)
+from fastapi.responses import StreamingResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_async_session
+from app.api.caching import etag_response
+from app.api.pagination import NEXT_CURSOR_HEADER, PageParams
+from app.core.db import AsyncSessionLocal, get_async_session
+from app.core.events import event_hub
+from app.core.query_budget import query_budget
 # Вместо импортов 6 функций импортируйте объект meeting_room_crud.
 from app.crud.meeting_room import meeting_room_crud
-from app.crud.reservation import reservation_crud
-from app.api.validators import check_meeting_room_exists, check_name_duplicate
+from app.api.validators import (
+    check_meeting_room_exists, check_name_duplicate
+)
 from app.schemas.meeting_room import (
-    MeetingRoomCreate, MeetingRoomDB, MeetingRoomUpdate
+    MeetingRoomCreate, MeetingRoomDB, MeetingRoomUpdate, RoomAnalytics,
+    RoomAvailability
 )
+from app.services import analytics, room_events, room_timeline
+from app.services.availability import (
+    MAX_WINDOW, find_available_slots, parse_minutes
+)
+from app.services.meeting_room_cache import meeting_room_cache
 from app.schemas.reservation import ReservationDB
 # Добавьте импорт зависимости, определяющей, 
 # что текущий пользователь - суперюзер.
@@ -27,6 +44,7 @@ router = APIRouter()
     dependencies=[Depends(current_superuser)]
 
 )
+@query_budget(3)
 async def create_new_meeting_room(
         meeting_room: MeetingRoomCreate,
         session: AsyncSession = Depends(get_async_session),
@@ -37,6 +55,7 @@ async def create_new_meeting_room(
     await check_name_duplicate(meeting_room.name, session)
     # Замените вызов функции на вызов метода.
     new_room = await meeting_room_crud.create(meeting_room, session)
+    meeting_room_cache.invalidate()
     return new_room
 
 
@@ -45,12 +64,77 @@ async def create_new_meeting_room(
     response_model=list[MeetingRoomDB],
     response_model_exclude_none=True,
 )
+@query_budget(1)
 async def get_all_meeting_rooms(
+        request: Request,
+        page: PageParams = Depends(),
         session: AsyncSession = Depends(get_async_session),
 ):
-    # Замените вызов функции на вызов метода.
-    all_rooms = await meeting_room_crud.get_multi(session)
-    return all_rooms
+    # Список отдаётся из кэша каталога уже сериализованным,
+    # с поддержкой ETag / If-None-Match.
+    try:
+        cached_page = await meeting_room_cache.get_page(
+            page.limit, page.cursor, session
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    headers = {}
+    if cached_page.next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = cached_page.next_cursor
+    return etag_response(
+        request, cached_page.body, cached_page.etag, headers
+    )
+
+
+@router.get(
+    '/availability',
+    response_model=list[RoomAvailability],
+)
+@query_budget(3)
+async def get_availability(
+        from_time: datetime = Query(..., alias='from'),
+        to_time: datetime = Query(..., alias='to'),
+        duration: str = Query(..., example='1h'),
+        granularity: str = Query('15m'),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Переговорки и моменты, с которых свободен слот нужной длины."""
+    try:
+        duration = parse_minutes(duration)
+        granularity = parse_minutes(granularity)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    if not from_time < to_time <= from_time + MAX_WINDOW:
+        raise HTTPException(
+            status_code=422,
+            detail=f'Окно поиска должно быть не длиннее {MAX_WINDOW.days} дней'
+                   ' и заканчиваться позже начала'
+        )
+    return await find_available_slots(
+        from_time, to_time, duration, granularity, session
+    )
+
+
+@router.get(
+    '/analytics',
+    response_model=RoomAnalytics,
+    dependencies=[Depends(current_superuser)],
+)
+@query_budget(3)
+async def get_analytics(
+        from_time: datetime = Query(..., alias='from'),
+        to_time: datetime = Query(..., alias='to'),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров. Загрузка переговорок по часам недели."""
+    if not from_time < to_time <= from_time + analytics.MAX_WINDOW:
+        raise HTTPException(
+            status_code=422,
+            detail='Период должен быть не длиннее '
+                   f'{analytics.MAX_WINDOW.days} дней'
+                   ' и заканчиваться позже начала'
+        )
+    return await analytics.get_room_analytics(from_time, to_time, session)
 
 
 @router.patch(
@@ -60,6 +144,7 @@ async def get_all_meeting_rooms(
     # Новая зависимость.
     dependencies=[Depends(current_superuser)],
 )
+@query_budget(3)
 async def partially_update_meeting_room(
         meeting_room_id: int,
         obj_in: MeetingRoomUpdate,
@@ -68,17 +153,22 @@ async def partially_update_meeting_room(
     # Добавляем докстринг для большей информативности.
     """Только для суперюзеров."""
 
-    meeting_room = await check_meeting_room_exists(
-        meeting_room_id, session
-    )
+    await check_meeting_room_exists(meeting_room_id, session)
 
     if obj_in.name is not None:
         await check_name_duplicate(obj_in.name, session)
 
     # Замените вызов функции на вызов метода.
-    meeting_room = await meeting_room_crud.update(
-        meeting_room, obj_in, session
+    meeting_room = await meeting_room_crud.update_by_id(
+        meeting_room_id, obj_in, session
     )
+    meeting_room_cache.invalidate()
+    # Переговорку могли удалить после проверки.
+    if meeting_room is None:
+        raise HTTPException(
+            status_code=404,
+            detail='Переговорка не найдена!'
+        )
     return meeting_room
 
 
@@ -89,6 +179,7 @@ async def partially_update_meeting_room(
     # Новая зависимость.
     dependencies=[Depends(current_superuser)],
 )
+@query_budget(5)
 async def remove_meeting_room(
         meeting_room_id: int,
         session: AsyncSession = Depends(get_async_session),
@@ -96,9 +187,18 @@ async def remove_meeting_room(
     # Добавляем докстринг для большей информативности.
     """Только для суперюзеров."""
 
-    meeting_room = await check_meeting_room_exists(meeting_room_id, session)
+    await check_meeting_room_exists(meeting_room_id, session)
     # Замените вызов функции на вызов метода.
-    meeting_room = await meeting_room_crud.remove(meeting_room, session)
+    meeting_room = await meeting_room_crud.remove_by_id(
+        meeting_room_id, session
+    )
+    meeting_room_cache.invalidate()
+    event_hub.close_room(meeting_room_id)
+    if meeting_room is None:
+        raise HTTPException(
+            status_code=404,
+            detail='Переговорка не найдена!'
+        )
     return meeting_room
 
 
@@ -107,11 +207,60 @@ async def remove_meeting_room(
     response_model=list[ReservationDB],
     response_model_exclude={'user_id'},
 )
+@query_budget(2)
 async def get_reservations_for_room(
     meeting_room_id: int,
+    request: Request,
+    from_time: Optional[datetime] = Query(None, alias='from'),
+    to_time: Optional[datetime] = Query(None, alias='to'),
     session: AsyncSession = Depends(get_async_session)
 ):
+    """Брони переговорки в окне [from, to]. По умолчанию from - текущий
+    момент, а без to отдаются все брони после from, как раньше.
+    Поддерживает ETag / If-None-Match."""
     await check_meeting_room_exists(meeting_room_id, session)
-    reservations = await reservation_crud.get_future_reservations_for_room(
-        room_id=meeting_room_id, session=session)
-    return reservations
+    if from_time is None:
+        from_time = datetime.now()
+    if to_time is not None and not (
+            from_time < to_time <= from_time + room_timeline.MAX_WINDOW
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail='Окно должно быть не длиннее '
+                   f'{room_timeline.MAX_WINDOW.days} дней'
+                   ' и заканчиваться позже начала'
+        )
+    timeline = await room_timeline.get_room_timeline(
+        meeting_room_id, from_time, to_time, session
+    )
+    return etag_response(request, timeline.body, timeline.etag)
+
+
+@router.get(
+    '/{meeting_room_id}/events',
+    response_class=StreamingResponse,
+)
+@query_budget(1)
+async def stream_room_events(meeting_room_id: int):
+    """События броней переговорки (Server-Sent Events):
+    created, updated, deleted."""
+    # Сессия нужна только для проверки и закрывается до начала потока:
+    # тысячи подписчиков не должны держать соединения с базой.
+    async with AsyncSessionLocal() as session:
+        await check_meeting_room_exists(meeting_room_id, session)
+    return StreamingResponse(
+        room_events.sse_stream(meeting_room_id),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@router.websocket('/{meeting_room_id}/events/ws')
+async def room_events_websocket(websocket: WebSocket, meeting_room_id: int):
+    async with AsyncSessionLocal() as session:
+        meeting_room = await meeting_room_cache.get(meeting_room_id, session)
+    if meeting_room is None:
+        # Закрытие до accept - клиент получит отказ в рукопожатии.
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await room_events.websocket_stream(websocket, meeting_room_id)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+
+router = APIRouter()
+
+
+@router.get(
+    '/metrics',
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+def get_metrics():
+    """Метрики процесса в текстовом формате Prometheus."""
+    return PlainTextResponse(
+        registry.render(), media_type='text/plain; version=0.0.4'
+    )
@@ -1,31 +1,54 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.reservation import (
+    BulkMode,
+    ReservationBulkCreate,
+    ReservationBulkResult,
     ReservationCreate,
     ReservationDB,
+    ReservationSeriesCreate,
+    ReservationSeriesDB,
     ReservationUpdate
 )
 from app.models import Reservation, User
-from app.core.db import get_async_session
+from app.api.pagination import NEXT_CURSOR_HEADER, PageParams
+from app.core.db import begin_immediate, get_async_session
+from app.core.events import event_hub
+from app.core.query_budget import query_budget
+from app.core.room_locks import room_locks
+from app.core.serialization import rows_response, schema_fields
 from app.core.user import current_user
 from app.api.validators import (
     check_meeting_room_exists,
     check_reservation_intersections,
-    check_reservation_before_edit
+    check_reservation_before_edit,
+    check_series_occurrences,
+    collect_bulk_reservation_errors
 )
 from app.crud.reservation import reservation_crud
+from app.services.export import FORMATTERS, MEDIA_TYPES, ExportFormat
 from app.core.user import current_superuser
 
 
 router = APIRouter()
 
+# Списки броней собираются в JSON из строк с этими столбцами
+# (app/core/serialization.py), поля и порядок - как у ReservationDB.
+RESERVATION_FIELDS = schema_fields(ReservationDB)
+MY_RESERVATION_FIELDS = schema_fields(ReservationDB, exclude={'user_id'})
+
 
 @router.post(
         '/',
         response_model=ReservationDB
 )
+@query_budget(5)
 async def create_reservation(
     reservation: ReservationCreate,
     session: AsyncSession = Depends(get_async_session),
@@ -33,14 +56,85 @@ async def create_reservation(
     user: User = Depends(current_user),
 ):
     await check_meeting_room_exists(reservation.meetingroom_id, session)
-    await check_reservation_intersections(**reservation.dict(), session=session)
-    # Передаём объект пользователя в метод создания объекта бронирования.
-    new_reservation = await reservation_crud.create(
-        reservation,
+    # Проверка и запись для одной переговорки идут по очереди.
+    async with room_locks.lock(reservation.meetingroom_id, session):
+        await check_reservation_intersections(
+            **reservation.dict(), session=session
+        )
+        # Передаём объект пользователя в метод создания объекта бронирования.
+        new_reservation = await reservation_crud.create(
+            reservation,
+            session,
+            user
+        )
+    event_hub.publish_reservation('created', new_reservation)
+    return new_reservation
+
+
+@router.post(
+    '/bulk',
+    response_model=ReservationBulkResult
+)
+@query_budget(6)
+async def create_reservations_bulk(
+    bulk: ReservationBulkCreate,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Создаёт набор бронирований одной транзакцией."""
+    # Проверка и вставка идут в одной транзакции для записи.
+    await begin_immediate(session)
+    errors = await collect_bulk_reservation_errors(bulk.items, session)
+    errors = [
+        {'index': position, 'detail': detail}
+        for position, detail in sorted(errors.items())
+    ]
+    # В режиме «всё или ничего» любая ошибка отменяет всё бронирование.
+    if errors and bulk.mode == BulkMode.all_or_nothing:
+        raise HTTPException(
+            status_code=422,
+            detail=errors
+        )
+    failed = {error['index'] for error in errors}
+    created = await reservation_crud.create_many(
+        [item for position, item in enumerate(bulk.items)
+         if position not in failed],
         session,
         user
     )
-    return new_reservation
+    for reservation in created:
+        event_hub.publish_reservation('created', reservation)
+    return {'created': created, 'errors': errors}
+
+
+@router.post(
+    '/series',
+    response_model=ReservationSeriesDB
+)
+@query_budget(7)
+async def create_reservation_series(
+    series_in: ReservationSeriesCreate,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Создаёт повторяющееся бронирование со всеми вхождениями."""
+    await check_meeting_room_exists(series_in.meetingroom_id, session)
+    # Проверка и вставка идут в одной транзакции для записи.
+    await begin_immediate(session)
+    starts, ends = await check_series_occurrences(series_in, session)
+    series, reservations = await reservation_crud.create_series(
+        series_in, starts, ends, session, user
+    )
+    for reservation in reservations:
+        event_hub.publish_reservation('created', reservation)
+    return ReservationSeriesDB(
+        **{
+            field: getattr(series, field)
+            for field in ReservationSeriesDB.__fields__
+            if field != 'reservations'
+        },
+        reservations=reservations,
+    )
 
 
 @router.get(
@@ -49,28 +143,99 @@ async def create_reservation(
     # только суперузер ограничение
     dependencies=[Depends(current_superuser)]
 )
+@query_budget(2)
 async def get_all_reservations(
+    page: PageParams = Depends(),
+    meetingroom_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    from_reserve: Optional[datetime] = None,
+    to_reserve: Optional[datetime] = None,
     session: AsyncSession = Depends(get_async_session)
-) -> list[Reservation]:
+) -> Response:
     # Добавляем докстринг для большей информативности.
     """Только для суперюзеров."""
 
-    all_reservations = await reservation_crud.get_multi(session)
-    return all_reservations
+    try:
+        all_reservations, next_cursor = (
+            await reservation_crud.get_filtered_page(
+                session,
+                limit=page.limit,
+                cursor=page.cursor,
+                meetingroom_id=meetingroom_id,
+                user_id=user_id,
+                from_reserve=from_reserve,
+                to_reserve=to_reserve,
+                keys=RESERVATION_FIELDS,
+            )
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    headers = {}
+    if next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows_response(all_reservations, RESERVATION_FIELDS, headers)
+
+
+@router.get(
+    '/export',
+    # только суперузер ограничение
+    dependencies=[Depends(current_superuser)],
+    response_class=StreamingResponse,
+)
+@query_budget(2)
+async def export_reservations(
+    format: ExportFormat = ExportFormat.ndjson,
+    from_reserve: Optional[datetime] = Query(None, alias='from'),
+    to_reserve: Optional[datetime] = Query(None, alias='to'),
+    include_archived: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Потоковая выгрузка бронирований в NDJSON или CSV."""
+    rows = reservation_crud.stream_rows(
+        session, from_reserve, to_reserve, include_archived=include_archived
+    )
+    return StreamingResponse(
+        FORMATTERS[format](rows),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition':
+                f'attachment; filename="reservations.{format.value}"'
+        },
+    )
+
+
+@router.get(
+    '/lock_stats',
+    # только суперузер ограничение
+    dependencies=[Depends(current_superuser)]
+)
+def get_room_lock_stats() -> dict[str, float]:
+    """Ожидание блокировок переговорок в этом процессе."""
+    return room_locks.stats()
 
 
 @router.delete(
     '/{reservation_id}',
     response_model=ReservationDB,
 )
+@query_budget(3)
 async def delete_reservation(
     reservation_id: int,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_user)
 ):
     """Для суперюзеров или создателей объекта бронирования."""
-    reservation = await check_reservation_before_edit(reservation_id, session, user)
-    reservation = await reservation_crud.remove(reservation, session)
+    # Права проверяются прямо в условии DELETE: чужую бронь
+    # обычный пользователь удалить не сможет.
+    owner_only = () if user.is_superuser else (Reservation.user_id == user.id,)
+    reservation = await reservation_crud.remove_by_id(
+        reservation_id, session, *owner_only
+    )
+    if reservation is None:
+        # Ничего не удалено - выясняем, нет брони или она чужая.
+        await check_reservation_before_edit(reservation_id, session, user)
+        raise HTTPException(status_code=404, detail='Бронь не найдена!')
+    event_hub.publish_reservation('deleted', reservation)
     return reservation
 
 
@@ -78,6 +243,7 @@ async def delete_reservation(
     '/{reservation_id}',
     response_model=ReservationDB
 )
+@query_budget(5)
 async def update_reservation(
     reservation_id: int,
     obj_in: ReservationUpdate,
@@ -87,22 +253,28 @@ async def update_reservation(
     """Для суперюзеров или создателей объекта бронирования."""
     # Проверяем, что такой объект бронирования вообще существует.
     reservation = await check_reservation_before_edit(reservation_id, session, user)
-    # Проверяем, что нет пересечений с другими бронированиями.
-    await check_reservation_intersections(
-        # Новое время бронирования, распакованное на ключевые аргументы.
-        **obj_in.dict(),
-        # id обновляемого объекта бронирования,
-        reservation_id=reservation_id,
-        # id переговорки.
-        meetingroom_id=reservation.meetingroom_id,
-        session=session
-    )
-    reservation = await reservation_crud.update(
-        db_obj=reservation,
-        # На обновление передаем объект класса ReservationUpdate, как и требуется.
-        obj_in=obj_in,
-        session=session,
-    )
+    # Проверка и запись для одной переговорки идут по очереди.
+    async with room_locks.lock(reservation.meetingroom_id, session):
+        # Проверяем, что нет пересечений с другими бронированиями.
+        await check_reservation_intersections(
+            # Новое время бронирования, распакованное на ключевые аргументы.
+            **obj_in.dict(),
+            # id обновляемого объекта бронирования,
+            reservation_id=reservation_id,
+            # id переговорки.
+            meetingroom_id=reservation.meetingroom_id,
+            session=session
+        )
+        reservation = await reservation_crud.update(
+            db_obj=reservation,
+            # На обновление передаем объект класса ReservationUpdate, как и требуется.
+            obj_in=obj_in,
+            session=session,
+        )
+    if reservation is None:
+        # Бронь удалили, пока запрос ждал своей очереди.
+        raise HTTPException(status_code=404, detail='Бронь не найдена!')
+    event_hub.publish_reservation('updated', reservation)
     return reservation
 
 
@@ -113,15 +285,22 @@ async def update_reservation(
     # Добавляем множество с полями, которые надо исключить из ответа.
     response_model_exclude={'user_id'},
 )
+@query_budget(2)
 async def get_my_reservations(
+    include_archived: bool = False,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_user),
 ):
     # Сразу можно добавить докстринг для большей информативности.
-    """Получает список всех бронирований для текущего пользователя."""
+    """Получает список всех бронирований для текущего пользователя.
+
+    С include_archived=true - вместе с перенесёнными в архив.
+    """
     # Вызываем созданный метод.
     all_me_reservations = await reservation_crud.get_by_user(
         user=user,
-        session=session
+        session=session,
+        include_archived=include_archived,
+        keys=MY_RESERVATION_FIELDS,
     )
-    return all_me_reservations
+    return rows_response(all_me_reservations, MY_RESERVATION_FIELDS)
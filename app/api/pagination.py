@@ -0,0 +1,23 @@
+from typing import Optional
+
+from fastapi import Query
+
+# Заголовок ответа с курсором следующей страницы.
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+# Параметры постраничной выдачи списков.
+# Курсор следующей страницы возвращается в заголовке X-Next-Cursor,
+# чтобы тело ответа осталось прежним списком объектов;
+# на последней странице заголовка нет.
+class PageParams:
+
+    def __init__(
+            self,
+            limit: int = Query(100, ge=1, le=1000),
+            cursor: Optional[str] = Query(
+                None, description='Значение заголовка X-Next-Cursor'
+            ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
 from app.api.endpoints import (
-    meeting_room_router, reservation_router, user_router, google_api_router
+    meeting_room_router, metrics_router, reservation_router, user_router,
+    google_api_router
 )
 
 
@@ -24,3 +25,6 @@ main_router.include_router(user_router)
 main_router.include_router(
     google_api_router, prefix='/google', tags=['Google']
 )
+
+# Метрики для Prometheus: /metrics без префикса.
+main_router.include_router(metrics_router, tags=['Metrics'])
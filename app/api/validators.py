@@ -1,20 +1,26 @@
 from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.meeting_room import meeting_room_crud
 from app.crud.reservation import reservation_crud
+from app.core.conflict_index import RoomIntervals
 from app.core.user import current_user
 # Так как в Python-пакете app.models модели импортированы в __init__.py,
 # импортировать их можно прямо из пакета.
-from app.models import MeetingRoom, Reservation, User
+from app.models import Reservation, User
+from app.schemas.meeting_room import MeetingRoomDB
+from app.services.meeting_room_cache import meeting_room_cache
+from app.services.recurrence import (
+    expand_occurrences, find_conflicts, has_self_overlaps, to_datetime64,
+    to_datetimes
+)
 
 
 async def check_name_duplicate(
         room_name: str,
         session: AsyncSession,
 ) -> None:
-    # Замените вызов функции на вызов метода.
-    room_id = await meeting_room_crud.get_room_id_by_name(room_name, session)
+    # Имена переговорок проверяем по кэшу каталога.
+    room_id = await meeting_room_cache.get_room_id_by_name(room_name, session)
     if room_id is not None:
         raise HTTPException(
             status_code=422,
@@ -22,13 +28,12 @@ async def check_name_duplicate(
         )
 
 
-# проверяет есть такая комната или нет
+# проверяет есть такая комната или нет (по кэшу каталога)
 async def check_meeting_room_exists(
         meeting_room_id: int,
         session: AsyncSession,
-) -> MeetingRoom:
-    # Замените вызов функции на вызов метода.
-    meeting_room = await meeting_room_crud.get(meeting_room_id, session)
+) -> MeetingRoomDB:
+    meeting_room = await meeting_room_cache.get(meeting_room_id, session)
     if meeting_room is None:
         raise HTTPException(
             status_code=404,
@@ -49,6 +54,97 @@ async def check_reservation_intersections(**kwargs) -> None:
         )
 
 
+# проверяет набор бронирований для массового создания:
+# один запрос на существование переговорок, один - на пересечения,
+# плюс пересечения бронирований внутри самого набора.
+async def collect_bulk_reservation_errors(
+        items: list,
+        session: AsyncSession,
+) -> dict[int, str]:
+    """Возвращает {позиция в items: текст ошибки}."""
+    errors = {}
+    existing_ids = await meeting_room_cache.get_existing_ids(
+        {item.meetingroom_id for item in items}, session
+    )
+    for position, item in enumerate(items):
+        if item.meetingroom_id not in existing_ids:
+            errors[position] = 'Переговорка не найдена!'
+
+    intersections = await reservation_crud.get_intersections_for_many(
+        items, session
+    )
+    for position, reservations in intersections.items():
+        errors.setdefault(position, str(reservations))
+
+    # Среди пересекающихся элементов набора выигрывает стоящий раньше.
+    accepted: dict[int, RoomIntervals] = {}
+    for position, item in enumerate(items):
+        if position in errors:
+            continue
+        room = accepted.setdefault(item.meetingroom_id, RoomIntervals())
+        found = room.overlaps(item.from_reserve, item.to_reserve)
+        if found:
+            errors[position] = (
+                f'Пересекается с элементом items[{min(found)}] этого запроса'
+            )
+            continue
+        room.add(position, item.from_reserve, item.to_reserve)
+    return errors
+
+
+# разворачивает серию бронирований и проверяет, что ни одно вхождение
+# не пересекается с другими бронированиями и с соседними вхождениями
+async def check_series_occurrences(
+        series_in,
+        session: AsyncSession,
+) -> tuple[list, list]:
+    try:
+        starts, ends = expand_occurrences(
+            series_in.from_reserve, series_in.to_reserve, series_in.recurrence
+        )
+    except ValueError as error:
+        raise HTTPException(
+            status_code=422,
+            detail=str(error)
+        )
+    if has_self_overlaps(starts, ends):
+        raise HTTPException(
+            status_code=422,
+            detail='Вхождения серии пересекаются друг с другом!'
+        )
+    # Один запрос за всеми бронями переговорки в окне серии.
+    existing_starts, existing_ends = (
+        await reservation_crud.get_intervals_for_room(
+            series_in.meetingroom_id,
+            series_in.from_reserve,
+            to_datetimes(ends[-1:])[0],
+            session,
+        )
+    )
+    conflicts = find_conflicts(
+        starts, ends,
+        to_datetime64(existing_starts), to_datetime64(existing_ends),
+    )
+    if conflicts.any():
+        raise HTTPException(
+            status_code=422,
+            detail={
+                'message': 'Часть вхождений серии уже забронирована!',
+                'conflicts': [
+                    {
+                        'from_reserve': start.isoformat(),
+                        'to_reserve': end.isoformat(),
+                    }
+                    for start, end in zip(
+                        to_datetimes(starts[conflicts]),
+                        to_datetimes(ends[conflicts]),
+                    )
+                ],
+            }
+        )
+    return to_datetimes(starts), to_datetimes(ends)
+
+
 # проверяет существует ли запрошенный объект бронирования,
 async def check_reservation_before_edit(
         reservation_id: int,
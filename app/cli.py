@@ -0,0 +1,60 @@
+"""
+Служебные команды приложения.
+
+Запуск:
+    python -m app.cli rebuild-room-stats
+    python -m app.cli archive-reservations [--older-than-days N]
+"""
+import argparse
+import asyncio
+
+from app.core.db import AsyncSessionLocal, engine
+from app.crud.room_daily_stats import room_daily_stats_crud
+from app.services.archive import reservation_archiver
+
+
+async def rebuild_room_stats(arguments: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        rows = await room_daily_stats_crud.rebuild(session)
+    print(f'Счётчики room_daily_stats пересчитаны: {rows} строк')
+
+
+async def archive_reservations(arguments: argparse.Namespace) -> None:
+    moved = await reservation_archiver.archive(arguments.older_than_days)
+    print(f'В архив перенесено броней: {moved}')
+
+
+async def run(arguments: argparse.Namespace) -> None:
+    try:
+        await arguments.handler(arguments)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m app.cli',
+        description='Служебные команды приложения.',
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser(
+        'rebuild-room-stats',
+        help='пересчитать счётчики броней по дням из таблиц броней',
+    ).set_defaults(handler=rebuild_room_stats)
+    archive = commands.add_parser(
+        'archive-reservations',
+        help='перенести прошедшие брони в reservation_archive',
+    )
+    archive.add_argument(
+        '--older-than-days',
+        type=int,
+        default=None,
+        help='брони, закончившиеся раньше, чем столько дней назад '
+             '(по умолчанию ARCHIVE_AFTER_DAYS)',
+    )
+    archive.set_defaults(handler=archive_reservations)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
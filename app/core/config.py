@@ -1,3 +1,5 @@
+import os
+import tempfile
 from typing import Optional
 from pydantic import BaseSettings, EmailStr
 
@@ -6,9 +8,58 @@ class Settings(BaseSettings):
     app_title = 'Бронирование переговорок'
     description = '***Описание проекта бронирования переговорок***'
     database_url: str
+    # Пул соединений с базой (app/core/db.py).
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    # Через сколько секунд пересоздавать соединение (-1 - никогда).
+    db_pool_recycle: int = -1
+    # Проверять соединение перед выдачей из пула.
+    db_pool_pre_ping: bool = False
+    # PRAGMA для каждого соединения с SQLite.
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # Отрицательное значение - размер кэша в килобайтах.
+    sqlite_cache_size: int = -64000
+    # Сколько миллисекунд ждать снятия блокировки записи.
+    sqlite_busy_timeout: int = 5000
     secret = 'SECRET'
     first_superuser_email: Optional[EmailStr] = None
     first_superuser_password: Optional[str] = None
+    # Проверять пересечения бронирований по индексу в памяти процесса
+    # (app/core/conflict_index.py). Включайте только при одном воркере:
+    # записи других процессов индекс не увидит. Второй воркер с включённым
+    # индексом не стартует: первый держит блокировку этого файла.
+    conflict_index_enabled: bool = False
+    conflict_index_lock_file: str = os.path.join(
+        tempfile.gettempdir(), 'meeting-rooms-conflict-index.lock'
+    )
+    # Сколько секунд доверять загруженным в память сеткам занятости
+    # переговорок (app/core/occupancy.py) без перечитывания из базы.
+    occupancy_ttl: int = 60
+    # Сколько секунд кэш каталога переговорок доверяет загруженным данным
+    # (изменения из текущего процесса сбрасывают кэш сразу).
+    room_cache_ttl: int = 60
+    # Кэш расписаний переговорок (app/core/timeline_cache.py): шаг
+    # выравнивания окна и время жизни записи в секундах, число записей.
+    timeline_bucket: int = 60
+    timeline_cache_ttl: int = 10
+    timeline_cache_maxsize: int = 10000
+    # События броней (app/core/events.py): размер очереди подписчика
+    # и интервал «пульса» в секундах.
+    events_queue_size: int = 100
+    events_heartbeat: float = 15
+    # Кэш пользователей для аутентификации (app/core/user_cache.py):
+    # время жизни записи в секундах и максимальное число записей.
+    user_cache_ttl: int = 30
+    user_cache_maxsize: int = 10000
+    # Режим разработки и тестов (app/core/query_budget.py): считать
+    # SQL-запросы каждого HTTP-запроса и сообщать о повторах (N+1);
+    # при query_budget_strict превышение бюджета эндпоинта - исключение.
+    query_budget_enabled: bool = False
+    query_budget_strict: bool = False
+    query_repeat_threshold: int = 3
 
     # Переменные для Google API
     type: Optional[str] = None
@@ -22,6 +73,29 @@ class Settings(BaseSettings):
     auth_provider_x509_cert_url: Optional[str] = None
     client_x509_cert_url: Optional[str] = None
     email: Optional[str] = None
+    # Документы discovery Google API (app/core/google_client.py):
+    # адрес сервиса discovery, каталог дискового кэша и срок хранения
+    # в секундах.
+    google_discovery_url: str = (
+        'https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest'
+    )
+    google_discovery_cache_dir: str = '.cache/google_discovery'
+    google_discovery_ttl: int = 24 * 60 * 60
+    # Фоновые задачи отчётов (app/services/report_jobs.py): число
+    # одновременно выполняемых задач, попыток на задачу, пауза перед
+    # повтором в секундах (растёт вдвое) и сколько секунд хранить
+    # завершённые задачи.
+    report_workers: int = 2
+    report_job_attempts: int = 3
+    report_retry_delay: float = 1.0
+    report_job_ttl: int = 60 * 60
+    # Архив прошедших броней (app/services/archive.py): брони,
+    # закончившиеся больше archive_after_days дней назад, переносятся
+    # в reservation_archive пачками по archive_batch_size строк
+    # раз в archive_interval секунд (0 - фоновая задача выключена).
+    archive_after_days: int = 30
+    archive_batch_size: int = 1000
+    archive_interval: int = 60 * 60
 
     class Config:
         env_file = '.env'
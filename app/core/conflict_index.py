@@ -0,0 +1,177 @@
+"""
+Внутрипроцессный индекс пересечений бронирований.
+
+Для каждой переговорки хранится отсортированный по началу массив
+интервалов. Все интервалы, пересекающиеся с [from_reserve, to_reserve],
+начинаются не раньше from_reserve - max_len (max_len — самая длинная бронь
+в переговорке) и не позже to_reserve, поэтому кандидаты находятся двумя
+бинарными поисками: O(log n + k) без обращения к базе.
+
+Индекс живёт в памяти одного процесса и не видит записи других воркеров.
+Промах индекса («пересечений нет») считается ответом без запроса к базе,
+поэтому индекс допустим, только если приложение - единственный процесс,
+пишущий брони. Это проверяется при загрузке: процесс берёт эксклюзивную
+блокировку файла settings.conflict_index_lock_file, и второй воркер
+с включённым индексом не стартует. Найденные пересечения всегда
+перепроверяются SQL-запросом, а создание и изменение брони дополнительно
+защищены условной записью в базу (CRUDReservation.create/update).
+"""
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import IO, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Reservation
+
+
+class RoomIntervals:
+    """Интервалы одной переговорки, упорядоченные по (начало, id)."""
+
+    def __init__(self):
+        self.keys: list[tuple[datetime, int]] = []
+        self.ends: list[datetime] = []
+        self.max_len = timedelta(0)
+
+    def add(self, reservation_id: int, start: datetime, end: datetime):
+        position = bisect_left(self.keys, (start, reservation_id))
+        self.keys.insert(position, (start, reservation_id))
+        self.ends.insert(position, end)
+        self.max_len = max(self.max_len, end - start)
+
+    def remove(self, reservation_id: int, start: datetime):
+        position = bisect_left(self.keys, (start, reservation_id))
+        if (position < len(self.keys)
+                and self.keys[position] == (start, reservation_id)):
+            del self.keys[position]
+            del self.ends[position]
+        # max_len не уменьшаем: завышенная оценка лишь расширяет
+        # диапазон кандидатов, но не ломает поиск.
+
+    def overlaps(
+            self,
+            start: datetime,
+            end: datetime,
+            exclude_id: Optional[int] = None,
+    ) -> list[int]:
+        # Границы включительные, как и в SQL-запросе CRUDReservation.
+        low = bisect_left(self.keys, (start - self.max_len,))
+        high = bisect_right(self.keys, (end, float('inf')))
+        return [
+            reservation_id
+            for (_, reservation_id), other_end in zip(
+                self.keys[low:high], self.ends[low:high]
+            )
+            if other_end >= start and reservation_id != exclude_id
+        ]
+
+
+class ConflictIndexLocked(RuntimeError):
+    """Индекс уже загружен другим процессом приложения."""
+
+
+def _lock_exclusive(lock_file: IO) -> None:
+    """Неблокирующая эксклюзивная блокировка файла (OSError, если занят)."""
+    if os.name == 'nt':
+        import msvcrt
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class ConflictIndex:
+
+    def __init__(self):
+        self.ready = False
+        self._rooms: dict[int, RoomIntervals] = {}
+        # id брони -> (id переговорки, начало), чтобы удалять по id.
+        self._positions: dict[int, tuple[int, datetime]] = {}
+        self._lock_file: Optional[IO] = None
+
+    def acquire(self, path: str) -> None:
+        """
+        Закрепляет индекс за текущим процессом. Блокировка держится,
+        пока процесс жив, и снимается release() или завершением процесса.
+        """
+        if self._lock_file is not None:
+            return
+        lock_file = open(path, 'a+')
+        try:
+            _lock_exclusive(lock_file)
+        except OSError:
+            lock_file.close()
+            raise ConflictIndexLocked(
+                'Индекс пересечений (CONFLICT_INDEX_ENABLED) работает только '
+                'при одном воркере: блокировку {} держит другой процесс. '
+                'Запустите один воркер или выключите индекс.'.format(path)
+            )
+        self._lock_file = lock_file
+
+    def release(self) -> None:
+        self.clear()
+        if self._lock_file is not None:
+            # Закрытие файла снимает блокировку.
+            self._lock_file.close()
+            self._lock_file = None
+
+    async def load(self, session: AsyncSession) -> None:
+        """Заполняет индекс всеми бронированиями из базы."""
+        if self._lock_file is None:
+            raise ConflictIndexLocked(
+                'Перед загрузкой индекса вызовите acquire()'
+            )
+        self.clear()
+        rows = await session.execute(
+            select(
+                Reservation.id,
+                Reservation.meetingroom_id,
+                Reservation.from_reserve,
+                Reservation.to_reserve,
+            ).order_by(Reservation.meetingroom_id, Reservation.from_reserve)
+        )
+        for reservation_id, room_id, start, end in rows:
+            self.add(reservation_id, room_id, start, end)
+        self.ready = True
+
+    def clear(self) -> None:
+        self.ready = False
+        self._rooms.clear()
+        self._positions.clear()
+
+    def add(
+            self,
+            reservation_id: int,
+            meetingroom_id: int,
+            from_reserve: datetime,
+            to_reserve: datetime,
+    ) -> None:
+        """Добавляет бронь или заменяет её новую версию после изменения."""
+        self.discard(reservation_id)
+        room = self._rooms.setdefault(meetingroom_id, RoomIntervals())
+        room.add(reservation_id, from_reserve, to_reserve)
+        self._positions[reservation_id] = (meetingroom_id, from_reserve)
+
+    def discard(self, reservation_id: int) -> None:
+        position = self._positions.pop(reservation_id, None)
+        if position is not None:
+            meetingroom_id, from_reserve = position
+            self._rooms[meetingroom_id].remove(reservation_id, from_reserve)
+
+    def overlaps(
+            self,
+            meetingroom_id: int,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            reservation_id: Optional[int] = None,
+    ) -> list[int]:
+        """Возвращает id бронирований, пересекающихся с интервалом."""
+        room = self._rooms.get(meetingroom_id)
+        if room is None:
+            return []
+        return room.overlaps(from_reserve, to_reserve, reservation_id)
+
+
+conflict_index = ConflictIndex()
@@ -1,8 +1,23 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import sqlite3
+import time
+
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite.base import SQLiteCompiler
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy import Column, Integer
-from sqlalchemy.orm import declarative_base, declared_attr, sessionmaker
+from sqlalchemy.orm import (
+    Session, declarative_base, declared_attr, sessionmaker
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.expression import FromClause
 
 from app.core.config import settings
+from app.core.metrics import (
+    db_operation, db_pool_checkout_wait_seconds, db_query_duration_seconds,
+    registry
+)
+from app.core.query_budget import record_statement
 
 
 class PreBase:
@@ -16,9 +31,226 @@ class PreBase:
 
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.database_url)
 
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
+# Настройки SQLite, которые применяются к каждому новому соединению:
+# журнал WAL позволяет читать параллельно с записью, synchronous=NORMAL
+# в режиме WAL не теряет целостность и убирает fsync на каждый commit.
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Отключаем собственное управление транзакциями драйвера sqlite3
+    # (он откладывает BEGIN до первой записи) - транзакции начинает
+    # begin_sqlite_transaction, см. ниже.
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'PRAGMA journal_mode={settings.sqlite_journal_mode}')
+    cursor.execute(f'PRAGMA synchronous={settings.sqlite_synchronous}')
+    cursor.execute(f'PRAGMA mmap_size={settings.sqlite_mmap_size}')
+    cursor.execute(f'PRAGMA cache_size={settings.sqlite_cache_size}')
+    cursor.execute(f'PRAGMA busy_timeout={settings.sqlite_busy_timeout}')
+    cursor.close()
+
+
+# Начало транзакции SQLite. Опция соединения sqlite_begin='IMMEDIATE'
+# сразу берёт блокировку записи: проверка и запись внутри такой транзакции
+# не пересекаются с записями других соединений.
+def begin_sqlite_transaction(conn):
+    mode = conn.get_execution_options().get('sqlite_begin', 'DEFERRED')
+    conn.exec_driver_sql(f'BEGIN {mode}')
+
+
+# SQLite поддерживает INSERT/UPDATE/DELETE ... RETURNING с версии 3.35,
+# а компилятор SQLite в SQLAlchemy 1.4 его ещё не умеет. Компилятор
+# ниже выводит RETURNING так же, как диалект PostgreSQL. Подпись
+# SQLCompiler.returning_clause и _label_returning_column - внутренности
+# SQLAlchemy 1.4, поэтому версия закреплена в requirements.txt; в 2.0
+# RETURNING для SQLite уже встроен и компилятор не нужен.
+def returning_columns(elements):
+    """Столбцы RETURNING: таблицы раскрываются в свои столбцы."""
+    for element in elements:
+        if isinstance(element, FromClause):
+            yield from element.c
+        else:
+            yield element
+
+
+class SQLiteReturningCompiler(SQLiteCompiler):
+
+    def returning_clause(self, stmt, returning_cols):
+        columns = [
+            self._label_returning_column(
+                stmt, column, fallback_label_name=column._non_anon_label
+            )
+            for column in returning_columns(returning_cols)
+        ]
+        return 'RETURNING ' + ', '.join(columns)
+
+
+def enable_sqlite_returning(dialect) -> None:
+    if sqlite3.sqlite_version_info >= (3, 35):
+        dialect.statement_compiler = SQLiteReturningCompiler
+        dialect.full_returning = True
+
+
+# Пул, который измеряет ожидание свободного соединения.
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait_seconds.observe(
+                time.perf_counter() - started
+            )
+
+
+# Тайминг каждого SQL-запроса с меткой CRUD-метода, который его выполнил.
+def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+):
+    started = conn.info['query_started'].pop()
+    db_query_duration_seconds.observe(
+        time.perf_counter() - started,
+        db_operation.get(),
+        statement.lstrip().split(None, 1)[0].upper(),
+    )
+
+
+def handle_error(exception_context):
+    # После ошибки after_cursor_execute не вызывается.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+
+def create_engine(database_url: str) -> AsyncEngine:
+    url = make_url(database_url)
+    options = {'pool_pre_ping': settings.db_pool_pre_ping}
+    # Для SQLite в памяти оставляем StaticPool по умолчанию: у каждого
+    # соединения была бы своя пустая база. Файловой SQLite SQLAlchemy
+    # по умолчанию даёт NullPool, который открывает соединение
+    # (и заново выполняет PRAGMA) на каждую сессию, - заменяем его пулом.
+    if url.get_backend_name() != 'sqlite' or url.database not in (
+        None, '', ':memory:'
+    ):
+        options.update(
+            poolclass=TimedAsyncQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    new_engine = create_async_engine(database_url, **options)
+    event.listen(
+        new_engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    event.listen(
+        new_engine.sync_engine, 'after_cursor_execute', after_cursor_execute
+    )
+    event.listen(new_engine.sync_engine, 'handle_error', handle_error)
+    if settings.query_budget_enabled:
+        event.listen(
+            new_engine.sync_engine, 'before_cursor_execute', record_statement
+        )
+    if new_engine.dialect.name == 'sqlite':
+        enable_sqlite_returning(new_engine.dialect)
+        event.listen(new_engine.sync_engine, 'connect', set_sqlite_pragmas)
+        event.listen(
+            new_engine.sync_engine, 'begin', begin_sqlite_transaction
+        )
+    return new_engine
+
+
+engine = create_engine(settings.database_url)
+
+
+def pool_stats() -> dict[tuple, float]:
+    pool = engine.sync_engine.pool
+    # Не у всех пулов есть счётчики (например, StaticPool).
+    if not hasattr(pool, 'checkedout'):
+        return {}
+    return {
+        ('size',): pool.size(),
+        ('idle',): pool.checkedin(),
+        ('in_use',): pool.checkedout(),
+        # QueuePool ведёт overflow от -pool_size.
+        ('overflow',): max(pool.overflow(), 0),
+    }
+
+
+registry.gauge(
+    'db_pool_connections', 'Состояние пула соединений с базой.', ('state',)
+).set_function(pool_stats)
+
+# expire_on_commit=False: после commit объекты не сбрасываются,
+# и их не нужно перечитывать из базы через refresh.
+AsyncSessionLocal = sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+class PendingWritesError(RuntimeError):
+    """Перед транзакцией для записи у сессии остались незавершённые
+    изменения."""
+
+
+# Ключ session.info: в текущей транзакции сессии выполнялись
+# INSERT/UPDATE/DELETE (в том числе без ORM-объектов).
+WRITES_KEY = 'has_writes'
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def mark_session_writes(orm_execute_state):
+    if (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def reset_session_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(WRITES_KEY, None)
+
+
+def has_pending_writes(session: AsyncSession) -> bool:
+    sync_session = session.sync_session
+    return bool(
+        sync_session.new
+        or sync_session.dirty
+        or sync_session.deleted
+        or sync_session.info.get(WRITES_KEY)
+    )
+
+
+async def begin_immediate(session: AsyncSession) -> None:
+    """
+    Открывает транзакцию для записи, которая должна видеть актуальные
+    данные: в SQLite - BEGIN IMMEDIATE, в PostgreSQL - обычную транзакцию
+    (гонки там отсекают ограничения БД).
+
+    Открытую транзакцию сессии функция закрывает, только если та лишь
+    читала. Незавершённые изменения не фиксируются за вызывающего -
+    иначе они попали бы в базу вне атомарной записи: тогда выбрасывается
+    PendingWritesError, и вызывающий сам делает commit или rollback.
+    """
+    if session.in_transaction():
+        if has_pending_writes(session):
+            raise PendingWritesError(
+                'В транзакции сессии есть незавершённые изменения: '
+                'завершите её перед транзакцией для записи'
+            )
+        # Транзакция только читала - commit ничего не записывает
+        # и, в отличие от rollback, не сбрасывает загруженные объекты.
+        await session.commit()
+    await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
 
 
 # Асинхронный генератор сессий.
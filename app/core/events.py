@@ -0,0 +1,155 @@
+"""
+Шина событий бронирований переговорок внутри процесса (pub/sub).
+
+Эндпоинты броней после успешной записи публикуют событие
+created/updated/deleted, а подписчики - SSE- и WebSocket-соединения
+GET /meeting_rooms/{id}/events - получают события своей переговорки.
+
+- Событие сериализуется в JSON один раз, подписчикам раздаётся строка.
+- У каждого подписчика своя очередь на settings.events_queue_size
+  событий. Публикация никогда не ждёт: если очередь подписчика
+  переполнена (клиент не успевает читать), подписчик отключается -
+  клиент переподключится и перечитает расписание.
+- Раз в settings.events_heartbeat секунд подписчикам с пустой очередью
+  отдаётся «пульс», чтобы прокси не закрывали соединение, а сервер
+  заметил отключившихся клиентов. Таймер один на всю шину, а не
+  на каждого подписчика.
+- При остановке приложения (stop) все подписчики отключаются,
+  и их потоки событий завершаются.
+
+Подписчики других воркеров событий этого процесса не получат.
+"""
+import asyncio
+from itertools import count
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.schemas.reservation import ReservationDB
+
+
+# Метка конца в очереди подписчика.
+CLOSED = object()
+
+
+class Subscription:
+    # Подписчиков тысячи - обходимся без __dict__ у каждого.
+    __slots__ = ('room_id', 'queue')
+
+    def __init__(self, room_id: int, queue_size: int):
+        self.room_id = room_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def drop(self) -> None:
+        """Отключает подписчика: очередь заменяется одной меткой конца."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(CLOSED)
+
+    async def messages(self) -> AsyncIterator[Optional[tuple[int, str, str]]]:
+        """
+        Отдаёт события (номер, тип, JSON) и None - «пульс».
+        Заканчивается, когда подписчика отключили.
+        """
+        while True:
+            message = await self.queue.get()
+            if message is CLOSED:
+                return
+            yield message
+
+
+class EventHub:
+
+    def __init__(self, queue_size: int, heartbeat: float):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._rooms: dict[int, set[Subscription]] = {}
+        self._ids = count(1)
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, room_id: int) -> Subscription:
+        # Таймер «пульса» запускается с первым подписчиком.
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._beat())
+        subscription = Subscription(room_id, self.queue_size)
+        self._rooms.setdefault(room_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._rooms.get(subscription.room_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._rooms[subscription.room_id]
+
+    def publish(self, room_id: int, event_type: str, data: str) -> None:
+        subscribers = self._rooms.get(room_id)
+        if not subscribers:
+            return
+        message = (next(self._ids), event_type, data)
+        self.published += 1
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                subscription.drop()
+                self.unsubscribe(subscription)
+
+    def close_room(self, room_id: int) -> None:
+        """Отключает всех подписчиков переговорки (её удалили)."""
+        for subscription in self._rooms.pop(room_id, ()):
+            subscription.drop()
+
+    def publish_reservation(self, event_type: str, reservation) -> None:
+        self.publish(
+            reservation.meetingroom_id,
+            event_type,
+            ReservationDB.from_orm(reservation).json(exclude={'user_id'}),
+        )
+
+    async def _beat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            for subscribers in list(self._rooms.values()):
+                for subscription in subscribers:
+                    if subscription.queue.empty():
+                        subscription.queue.put_nowait(None)
+
+    async def stop(self) -> None:
+        """Отключает всех подписчиков и останавливает «пульс»."""
+        rooms, self._rooms = self._rooms, {}
+        for subscribers in rooms.values():
+            for subscription in subscribers:
+                subscription.drop()
+        if self._heartbeat_task is None:
+            return
+        self._heartbeat_task.cancel()
+        await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+        self._heartbeat_task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'subscribers': sum(
+                len(subscribers) for subscribers in self._rooms.values()
+            ),
+            'rooms': len(self._rooms),
+            'published': self.published,
+            'dropped': self.dropped,
+        }
+
+
+event_hub = EventHub(
+    queue_size=settings.events_queue_size,
+    heartbeat=settings.events_heartbeat,
+)
+
+# Статистика шины в /metrics.
+registry.gauge(
+    'reservation_events', 'Подписчики и события броней.', ('stat',)
+).set_function(
+    lambda: {(name,): value for name, value in event_hub.stats().items()}
+)
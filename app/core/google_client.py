@@ -1,8 +1,20 @@
 # Подключаем классы асинхронной библиотеки
-from aiogoogle import Aiogoogle
-from aiogoogle.auth.creds import ServiceAccountCreds
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+import aiofiles
 # Подключаем настройки
 from app.core.config import settings
+
+# aiogoogle (вместе с aiohttp) импортируется при первом обращении
+# к Google: воркеры, которые отчётов не строят, стартуют быстрее.
+if TYPE_CHECKING:
+    from aiogoogle import Aiogoogle
+    from aiogoogle.auth.creds import ServiceAccountCreds
+    from aiogoogle.resource import GoogleAPI
 # Список разрешений
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
@@ -21,11 +33,127 @@ INFO = {
     'auth_provider_x509_cert_url': settings.auth_provider_x509_cert_url,
     'client_x509_cert_url': settings.client_x509_cert_url
 }
-# Получаем объект учётных данных
-cred = ServiceAccountCreds(scopes=SCOPES, **INFO)
 
 
-# Создаём экземпляр класса Aiogoogle
-async def get_service():
-    async with Aiogoogle(service_account_creds=cred) as aiogoogle:
-        yield aiogoogle
+def get_creds() -> 'ServiceAccountCreds':
+    """Получаем объект учётных данных."""
+    from aiogoogle.auth.creds import ServiceAccountCreds
+    return ServiceAccountCreds(scopes=SCOPES, **INFO)
+
+
+class GoogleClient:
+    """
+    Клиент Google API на всё время работы приложения.
+
+    - один объект Aiogoogle: токен сервисного аккаунта хранится в нём
+      и запрашивается заново, только когда истёк. Он и учётные данные
+      создаются при первом запросе к Google, а не при импорте;
+    - одна HTTP-сессия aiohttp (пул соединений) на все запросы,
+      открывается при первом запросе и закрывается при остановке;
+    - документы discovery кэшируются в памяти и на диске,
+      поэтому отчёт не скачивает их заново.
+    """
+
+    def __init__(
+            self,
+            creds_factory: Callable[[], 'ServiceAccountCreds'],
+            cache_dir: str,
+            cache_ttl: int,
+    ):
+        self.creds_factory = creds_factory
+        self._aiogoogle: Optional['Aiogoogle'] = None
+        self.cache_dir = Path(cache_dir)
+        self.cache_ttl = cache_ttl
+        self._session = None
+        # (api, версия) -> (время загрузки, GoogleAPI)
+        self._apis: dict[tuple[str, str], tuple[float, 'GoogleAPI']] = {}
+
+    @property
+    def aiogoogle(self) -> 'Aiogoogle':
+        if self._aiogoogle is None:
+            from aiogoogle import Aiogoogle
+            self._aiogoogle = Aiogoogle(
+                service_account_creds=self.creds_factory()
+            )
+        return self._aiogoogle
+
+    async def open(self) -> None:
+        if self._session is None:
+            self._session = self.aiogoogle.session_factory()
+            await self._session.__aenter__()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.__aexit__(None, None, None)
+            self._session = None
+
+    async def bind(self) -> 'Aiogoogle':
+        """Подключает общую HTTP-сессию к контексту текущего запроса."""
+        await self.open()
+        # Aiogoogle ищет сессию в переменной контекста.
+        self.aiogoogle.session_context.set(self._session)
+        return self.aiogoogle
+
+    def clear(self) -> None:
+        """Сбрасывает документы discovery (в памяти и на диске) и токен."""
+        self._apis.clear()
+        for path in self.cache_dir.glob('*.json'):
+            path.unlink(missing_ok=True)
+        # Новый Aiogoogle - без полученного токена. Сессия остаётся
+        # прежней: bind() подключает её к каждому новому объекту.
+        if self._aiogoogle is not None:
+            from aiogoogle import Aiogoogle
+            self._aiogoogle = Aiogoogle(
+                service_account_creds=self._aiogoogle.service_account_creds
+            )
+
+    def _cache_path(self, api_name: str, api_version: str) -> Path:
+        return self.cache_dir / f'{api_name}.{api_version}.json'
+
+    async def _read_cached(self, path: Path) -> Optional[dict]:
+        try:
+            if time.time() - path.stat().st_mtime > self.cache_ttl:
+                return None
+            async with aiofiles.open(path) as file:
+                return json.loads(await file.read())
+        except (OSError, ValueError):
+            return None
+
+    async def _write_cached(self, path: Path, document: dict) -> None:
+        # Пишем во временный файл и переименовываем: параллельные
+        # процессы не прочитают недописанный документ.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        async with aiofiles.open(temp_path, 'w') as file:
+            await file.write(json.dumps(document))
+        os.replace(temp_path, path)
+
+    async def discover(
+            self, api_name: str, api_version: str
+    ) -> 'GoogleAPI':
+        from aiogoogle.models import Request
+        from aiogoogle.resource import GoogleAPI
+        key = (api_name, api_version)
+        cached = self._apis.get(key)
+        if cached is not None and time.time() - cached[0] < self.cache_ttl:
+            return cached[1]
+        path = self._cache_path(api_name, api_version)
+        document = await self._read_cached(path)
+        if document is None:
+            document = await self.aiogoogle.as_anon(Request(
+                method='GET',
+                url=settings.google_discovery_url.format(
+                    api=api_name, version=api_version
+                ),
+            ))
+            await self._write_cached(path, document)
+        api = GoogleAPI(document)
+        self._apis[key] = (time.time(), api)
+        return api
+
+
+google_client = GoogleClient(
+    get_creds,
+    cache_dir=settings.google_discovery_cache_dir,
+    cache_ttl=settings.google_discovery_ttl,
+)
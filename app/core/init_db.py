@@ -3,10 +3,12 @@ import contextlib
 
 from fastapi_users.exceptions import UserAlreadyExists
 from pydantic import EmailStr
+from sqlalchemy import exists, func, select
 
 from app.core.config import settings
 from app.core.db import get_async_session
 from app.core.user import get_user_db, get_user_manager
+from app.models.user import User
 from app.schemas.user import UserCreate
 
 # Превращаем асинхронные генераторы в асинхронные менеджеры контекста.
@@ -40,11 +42,24 @@ async def create_user(
         pass
 
 
+# Корутина, проверяющая одним лёгким запросом, есть ли уже пользователь
+# с таким email. Email сравнивается без учёта регистра, как в fastapi-users.
+async def user_exists(email: EmailStr) -> bool:
+    async with get_async_session_context() as session:
+        return await session.scalar(
+            select(exists().where(func.lower(User.email) == email.lower()))
+        )
+
+
 # Корутина, проверяющая, указаны ли в настройках данные для суперюзера.
 # Если да, то вызывается корутина create_user для создания суперпользователя.
+# Суперюзер создаётся один раз, а приложение стартует при каждом запуске
+# воркера: сначала проверяем, есть ли он, и только тогда хэшируем пароль.
 async def create_first_superuser():
     if (settings.first_superuser_email is not None 
             and settings.first_superuser_password is not None):
+        if await user_exists(settings.first_superuser_email):
+            return
         await create_user(
             email=settings.first_superuser_email,
             password=settings.first_superuser_password,
@@ -0,0 +1,242 @@
+"""
+Метрики приложения в текстовом формате Prometheus без внешних библиотек.
+
+Счётчики, гистограммы и gauge хранятся в памяти процесса и отдаются
+эндпоинтом /metrics. Значения gauge могут вычисляться при каждом
+чтении (set_function) - так снимаются состояние пула соединений
+и статистика кэшей.
+
+db_operation - переменная контекста с именем CRUD-метода, который
+выполняет запрос: ею помечаются тайминги SQL-запросов (app/core/db.py).
+"""
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional, Sequence
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Границы корзин гистограмм в секундах.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+DB_BUCKETS = (0.0005, 0.001, 0.0025) + DEFAULT_BUCKETS
+
+db_operation: ContextVar[str] = ContextVar('db_operation', default='other')
+
+
+def _escape(value: str) -> str:
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return '\n'.join((
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+            *self.samples(),
+        ))
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: defaultdict[tuple, float] = defaultdict(float)
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] += amount
+
+    def samples(self):
+        for label_values, value in sorted(self._values.items()):
+            labels = _format_labels(self.label_names, label_values)
+            yield f'{self.name}{labels} {value}'
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+        self._function: Optional[Callable[[], dict]] = None
+
+    def set(self, value: float, *label_values: str) -> None:
+        self._values[label_values] = value
+
+    def set_function(self, function: Callable[[], dict]) -> None:
+        """function возвращает {кортеж значений меток: значение}."""
+        self._function = function
+
+    def samples(self):
+        values = self._function() if self._function else self._values
+        for label_values, value in sorted(values.items()):
+            labels = _format_labels(self.label_names, label_values)
+            yield f'{self.name}{labels} {value}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # Для каждого набора меток: счётчики корзин (последняя - +Inf),
+        # сумма значений.
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: defaultdict[tuple, float] = defaultdict(float)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        counts = self._counts.get(label_values)
+        if counts is None:
+            counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[label_values] += value
+
+    def samples(self):
+        for label_values, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.label_names + ('le',), label_values + (str(bound),)
+                )
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.label_names, label_values)
+            yield f'{self.name}_sum{labels} {self._sums[label_values]}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), **kwargs):
+        return self.register(Histogram(name, documentation, labels, **kwargs))
+
+    def render(self) -> str:
+        return '\n'.join(
+            metric.render() for metric in self._metrics.values()
+        ) + '\n'
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    'http_requests_total', 'Количество HTTP-запросов.',
+    ('method', 'route', 'status'),
+)
+http_request_duration_seconds = registry.histogram(
+    'http_request_duration_seconds', 'Время обработки HTTP-запроса.',
+    ('method', 'route'),
+)
+db_query_duration_seconds = registry.histogram(
+    'db_query_duration_seconds', 'Время выполнения SQL-запроса.',
+    ('operation', 'statement'), buckets=DB_BUCKETS,
+)
+db_pool_checkout_wait_seconds = registry.histogram(
+    'db_pool_checkout_wait_seconds',
+    'Ожидание соединения из пула.', buckets=DB_BUCKETS,
+)
+
+
+def track_db_operation(method):
+    """Помечает SQL-запросы метода CRUD-объекта его именем.
+
+    Имя - «таблица.метод», например reservation.create.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        token = db_operation.set(
+            f'{self.model.__tablename__}.{method.__name__}'
+        )
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            db_operation.reset(token)
+    return wrapper
+
+
+def track_db_operations(cls):
+    """Оборачивает публичные корутины класса в track_db_operation."""
+    for name, attr in list(vars(cls).items()):
+        if not name.startswith('_') and inspect.iscoroutinefunction(attr):
+            setattr(cls, name, track_db_operation(attr))
+    return cls
+
+
+# Шаблон маршрута вместо фактического пути держит число меток
+# ограниченным: /reservations/{reservation_id}, а не каждый id.
+def route_template(scope: Scope) -> str:
+    for route in scope['app'].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return '<unmatched>'
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: время и статусы HTTP-запросов по маршрутам."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_template(scope)
+            http_request_duration_seconds.observe(
+                time.perf_counter() - started, scope['method'], route
+            )
+            http_requests_total.inc(scope['method'], route, str(status))
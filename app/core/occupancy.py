@@ -0,0 +1,176 @@
+"""
+Поминутные сетки занятости переговорок для поиска свободных слотов.
+
+Для каждой пары (переговорка, день) хранится массив NumPy из 1440 счётчиков:
+сколько бронирований занимают эту минуту (вместо булевых флагов, чтобы
+снятие одной брони не освобождало минуту, занятую соседней). Минуты
+брони берутся включительно - от floor(начала) до ceil(окончания), - так же,
+как пересечения проверяет CRUDReservation: брони «встык» конфликтуют.
+
+Дни загружаются из базы одним запросом по требованию, после чего
+поддерживаются записями CRUDReservation. Другие воркеры сюда не пишут,
+поэтому загруженный день живёт не дольше settings.occupancy_ttl секунд.
+"""
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Reservation
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, dt_time.min)
+
+
+def minutes_since(moment: datetime, start: datetime, ceil: bool = False) -> int:
+    seconds = (moment - start).total_seconds()
+    minutes = int(seconds // 60)
+    if ceil and seconds % 60:
+        minutes += 1
+    return minutes
+
+
+class OccupancyGrids:
+
+    def __init__(self, max_days: int = 400):
+        self.max_days = max_days
+        # день -> (момент загрузки, {id переговорки: сетка дня})
+        self._days: OrderedDict[date, tuple[float, dict[int, np.ndarray]]] = (
+            OrderedDict()
+        )
+        # Счётчик записей: загрузка, пересёкшаяся с записью, повторяется.
+        self._writes = 0
+
+    def clear(self) -> None:
+        self._days.clear()
+
+    def _fresh_days(self) -> set[date]:
+        deadline = time.monotonic() - settings.occupancy_ttl
+        return {
+            day for day, (loaded_at, _) in self._days.items()
+            if loaded_at >= deadline
+        }
+
+    async def ensure_days(self, session: AsyncSession, days: list[date]):
+        """Догружает из базы дни, которых нет в памяти или которые устарели."""
+        for _ in range(3):
+            fresh = self._fresh_days()
+            missing = sorted(set(days) - fresh)
+            if not missing:
+                return
+            writes = self._writes
+            start = day_start(missing[0])
+            end = day_start(missing[-1] + timedelta(days=1))
+            rows = await session.execute(
+                select(
+                    Reservation.meetingroom_id,
+                    Reservation.from_reserve,
+                    Reservation.to_reserve,
+                ).where(
+                    Reservation.to_reserve >= start,
+                    Reservation.from_reserve <= end,
+                )
+            )
+            rows = rows.all()
+            if writes != self._writes:
+                # Пока шёл запрос, бронирования менялись - повторяем.
+                continue
+            loaded_at = time.monotonic()
+            for day in missing:
+                self._days[day] = (loaded_at, {})
+                self._days.move_to_end(day)
+            for room_id, from_reserve, to_reserve in rows:
+                self._apply(room_id, from_reserve, to_reserve, 1, set(missing))
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+            return
+
+    def _apply(
+            self,
+            room_id: int,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            delta: int,
+            only_days: Optional[set[date]] = None,
+    ) -> None:
+        day = from_reserve.date()
+        while day <= to_reserve.date():
+            if day in self._days and (only_days is None or day in only_days):
+                start = day_start(day)
+                first = max(minutes_since(from_reserve, start), 0)
+                last = min(
+                    minutes_since(to_reserve, start, ceil=True),
+                    MINUTES_PER_DAY - 1,
+                )
+                grids = self._days[day][1]
+                grid = grids.get(room_id)
+                if grid is None:
+                    grid = grids[room_id] = np.zeros(
+                        MINUTES_PER_DAY, dtype=np.int16
+                    )
+                grid[first:last + 1] += delta
+            day += timedelta(days=1)
+
+    def add(
+            self, room_id: int, from_reserve: datetime, to_reserve: datetime
+    ) -> None:
+        self._writes += 1
+        self._apply(room_id, from_reserve, to_reserve, 1)
+
+    def discard(
+            self, room_id: int, from_reserve: datetime, to_reserve: datetime
+    ) -> None:
+        self._writes += 1
+        self._apply(room_id, from_reserve, to_reserve, -1)
+
+    def busy_matrix(
+            self, room_ids: list[int], days: list[date]
+    ) -> np.ndarray:
+        """
+        Матрица занятости: строка - переговорка, столбец - минута
+        подряд идущих дней days (дни должны быть загружены).
+        """
+        busy = np.zeros((len(room_ids), len(days) * MINUTES_PER_DAY), bool)
+        for column, day in enumerate(days):
+            grids = self._days[day][1]
+            offset = column * MINUTES_PER_DAY
+            for row, room_id in enumerate(room_ids):
+                grid = grids.get(room_id)
+                if grid is not None:
+                    busy[row, offset:offset + MINUTES_PER_DAY] = grid > 0
+        return busy
+
+
+def free_slot_starts(
+        busy: np.ndarray,
+        first_minute: int,
+        last_minute: int,
+        duration: int,
+        granularity: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Возвращает кандидатов начала слота first_minute + k * granularity
+    и для каждой строки busy булеву маску тех из них, при которых минуты
+    [начало, начало + duration] свободны и слот не выходит за last_minute.
+    Окно проверяется разностью кумулятивных сумм - без циклов по слотам.
+    """
+    candidates = np.arange(
+        first_minute, last_minute - duration + 1, granularity
+    )
+    if not len(candidates):
+        return candidates, np.zeros((busy.shape[0], 0), dtype=bool)
+    taken = np.zeros((busy.shape[0], busy.shape[1] + 1), dtype=np.int32)
+    np.cumsum(busy, axis=1, out=taken[:, 1:])
+    window = taken[:, candidates + duration + 1] - taken[:, candidates]
+    return candidates, window == 0
+
+
+occupancy_grids = OccupancyGrids()
@@ -0,0 +1,117 @@
+"""
+Бюджет SQL-запросов на HTTP-запрос и поиск N+1 (режим разработки и тестов).
+
+При settings.query_budget_enabled QueryBudgetMiddleware заводит на каждый
+HTTP-запрос журнал в переменной контекста, а слушатель движка
+(app/core/db.py) записывает в него выполненные запросы.
+Команды управления транзакцией (BEGIN, COMMIT, PRAGMA...) не считаются.
+
+По окончании запроса:
+- одинаковые запросы, повторённые query_repeat_threshold раз и больше,
+  попадают в лог как вероятный N+1;
+- если у эндпоинта объявлен бюджет (декоратор query_budget) и он
+  превышен, это пишется в лог, а при query_budget_strict выбрасывается
+  QueryBudgetExceeded - тестовый ASGI-клиент пробросит её в тест.
+"""
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NOT_COUNTED = frozenset((
+    'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA'
+))
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryLog:
+
+    def __init__(self):
+        self.statements: Counter = Counter()
+
+    @property
+    def count(self) -> int:
+        return sum(self.statements.values())
+
+    def record(self, statement: str) -> None:
+        if statement.lstrip().split(None, 1)[0].upper() not in NOT_COUNTED:
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+query_log: ContextVar[Optional[QueryLog]] = ContextVar(
+    'query_log', default=None
+)
+
+
+def record_statement(
+        conn, cursor, statement, parameters, context, executemany
+):
+    """Слушатель before_cursor_execute движка."""
+    log = query_log.get()
+    if log is not None:
+        log.record(statement)
+
+
+def query_budget(max_queries: int):
+    """Объявляет бюджет SQL-запросов эндпоинта.
+
+    Ставится под декоратором роутера; запросы зависимостей
+    (пользователь, сессия) входят в бюджет.
+    """
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+def check_query_log(log: QueryLog, method: str, path: str, endpoint) -> None:
+    for statement, count in log.repeated(settings.query_repeat_threshold):
+        logger.warning(
+            'Возможен N+1: %s %s выполнил %d раз запрос %s',
+            method, path, count, ' '.join(statement.split()),
+        )
+    budget = getattr(endpoint, 'query_budget', None)
+    if budget is None or log.count <= budget:
+        return
+    message = (
+        f'{method} {path}: {log.count} SQL-запросов при бюджете {budget}'
+    )
+    logger.error(message)
+    if settings.query_budget_strict:
+        raise QueryBudgetExceeded(message)
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        log = QueryLog()
+        token = query_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            query_log.reset(token)
+        check_query_log(
+            log, scope['method'], scope['path'], scope.get('endpoint')
+        )
@@ -0,0 +1,89 @@
+"""
+Блокировки бронирования по переговоркам внутри процесса.
+
+Эндпоинты создания и изменения брони держат блокировку своей переговорки
+на время «проверка пересечений - запись». Брони разных переговорок идут
+параллельно, брони одной переговорки - по очереди, и проигравший запрос
+получает 422 от проверки, не доходя до записи в базу.
+
+Блокировки хранятся в WeakValueDictionary: пока блокировку держат или ждут,
+на неё есть ссылки, а ненужная удаляется из словаря сама.
+Межпроцессную гарантию даёт атомарная запись в CRUDReservation.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from weakref import WeakValueDictionary
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import registry
+
+
+class RoomLockManager:
+
+    def __init__(self):
+        self._locks: WeakValueDictionary[int, asyncio.Lock] = (
+            WeakValueDictionary()
+        )
+        self.acquisitions = 0
+        # Сколько раз блокировка уже была занята и пришлось ждать.
+        self.contended = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _get_lock(self, meetingroom_id: int) -> asyncio.Lock:
+        lock = self._locks.get(meetingroom_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[meetingroom_id] = lock
+        return lock
+
+    @asynccontextmanager
+    async def lock(
+            self,
+            meetingroom_id: int,
+            session: Optional[AsyncSession] = None,
+    ) -> AsyncIterator[None]:
+        """Держит блокировку переговорки и учитывает время ожидания.
+
+        Если блокировка занята, открытая транзакция session завершается:
+        ожидающие запросы не должны держать соединения из пула, иначе
+        владельцу блокировки может не хватить соединения.
+        """
+        lock = self._get_lock(meetingroom_id)
+        if lock.locked():
+            self.contended += 1
+            if session is not None and session.in_transaction():
+                await session.commit()
+        started = time.perf_counter()
+        async with lock:
+            waited = time.perf_counter() - started
+            self.acquisitions += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            yield
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'acquisitions': self.acquisitions,
+            'contended': self.contended,
+            'wait_seconds_total': self.wait_total,
+            'wait_seconds_max': self.wait_max,
+            'wait_seconds_avg': (
+                self.wait_total / self.acquisitions
+                if self.acquisitions else 0.0
+            ),
+            'active_locks': len(self._locks),
+        }
+
+
+room_locks = RoomLockManager()
+
+# Ожидание блокировок в /metrics.
+registry.gauge(
+    'room_locks', 'Ожидание блокировок переговорок.', ('stat',)
+).set_function(
+    lambda: {(name,): value for name, value in room_locks.stats().items()}
+)
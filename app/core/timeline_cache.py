@@ -0,0 +1,118 @@
+"""
+Кэш расписаний переговорок (GET /meeting_rooms/{id}/reservations).
+
+Табло у переговорок опрашивают расписание каждые несколько секунд,
+поэтому ответ хранится уже сериализованным в JSON вместе с ETag.
+Ключ - (переговорка, начало и конец окна), а границы окна выравниваются
+по settings.timeline_bucket секундам: запросы «с текущего момента»
+в пределах одного интервала попадают в одну запись.
+
+У каждой переговорки есть номер версии. CRUDReservation увеличивает его
+после любой записи броней этой переговорки, и все её записи в кэше
+сразу устаревают. Записи других воркеров станут видны не позже чем
+через settings.timeline_cache_ttl секунд.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+
+class TimelineEntry:
+
+    def __init__(self, body: bytes, version: int):
+        self.body = body
+        self.version = version
+        self.etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+
+
+Window = Tuple[datetime, Optional[datetime]]
+
+
+def bucket_window(
+        from_time: datetime,
+        to_time: Optional[datetime],
+        bucket: int,
+) -> Window:
+    """Расширяет окно до границ интервалов по bucket секунд.
+
+    Окно без конца (to_time=None) так и остаётся без конца.
+    """
+    origin = datetime.combine(from_time.date(), datetime.min.time())
+    start = (from_time - origin).total_seconds() // bucket * bucket
+    if to_time is None:
+        return origin + timedelta(seconds=start), None
+    end = -((origin - to_time).total_seconds() // bucket) * bucket
+    return (
+        origin + timedelta(seconds=start),
+        origin + timedelta(seconds=end),
+    )
+
+
+class RoomTimelineCache:
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, room_id: int) -> int:
+        return self._versions.get(room_id, 0)
+
+    def get(
+            self,
+            room_id: int,
+            window: Window,
+    ) -> Optional[TimelineEntry]:
+        entry = self._entries.get((room_id, *window))
+        if entry is None or entry.version != self.version(room_id):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(
+            self,
+            room_id: int,
+            window: Window,
+            body: bytes,
+            version: int,
+    ) -> TimelineEntry:
+        """Сохраняет ответ, если с чтения (version) броней не меняли."""
+        entry = TimelineEntry(body, version)
+        if version == self.version(room_id):
+            self._entries[(room_id, *window)] = entry
+        return entry
+
+    def invalidate_room(self, room_id: int) -> None:
+        self._versions[room_id] = self.version(room_id) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+        }
+
+
+timeline_cache = RoomTimelineCache(
+    maxsize=settings.timeline_cache_maxsize,
+    ttl=settings.timeline_cache_ttl,
+)
+
+# Статистика кэша в /metrics.
+registry.gauge(
+    'timeline_cache', 'Статистика кэша расписаний переговорок.', ('stat',)
+).set_function(
+    lambda: {
+        (name,): value for name, value in timeline_cache.stats().items()
+    }
+)
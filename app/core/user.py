@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
 from fastapi import Depends, Request
 from fastapi_users import (
@@ -9,13 +9,45 @@ from fastapi_users.authentication import (
 )
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.user_cache import user_cache
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 
+# Доступ к пользователям через кэш: при попадании объект пользователя
+# собирается из сохранённых значений и присоединяется к сессии запроса
+# без SELECT (merge с load=False).
+class CachedUserDatabase(SQLAlchemyUserDatabase):
+
+    async def get(self, id: int) -> Optional[User]:
+        values = user_cache.get(id)
+        if values is not None:
+            user = User(**values)
+            make_transient_to_detached(user)
+            return await self.session.merge(user, load=False)
+        user = await super().get(id)
+        if user is not None:
+            user_cache.set(user)
+        return user
+
+    # Запись сбрасывается при любом изменении через адаптер. У удаления
+    # в UserManager нет хука on_after_*, а без сброса удалённый
+    # пользователь проходил бы аутентификацию до истечения TTL.
+    async def update(self, user: User, update_dict: dict[str, Any]) -> User:
+        user = await super().update(user, update_dict)
+        user_cache.invalidate(user.id)
+        return user
+
+    async def delete(self, user: User) -> None:
+        user_id = user.id
+        await super().delete(user)
+        user_cache.invalidate(user_id)
+
+
 # 2. Добавьте асинхронный генератор get_user_db.
 # Он обеспечивает доступ к БД через SQLAlchemy и в
 # дальнейшем будет использоваться в качестве
@@ -23,7 +55,7 @@ from app.schemas.user import UserCreate
 async def get_user_db(
         session: AsyncSession = Depends(get_async_session)
 ):
-    yield SQLAlchemyUserDatabase(session, User)
+    yield CachedUserDatabase(session, User)
 
 
 # 3. Добавьте компоненты, необходимые для построения
@@ -98,6 +130,26 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
             # Вместо print здесь можно было бы настроить отправку письма.
             print(f'Пользователь {user.email} зарегистрирован.')
 
+    # Сбрасываем кэш пользователя после изменения его данных:
+    # обновления профиля, деактивации, смены пароля и верификации.
+    async def on_after_update(
+            self,
+            user: User,
+            update_dict: dict[str, Any],
+            request: Optional[Request] = None,
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_reset_password(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
 
 # Корутина, возвращающая объект класса UserManager.
 async def get_user_manager(user_db=Depends(get_user_db)):
@@ -0,0 +1,63 @@
+"""
+Кэш записей пользователей для аутентификации запросов.
+
+Зависимости current_user / current_superuser на каждый запрос читают
+пользователя из базы по id из JWT. Кэш хранит значения столбцов
+пользователя ограниченное время (TTL) и ограниченное число записей (LRU),
+а UserManager сбрасывает запись при изменении пользователя.
+"""
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.user import User
+
+
+class UserCache:
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[dict]:
+        values = self._cache.get(user_id)
+        if values is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return values
+
+    def set(self, user: User) -> None:
+        self._cache[user.id] = {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+        }
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._cache),
+        }
+
+
+user_cache = UserCache(
+    maxsize=settings.user_cache_maxsize, ttl=settings.user_cache_ttl
+)
+
+# Статистика кэша в /metrics.
+registry.gauge(
+    'user_cache', 'Статистика кэша пользователей.', ('stat',)
+).set_function(
+    lambda: {(name,): value for name, value in user_cache.stats().items()}
+)
@@ -1,17 +1,52 @@
 # app/crud/base.py
-from typing import Optional
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+from sqlalchemy import delete, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.metrics import track_db_operations
 from app.models import User
 
 
+# Курсор - значения ключа сортировки последней отданной строки,
+# упакованные в JSON и base64, чтобы клиент передавал его как есть.
+def encode_cursor(values: Sequence) -> str:
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value)
+            if column.type.python_type is datetime
+            else column.type.python_type(value)
+            for column, value in zip(columns, values)
+        ]
+    except (TypeError, ValueError) as error:
+        raise ValueError('Некорректный курсор') from error
+
+
 class CRUDBase:
 
     def __init__(self, model):
         self.model = model
 
+    # SQL-запросы публичных методов наследников помечаются
+    # в метриках именем метода (app/core/metrics.py).
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        track_db_operations(cls)
+
     async def get(
             self,
             obj_id: int,
@@ -31,6 +66,53 @@ class CRUDBase:
         db_objs = await session.execute(select(self.model))
         return db_objs.scalars().all()
 
+    # Постраничная выборка по ключу (keyset): вместо OFFSET следующая
+    # страница начинается строго после ключа последней строки, поэтому
+    # стоимость запроса не растёт с номером страницы.
+    # С columns вместо объектов модели выбираются строки с этими
+    # столбцами (среди них должны быть столбцы order_by).
+    async def get_page(
+            self,
+            session: AsyncSession,
+            *whereclause,
+            limit: int,
+            cursor: Optional[str] = None,
+            order_by: Optional[Sequence] = None,
+            columns: Optional[Sequence] = None,
+    ) -> tuple[list, Optional[str]]:
+        """Возвращает страницу объектов и курсор следующей страницы."""
+        order_by = order_by or (self.model.id,)
+        select_stmt = (
+            select(*columns) if columns else select(self.model)
+        ).where(*whereclause)
+        if cursor is not None:
+            select_stmt = select_stmt.where(
+                tuple_(*order_by) > tuple_(*decode_cursor(cursor, order_by))
+            )
+        # Лишняя строка показывает, есть ли следующая страница.
+        db_objs = await session.execute(
+            select_stmt.order_by(*order_by).limit(limit + 1)
+        )
+        db_objs = db_objs.all() if columns else db_objs.scalars().all()
+        if len(db_objs) <= limit:
+            return db_objs, None
+        db_objs = db_objs[:limit]
+        next_cursor = encode_cursor(
+            [getattr(db_objs[-1], column.key) for column in order_by]
+        )
+        return db_objs, next_cursor
+
+    # Запись идёт одним запросом INSERT/UPDATE/DELETE ... RETURNING:
+    # база сразу возвращает строку, и перечитывать объект не нужно.
+    # Набор столбцов берётся из метаданных таблицы модели.
+    @property
+    def columns(self):
+        return self.model.__table__.columns
+
+    def _from_row(self, row):
+        """Объект модели из строки RETURNING (не привязан к сессии)."""
+        return self.model(**row._mapping)
+
     async def create(
             self,
             obj_in,
@@ -43,34 +125,89 @@ class CRUDBase:
         if user is not None:
             # ...то дополнить словарь для создания модели.
             obj_in_data['user_id'] = user.id
-        db_obj = self.model(**obj_in_data)
-        session.add(db_obj)
+        result = await session.execute(
+            insert(self.model).values(**obj_in_data).returning(*self.columns)
+        )
+        db_obj = self._from_row(result.one())
         await session.commit()
-        await session.refresh(db_obj)
         return db_obj
 
+    async def update_by_id(
+            self,
+            obj_id: int,
+            obj_in,
+            session: AsyncSession,
+            *whereclause,
+    ):
+        """Обновляет объект по id; None, если под условия он не попал."""
+        update_data = {
+            field: value
+            for field, value in obj_in.dict(exclude_unset=True).items()
+            if field in self.columns
+        }
+        if not update_data:
+            db_obj = await session.execute(
+                select(self.model).where(self.model.id == obj_id, *whereclause)
+            )
+            return db_obj.scalars().first()
+        result = await session.execute(
+            update(self.model)
+            .where(self.model.id == obj_id, *whereclause)
+            .values(**update_data)
+            .returning(*self.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        await session.commit()
+        return None if row is None else self._from_row(row)
+
     async def update(
             self,
             db_obj,
             obj_in,
             session: AsyncSession,
     ):
-        obj_data = jsonable_encoder(db_obj)
-        update_data = obj_in.dict(exclude_unset=True)
+        updated = await self.update_by_id(db_obj.id, obj_in, session)
+        if updated is None:
+            return db_obj
+        # Объект уже соответствует базе - не помечаем его изменённым.
+        for column in self.columns:
+            set_committed_value(
+                db_obj, column.key, getattr(updated, column.key)
+            )
+        return db_obj
 
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        session.add(db_obj)
+    async def remove_by_id(
+            self,
+            obj_id: int,
+            session: AsyncSession,
+            *whereclause,
+    ):
+        """Удаляет объект по id; None, если под условия он не попал."""
+        result = await session.execute(
+            delete(self.model)
+            .where(self.model.id == obj_id, *whereclause)
+            .returning(*self.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
         await session.commit()
-        await session.refresh(db_obj)
-        return db_obj
+        return None if row is None else self._from_row(row)
 
     async def remove(
             self,
             db_obj,
             session: AsyncSession,
     ):
-        await session.delete(db_obj)
+        await session.execute(
+            delete(self.model)
+            .where(self.model.id == db_obj.id)
+            .execution_options(synchronize_session=False)
+        )
+        if db_obj in session:
+            session.expunge(db_obj)
         await session.commit()
         return db_obj
+
+
+track_db_operations(CRUDBase)
@@ -2,15 +2,72 @@
 from typing import Optional
 
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
-from app.models.meeting_room import MeetingRoom
+from app.crud.reservation import reservation_crud
+from app.models.meeting_room import NAME_UNIQUE_NAME, MeetingRoom
+
+
+class MeetingRoomNameTaken(Exception):
+    """Имя переговорки уже занято (сработал UNIQUE в базе)."""
+
+
+# SQLite имени ограничения не сообщает - только таблицу и столбец.
+SQLITE_NAME_VIOLATION = 'UNIQUE constraint failed: meetingroom.name'
+
+
+def is_name_violation(error: IntegrityError) -> bool:
+    """Нарушено ли ограничение уникальности имени переговорки."""
+    orig = error.orig
+    # asyncpg: исходная ошибка драйвера - в __cause__ ошибки адаптера;
+    # psycopg2: имя ограничения - в diag.
+    constraint_name = getattr(
+        getattr(orig, '__cause__', None), 'constraint_name', None
+    ) or getattr(getattr(orig, 'diag', None), 'constraint_name', None)
+    if constraint_name is not None:
+        return constraint_name == NAME_UNIQUE_NAME
+    return str(orig) == SQLITE_NAME_VIOLATION
 
 
 # Создаем новый класс, унаследованный от CRUDBase.
 class CRUDMeetingRoom(CRUDBase):
 
+    # Имя заранее проверяется по кэшу каталога, но кэш другого воркера
+    # или ещё не устаревший кэш может не знать о новой переговорке.
+    # Окончательно уникальность проверяет база.
+    async def create(
+            self,
+            obj_in,
+            session: AsyncSession,
+            user=None,
+    ):
+        try:
+            return await super().create(obj_in, session, user)
+        except IntegrityError as error:
+            await session.rollback()
+            if not is_name_violation(error):
+                raise
+            raise MeetingRoomNameTaken from error
+
+    async def update_by_id(
+            self,
+            obj_id: int,
+            obj_in,
+            session: AsyncSession,
+            *whereclause,
+    ):
+        try:
+            return await super().update_by_id(
+                obj_id, obj_in, session, *whereclause
+            )
+        except IntegrityError as error:
+            await session.rollback()
+            if not is_name_violation(error):
+                raise
+            raise MeetingRoomNameTaken from error
+
     # Преобразуем функцию в метод класса.
     async def get_room_id_by_name(
             # Дописываем параметр self.
@@ -28,6 +85,22 @@ class CRUDMeetingRoom(CRUDBase):
         db_room_id = db_room_id.scalars().first()
         return db_room_id
 
+    # Брони и серии переговорки удаляются заранее двумя запросами
+    # вместо каскада ORM, который загружал бы их по одной. Индекс
+    # пересечений и кэши обновляются только после commit.
+    async def remove_by_id(
+            self,
+            obj_id: int,
+            session: AsyncSession,
+            *whereclause,
+    ):
+        removed = await reservation_crud.remove_for_room(obj_id, session)
+        meeting_room = await super().remove_by_id(
+            obj_id, session, *whereclause
+        )
+        reservation_crud.room_removed(obj_id, removed)
+        return meeting_room
+
 
 # Объект crud наследуем уже не от CRUDBase,
 # а от только что созданного класса CRUDMeetingRoom.
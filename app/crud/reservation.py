@@ -1,16 +1,368 @@
-from typing import Optional
+from typing import AsyncIterator, Callable, Optional, Sequence
 
 from datetime import datetime
+from itertools import chain
+
+import numpy as np
 from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, between, func, or_, select
+from sqlalchemy import (
+    and_, between, delete, insert, literal, or_, select, tuple_, union_all,
+    update
+)
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import BigInteger
 
+from app.core.conflict_index import RoomIntervals, conflict_index
+from app.core.db import begin_immediate
+from app.core.occupancy import occupancy_grids
+from app.core.timeline_cache import timeline_cache
 from app.crud.base import CRUDBase
-from app.models import Reservation, User
+from app.crud.room_daily_stats import StatsDelta, room_daily_stats_crud
+from app.models import (
+    Reservation, ReservationArchive, ReservationSeries, User
+)
+from app.models.reservation import EXCLUDE_OVERLAPS_NAME
+
+
+class ReservationConflictError(Exception):
+    """Бронь пересекается с уже существующими."""
+
+    def __init__(self, reservations: list[Reservation]):
+        super().__init__(str(reservations))
+        self.reservations = reservations
+
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    """Нарушено ли ограничение-исключение пересечений (PostgreSQL)."""
+    return EXCLUDE_OVERLAPS_NAME in str(error.orig)
+
+
+def overlap_exists(
+        meetingroom_id: int,
+        from_reserve: datetime,
+        to_reserve: datetime,
+        reservation_id: Optional[int] = None,
+):
+    """Подзапрос EXISTS: есть ли пересекающаяся бронь в переговорке."""
+    select_stmt = select(Reservation.id).where(
+        Reservation.meetingroom_id == meetingroom_id,
+        from_reserve <= Reservation.to_reserve,
+        to_reserve >= Reservation.from_reserve,
+    )
+    if reservation_id is not None:
+        select_stmt = select_stmt.where(Reservation.id != reservation_id)
+    return select_stmt.exists()
+
+
+class epoch_seconds(FunctionElement):
+    """Момент времени как число секунд с 1970-01-01 (вычисляет база)."""
+    type = BigInteger()
+    inherit_cache = True
+    name = 'epoch_seconds'
+
+
+@compiles(epoch_seconds, 'sqlite')
+def compile_epoch_seconds_sqlite(element, compiler, **kw):
+    return "CAST(strftime('%%s', %s) AS INTEGER)" % compiler.process(
+        element.clauses, **kw
+    )
+
+
+@compiles(epoch_seconds, 'postgresql')
+def compile_epoch_seconds_postgresql(element, compiler, **kw):
+    return 'CAST(EXTRACT(EPOCH FROM %s) AS BIGINT)' % compiler.process(
+        element.clauses, **kw
+    )
+
+
+def select_reservations(
+        keys: Sequence[str],
+        conditions: Sequence[Callable],
+        include_archived: bool = False,
+):
+    """
+    SELECT столбцов keys из reservation или, с include_archived,
+    UNION ALL reservation и reservation_archive. Условия - функции
+    от таблицы, чтобы одно условие применялось к обеим.
+    """
+    tables = [Reservation.__table__]
+    if include_archived:
+        tables.append(ReservationArchive.__table__)
+    selects = [
+        select(*(table.c[key] for key in keys)).where(
+            *(condition(table) for condition in conditions)
+        )
+        for table in tables
+    ]
+    return selects[0] if len(selects) == 1 else union_all(*selects)
+
+
+# Столбцы выгрузки бронирований (в порядке колонок CSV).
+EXPORT_COLUMNS = (
+    Reservation.id,
+    Reservation.meetingroom_id,
+    Reservation.user_id,
+    Reservation.from_reserve,
+    Reservation.to_reserve,
+)
 
 
 class CRUDReservation(CRUDBase):
 
+    # Счётчики room_daily_stats меняются в той же транзакции,
+    # что и брони, - до commit каждого пути записи.
+
+    # После записи в базу обновляем структуры в памяти процесса:
+    # индекс пересечений, сетки занятости и кэш расписаний переговорок.
+    @staticmethod
+    def _reservation_saved(
+            reservation: Reservation,
+            previous: Optional[tuple] = None,
+    ) -> None:
+        """previous - (id переговорки, начало, конец) до изменения."""
+        if previous is not None:
+            occupancy_grids.discard(*previous)
+            timeline_cache.invalidate_room(previous[0])
+        timeline_cache.invalidate_room(reservation.meetingroom_id)
+        conflict_index.add(
+            reservation.id,
+            reservation.meetingroom_id,
+            reservation.from_reserve,
+            reservation.to_reserve,
+        )
+        occupancy_grids.add(
+            reservation.meetingroom_id,
+            reservation.from_reserve,
+            reservation.to_reserve,
+        )
+
+    @staticmethod
+    def _reservation_removed(reservation_id: int, interval: tuple) -> None:
+        conflict_index.discard(reservation_id)
+        occupancy_grids.discard(*interval)
+        timeline_cache.invalidate_room(interval[0])
+
+    async def _raise_conflict(
+            self,
+            session: AsyncSession,
+            **kwargs,
+    ) -> None:
+        await session.rollback()
+        raise ReservationConflictError(
+            await self.get_reservations_at_the_same_time(
+                **kwargs, session=session
+            )
+        )
+
+    # Создание брони - одна условная вставка INSERT ... SELECT ...
+    # WHERE NOT EXISTS (пересечение) в транзакции для записи, поэтому
+    # проверка и вставка атомарны даже при параллельных запросах.
+    async def create(
+            self,
+            obj_in,
+            session: AsyncSession,
+            user: Optional[User] = None,
+    ):
+        obj_in_data = obj_in.dict()
+        if user is not None:
+            obj_in_data['user_id'] = user.id
+        columns = list(obj_in_data)
+        table = Reservation.__table__
+        insert_stmt = insert(Reservation).from_select(
+            columns,
+            select(*(
+                literal(obj_in_data[column], table.c[column].type)
+                for column in columns
+            )).where(~overlap_exists(
+                obj_in.meetingroom_id, obj_in.from_reserve, obj_in.to_reserve
+            )),
+        )
+        returning = session.bind.dialect.full_returning
+        if returning:
+            insert_stmt = insert_stmt.returning(Reservation.id)
+        await begin_immediate(session)
+        try:
+            result = await session.execute(insert_stmt)
+            if returning:
+                reservation_id = result.scalar()
+                inserted = reservation_id is not None
+            else:
+                inserted = result.rowcount
+                reservation_id = result.lastrowid
+            if inserted:
+                await room_daily_stats_crud.apply(StatsDelta().add(
+                    obj_in.meetingroom_id,
+                    obj_in.from_reserve,
+                    obj_in.to_reserve,
+                ), session)
+            await session.commit()
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            inserted = 0
+        if not inserted:
+            await self._raise_conflict(
+                session,
+                meetingroom_id=obj_in.meetingroom_id,
+                from_reserve=obj_in.from_reserve,
+                to_reserve=obj_in.to_reserve,
+            )
+        reservation = Reservation(id=reservation_id, **obj_in_data)
+        self._reservation_saved(reservation)
+        return reservation
+
+    # Изменение брони - условный UPDATE с той же проверкой пересечений.
+    # Прежние значения брони перечитываются в транзакции для записи:
+    # db_obj прочитан до неё, и параллельный PATCH мог его изменить.
+    # По этому снимку строятся поправка счётчиков и сброс сетки занятости.
+    # Если бронь успела удалиться, возвращается None.
+    async def update(
+            self,
+            db_obj,
+            obj_in,
+            session: AsyncSession,
+    ):
+        update_data = obj_in.dict(exclude_unset=True)
+        await begin_immediate(session)
+        previous = (await session.execute(
+            select(
+                Reservation.meetingroom_id,
+                Reservation.from_reserve,
+                Reservation.to_reserve,
+            ).where(Reservation.id == db_obj.id).with_for_update()
+        )).first()
+        if previous is None:
+            await session.rollback()
+            return None
+        previous = tuple(previous)
+        meetingroom_id = previous[0]
+        from_reserve = update_data.get('from_reserve', previous[1])
+        to_reserve = update_data.get('to_reserve', previous[2])
+        update_stmt = update(Reservation).where(
+            Reservation.id == db_obj.id,
+            ~overlap_exists(
+                meetingroom_id, from_reserve, to_reserve, db_obj.id
+            ),
+        ).values(**update_data).execution_options(synchronize_session=False)
+        try:
+            result = await session.execute(update_stmt)
+            updated = result.rowcount
+            if updated:
+                await room_daily_stats_crud.apply(
+                    StatsDelta()
+                    .remove(*previous)
+                    .add(meetingroom_id, from_reserve, to_reserve),
+                    session,
+                )
+            await session.commit()
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            updated = 0
+        if not updated:
+            await self._raise_conflict(
+                session,
+                meetingroom_id=meetingroom_id,
+                from_reserve=from_reserve,
+                to_reserve=to_reserve,
+                reservation_id=db_obj.id,
+            )
+        # Объект уже соответствует базе - не помечаем его изменённым.
+        set_committed_value(db_obj, 'meetingroom_id', meetingroom_id)
+        for field, value in update_data.items():
+            set_committed_value(db_obj, field, value)
+        self._reservation_saved(db_obj, previous)
+        return db_obj
+
+    async def remove(
+            self,
+            db_obj,
+            session: AsyncSession,
+    ):
+        await self.remove_by_id(db_obj.id, session)
+        if db_obj in session:
+            session.expunge(db_obj)
+        return db_obj
+
+    async def remove_by_id(
+            self,
+            obj_id: int,
+            session: AsyncSession,
+            *whereclause,
+    ):
+        result = await session.execute(
+            delete(Reservation)
+            .where(Reservation.id == obj_id, *whereclause)
+            .returning(*self.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None:
+            await session.commit()
+            return None
+        reservation = self._from_row(row)
+        interval = (
+            reservation.meetingroom_id,
+            reservation.from_reserve,
+            reservation.to_reserve,
+        )
+        await room_daily_stats_crud.apply(
+            StatsDelta().remove(*interval), session
+        )
+        await session.commit()
+        self._reservation_removed(reservation.id, interval)
+        return reservation
+
+    @classmethod
+    def room_removed(cls, meetingroom_id: int, removed: list[tuple]) -> None:
+        """Обновляет структуры в памяти после commit remove_for_room."""
+        for reservation_id, from_reserve, to_reserve in removed:
+            cls._reservation_removed(
+                reservation_id, (meetingroom_id, from_reserve, to_reserve)
+            )
+        timeline_cache.invalidate_room(meetingroom_id)
+
+    async def remove_for_room(
+            self,
+            meetingroom_id: int,
+            session: AsyncSession,
+    ) -> list[tuple]:
+        """Удаляет брони (и архивные), серии и счётчики переговорки
+        без commit.
+
+        Возвращает удалённые брони (id, начало, конец). Структуры
+        в памяти не трогаются: после успешного commit вызывающий
+        передаёт результат в room_removed, а при откате индекс
+        пересечений по-прежнему знает о брони.
+        """
+        result = await session.execute(
+            delete(Reservation)
+            .where(Reservation.meetingroom_id == meetingroom_id)
+            .returning(
+                Reservation.id,
+                Reservation.from_reserve,
+                Reservation.to_reserve,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        removed = result.all()
+        await session.execute(
+            delete(ReservationArchive)
+            .where(ReservationArchive.meetingroom_id == meetingroom_id)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            delete(ReservationSeries)
+            .where(ReservationSeries.meetingroom_id == meetingroom_id)
+            .execution_options(synchronize_session=False)
+        )
+        await room_daily_stats_crud.remove_for_room(meetingroom_id, session)
+        return removed
+
     async def get_reservations_at_the_same_time(
             self,
             # Добавляем звёздочку, чтобы обозначить, что все дальнейшие параметры
@@ -24,6 +376,15 @@ class CRUDReservation(CRUDBase):
             reservation_id: Optional[int] = None,
             session: AsyncSession,
     ) -> list[Reservation]:
+        # Если индекс в памяти не нашёл пересечений, слот свободен
+        # и запрос к базе не нужен: индекс загружен только в единственном
+        # процессе приложения (ConflictIndex.acquire) и видит все записи.
+        # Найденные пересечения (и любые проверки при выключенном индексе)
+        # подтверждаются SQL-запросом.
+        if conflict_index.ready and not conflict_index.overlaps(
+            meetingroom_id, from_reserve, to_reserve, reservation_id
+        ):
+            return []
         # Выносим уже существующий запрос в отдельное выражение.
         select_stmt = select(Reservation).where(
                 Reservation.meetingroom_id == meetingroom_id,
@@ -44,6 +405,224 @@ class CRUDReservation(CRUDBase):
         reservations = reservations.scalars().all()
         return reservations
 
+    # Пересечения сразу для набора будущих броней: один запрос вместо
+    # отдельного get_reservations_at_the_same_time на каждую.
+    async def get_intersections_for_many(
+            self,
+            items: list,
+            session: AsyncSession,
+    ) -> dict[int, list[Reservation]]:
+        """Возвращает {позиция в items: пересекающиеся брони}."""
+        to_check = [
+            (position, item) for position, item in enumerate(items)
+            if not conflict_index.ready or conflict_index.overlaps(
+                item.meetingroom_id, item.from_reserve, item.to_reserve
+            )
+        ]
+        if not to_check:
+            return {}
+        reservations = await session.execute(
+            select(Reservation).where(or_(*(
+                and_(
+                    Reservation.meetingroom_id == item.meetingroom_id,
+                    item.from_reserve <= Reservation.to_reserve,
+                    item.to_reserve >= Reservation.from_reserve,
+                )
+                for _, item in to_check
+            )))
+        )
+        reservations = reservations.scalars().all()
+        # Раскладываем найденные брони обратно по элементам.
+        by_id = {reservation.id: reservation for reservation in reservations}
+        rooms: dict[int, RoomIntervals] = {}
+        for reservation in reservations:
+            rooms.setdefault(reservation.meetingroom_id, RoomIntervals()).add(
+                reservation.id, reservation.from_reserve, reservation.to_reserve
+            )
+        intersections = {}
+        for position, item in to_check:
+            room = rooms.get(item.meetingroom_id)
+            if room is None:
+                continue
+            found = room.overlaps(item.from_reserve, item.to_reserve)
+            if found:
+                intersections[position] = [by_id[key] for key in found]
+        return intersections
+
+    # Создание набора броней одним executemany в одной транзакции.
+    async def create_many(
+            self,
+            items: list,
+            session: AsyncSession,
+            user: User,
+    ) -> list[Reservation]:
+        if not items:
+            return []
+        user_id = user.id
+        rows = [dict(item.dict(), user_id=user_id) for item in items]
+        # Пары (переговорка, начало) уникальны: брони в одной переговорке
+        # не пересекаются, — по ним и забираем созданные строки с id.
+        return await self._insert_many(
+            rows,
+            session,
+            Reservation.user_id == user_id,
+            tuple_(
+                Reservation.meetingroom_id, Reservation.from_reserve
+            ).in_([(row['meetingroom_id'], row['from_reserve'])
+                   for row in rows]),
+        )
+
+    # Создание серии и всех её вхождений в одной транзакции.
+    async def create_series(
+            self,
+            series_in,
+            starts: list[datetime],
+            ends: list[datetime],
+            session: AsyncSession,
+            user: User,
+    ) -> tuple[ReservationSeries, list[Reservation]]:
+        recurrence = series_in.recurrence
+        series = ReservationSeries(
+            from_reserve=series_in.from_reserve,
+            to_reserve=series_in.to_reserve,
+            meetingroom_id=series_in.meetingroom_id,
+            user_id=user.id,
+            freq=recurrence.freq.value,
+            interval=recurrence.interval,
+            weekdays=(
+                None if recurrence.weekdays is None
+                else ','.join(map(str, recurrence.weekdays))
+            ),
+            until=recurrence.until,
+            count=recurrence.count,
+        )
+        session.add(series)
+        # Получаем id серии, не завершая транзакцию.
+        await session.flush()
+        series_id = series.id
+        rows = [
+            {
+                'from_reserve': start,
+                'to_reserve': end,
+                'meetingroom_id': series.meetingroom_id,
+                'user_id': series.user_id,
+                'series_id': series_id,
+            }
+            for start, end in zip(starts, ends)
+        ]
+        reservations = await self._insert_many(
+            rows, session, Reservation.series_id == series_id
+        )
+        return series, reservations
+
+    async def _insert_many(
+            self,
+            rows: list[dict],
+            session: AsyncSession,
+            *whereclause,
+    ) -> list[Reservation]:
+        """
+        Вставляет строки одним executemany и читает их обратно.
+        Проверка пересечений и вставка должны идти в одной транзакции,
+        открытой begin_immediate.
+        """
+        delta = StatsDelta()
+        for row in rows:
+            delta.add(
+                row['meetingroom_id'], row['from_reserve'], row['to_reserve']
+            )
+        try:
+            await session.execute(insert(Reservation), rows)
+            await room_daily_stats_crud.apply(delta, session)
+            await session.commit()
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            await session.rollback()
+            raise ReservationConflictError([])
+        reservations = await session.execute(
+            select(Reservation).where(*whereclause).order_by(Reservation.id)
+        )
+        reservations = reservations.scalars().all()
+        for reservation in reservations:
+            self._reservation_saved(reservation)
+        return reservations
+
+    # Начала и окончания броней переговорки, задевающих интервал,
+    # как столбцы - без создания ORM-объектов.
+    async def get_intervals_for_room(
+            self,
+            room_id: int,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            session: AsyncSession,
+    ) -> tuple[list[datetime], list[datetime]]:
+        intervals = await session.execute(
+            select(Reservation.from_reserve, Reservation.to_reserve).where(
+                Reservation.meetingroom_id == room_id,
+                from_reserve <= Reservation.to_reserve,
+                to_reserve >= Reservation.from_reserve,
+            )
+        )
+        intervals = intervals.all()
+        return (
+            [start for start, _ in intervals],
+            [end for _, end in intervals],
+        )
+
+    # Брони, задевающие интервал, как столбцы NumPy для аналитики:
+    # id переговорки, начало и окончание в секундах с 1970-01-01.
+    # Даты переводит в числа сама база, запрос идёт мимо ORM,
+    # а строки сразу укладываются в один массив int64.
+    # Прошедшие периоды лежат в архиве, поэтому читаются обе таблицы.
+    async def get_interval_arrays(
+            self,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            session: AsyncSession,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        connection = await session.connection()
+        result = await connection.execute(union_all(*(
+            select(
+                table.c.meetingroom_id,
+                epoch_seconds(table.c.from_reserve),
+                epoch_seconds(table.c.to_reserve),
+            ).where(
+                table.c.to_reserve > from_reserve,
+                table.c.from_reserve < to_reserve,
+            )
+            for table in (Reservation.__table__, ReservationArchive.__table__)
+        )))
+        rows = result.all()
+        columns = np.fromiter(
+            chain.from_iterable(rows), dtype=np.int64, count=3 * len(rows)
+        ).reshape(len(rows), 3)
+        return columns[:, 0], columns[:, 1], columns[:, 2]
+
+    # Расписание переговорки: брони, задевающие окно, по времени начала,
+    # строками со столбцами keys.
+    async def get_for_room_window(
+            self,
+            room_id: int,
+            from_reserve: datetime,
+            to_reserve: Optional[datetime],
+            session: AsyncSession,
+            keys: Sequence[str],
+    ) -> list[tuple]:
+        """Брони, задевающие окно; без to_reserve - окно без конца."""
+        select_stmt = select(
+            *(Reservation.__table__.c[key] for key in keys)
+        ).where(
+            Reservation.meetingroom_id == room_id,
+            Reservation.to_reserve > from_reserve,
+        ).order_by(Reservation.from_reserve)
+        if to_reserve is not None:
+            select_stmt = select_stmt.where(
+                Reservation.from_reserve < to_reserve
+            )
+        reservations = await session.execute(select_stmt)
+        return reservations.all()
+
     # получить объекты резервации конкретной переговорки
     async def get_future_reservations_for_room(
             self,
@@ -59,12 +638,88 @@ class CRUDReservation(CRUDBase):
         reservations = reservations.scalars().all()
         return reservations
 
-    # Получение объектов бронирования определённого пользователя
+    # Страница бронирований с фильтрами по переговорке, пользователю
+    # и интервалу времени; порядок - по началу брони. С keys - строки
+    # с этими столбцами (среди них from_reserve и id) вместо объектов.
+    async def get_filtered_page(
+            self,
+            session: AsyncSession,
+            *,
+            limit: int,
+            cursor: Optional[str] = None,
+            meetingroom_id: Optional[int] = None,
+            user_id: Optional[int] = None,
+            from_reserve: Optional[datetime] = None,
+            to_reserve: Optional[datetime] = None,
+            keys: Optional[Sequence[str]] = None,
+    ) -> tuple[list, Optional[str]]:
+        whereclause = []
+        if meetingroom_id is not None:
+            whereclause.append(Reservation.meetingroom_id == meetingroom_id)
+        if user_id is not None:
+            whereclause.append(Reservation.user_id == user_id)
+        # Брони, хотя бы частично попадающие в интервал.
+        if from_reserve is not None:
+            whereclause.append(Reservation.to_reserve >= from_reserve)
+        if to_reserve is not None:
+            whereclause.append(Reservation.from_reserve <= to_reserve)
+        return await self.get_page(
+            session,
+            *whereclause,
+            limit=limit,
+            cursor=cursor,
+            order_by=(Reservation.from_reserve, Reservation.id),
+            columns=None if keys is None else [
+                Reservation.__table__.c[key] for key in keys
+            ],
+        )
+
+    # Потоковая выборка бронирований для выгрузки: строки приходят
+    # пачками через серверный курсор в виде кортежей столбцов,
+    # ORM-объекты не создаются и весь результат в памяти не собирается.
+    async def stream_rows(
+            self,
+            session: AsyncSession,
+            from_reserve: Optional[datetime] = None,
+            to_reserve: Optional[datetime] = None,
+            batch_size: int = 1000,
+            include_archived: bool = False,
+    ) -> AsyncIterator[list[tuple]]:
+        conditions = []
+        if from_reserve is not None:
+            conditions.append(lambda table: table.c.to_reserve >= from_reserve)
+        if to_reserve is not None:
+            conditions.append(lambda table: table.c.from_reserve <= to_reserve)
+        select_stmt = select_reservations(
+            [column.key for column in EXPORT_COLUMNS],
+            conditions,
+            include_archived,
+        )
+        select_stmt = select_stmt.order_by(select_stmt.selected_columns.id)
+        result = await session.stream(
+            select_stmt.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+    # Получение объектов бронирования определённого пользователя.
+    # С include_archived к ним добавляются архивные брони - строками
+    # с теми же полями, а не ORM-объектами. С keys - строки только
+    # с этими столбцами.
     async def get_by_user(
             self,
             user: User,
-            session: AsyncSession
+            session: AsyncSession,
+            include_archived: bool = False,
+            keys: Optional[Sequence[str]] = None,
     ):
+        if include_archived or keys:
+            reservations = await session.execute(select_reservations(
+                keys or [column.key for column in self.columns],
+                [lambda table: table.c.user_id == user.id],
+                include_archived=include_archived,
+            ))
+            return reservations.all()
         reservations = await session.execute(
             select(Reservation).where(
                 Reservation.user_id == user.id
@@ -73,24 +728,52 @@ class CRUDReservation(CRUDBase):
         reservations = reservations.scalars().all()
         return reservations
 
+    # Перенос пачки прошедших броней в reservation_archive: DELETE ...
+    # RETURNING и вставка тех же строк в архив в одной транзакции.
+    # Счётчики room_daily_stats не меняются - отчёты учитывают
+    # и архивные брони.
+    async def archive_batch(
+            self,
+            cutoff: datetime,
+            batch_size: int,
+            session: AsyncSession,
+    ) -> int:
+        """Архивирует до batch_size броней, закончившихся до cutoff."""
+        old_ids = select(Reservation.id).where(
+            Reservation.to_reserve < cutoff
+        ).order_by(Reservation.id).limit(batch_size)
+        await begin_immediate(session)
+        result = await session.execute(
+            delete(Reservation)
+            .where(Reservation.id.in_(old_ids.scalar_subquery()))
+            .returning(*self.columns)
+            .execution_options(synchronize_session=False)
+        )
+        rows = [dict(row._mapping) for row in result.all()]
+        if rows:
+            await session.execute(insert(ReservationArchive), rows)
+        await session.commit()
+        # С новыми бронями прошедшие уже не пересекутся.
+        for row in rows:
+            conflict_index.discard(row['id'])
+            timeline_cache.invalidate_room(row['meetingroom_id'])
+        return len(rows)
+
     # собрать данные о том, сколько раз за указанный
     # период была забронирована каждая переговорка.
+    # Данные берутся из счётчиков room_daily_stats с точностью до дня:
+    # учитываются брони, начавшиеся с дня from_reserve по день to_reserve
+    # включительно, а стоимость запроса зависит от числа дней
+    # и переговорок, а не броней.
     async def get_count_res_at_the_same_time(
             self,
             from_reserve: datetime,
             to_reserve: datetime,
             session: AsyncSession,
     ) -> list[dict[str, int]]:
-        reservations = await session.execute(
-            # Получаем количество бронирований переговорок за период
-            select([Reservation.meetingroom_id,
-                    func.count(Reservation.meetingroom_id)]).where(
-                Reservation.from_reserve >= from_reserve,
-                Reservation.to_reserve <= to_reserve
-            ).group_by(Reservation.meetingroom_id)
-        )
-        reservations = reservations.all()
-        return reservations
+        return await room_daily_stats_crud.get_totals(
+            from_reserve.date(), to_reserve.date(), session
+        )
 
 
 reservation_crud = CRUDReservation(Reservation)
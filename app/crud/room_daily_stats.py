@@ -0,0 +1,186 @@
+# app/crud/room_daily_stats.py
+from datetime import date, datetime, time, timedelta
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import begin_immediate
+from app.crud.base import CRUDBase
+from app.models import Reservation, ReservationArchive, RoomDailyStats
+
+
+def split_by_day(
+        from_reserve: datetime,
+        to_reserve: datetime,
+) -> Iterable[tuple[date, int]]:
+    """Делит бронь на части по дням: (день, занятые минуты)."""
+    start = from_reserve
+    while True:
+        next_day = datetime.combine(start.date() + timedelta(days=1), time())
+        end = min(to_reserve, next_day)
+        yield start.date(), round((end - start).total_seconds() / 60)
+        if to_reserve <= next_day:
+            return
+        start = next_day
+
+
+class StatsDelta:
+    """
+    Изменения счётчиков room_daily_stats от записи броней:
+    {(id переговорки, день): [число броней, минуты]}.
+    Бронь засчитывается дню начала, минуты - каждому дню, который она
+    занимает.
+    """
+
+    def __init__(self):
+        self.changes: dict[tuple[int, date], list[int]] = {}
+
+    def add(
+            self,
+            meetingroom_id: int,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            sign: int = 1,
+    ) -> 'StatsDelta':
+        first = True
+        for day, minutes in split_by_day(from_reserve, to_reserve):
+            change = self.changes.setdefault((meetingroom_id, day), [0, 0])
+            change[0] += sign * first
+            change[1] += sign * minutes
+            first = False
+        return self
+
+    def remove(
+            self,
+            meetingroom_id: int,
+            from_reserve: datetime,
+            to_reserve: datetime,
+    ) -> 'StatsDelta':
+        return self.add(meetingroom_id, from_reserve, to_reserve, sign=-1)
+
+    def rows(self) -> list[dict]:
+        return [
+            {
+                'meetingroom_id': meetingroom_id,
+                'day': day,
+                'count': count,
+                'booked_minutes': minutes,
+            }
+            for (meetingroom_id, day), (count, minutes)
+            in self.changes.items()
+            if count or minutes
+        ]
+
+
+class CRUDRoomDailyStats(CRUDBase):
+
+    # Счётчики меняются одним executemany с INSERT ... ON CONFLICT
+    # DO UPDATE: строка дня создаётся при первой брони, а параллельные
+    # транзакции прибавляют свои изменения, не перезаписывая чужие.
+    async def apply(
+            self,
+            delta: StatsDelta,
+            session: AsyncSession,
+    ) -> None:
+        """Прибавляет изменения к счётчикам без commit."""
+        rows = delta.rows()
+        if not rows:
+            return
+        dialect = (
+            postgresql if session.bind.dialect.name == 'postgresql'
+            else sqlite
+        )
+        insert_stmt = dialect.insert(RoomDailyStats)
+        await session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[
+                    RoomDailyStats.meetingroom_id, RoomDailyStats.day
+                ],
+                set_={
+                    'count': RoomDailyStats.count + insert_stmt.excluded.count,
+                    'booked_minutes': (
+                        RoomDailyStats.booked_minutes
+                        + insert_stmt.excluded.booked_minutes
+                    ),
+                },
+            ),
+            rows,
+        )
+
+    async def remove_for_room(
+            self,
+            meetingroom_id: int,
+            session: AsyncSession,
+    ) -> None:
+        """Удаляет счётчики переговорки без commit."""
+        await session.execute(
+            delete(RoomDailyStats)
+            .where(RoomDailyStats.meetingroom_id == meetingroom_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Полный пересчёт из таблиц броней - после миграции, ручной правки
+    # базы или для проверки. Брони читаются пачками, в памяти остаются
+    # только счётчики (переговорки x дни).
+    async def rebuild(
+            self,
+            session: AsyncSession,
+            batch_size: int = 10000,
+    ) -> int:
+        """Пересчитывает таблицу; возвращает число строк счётчиков."""
+        await begin_immediate(session)
+        delta = StatsDelta()
+        # Архивные брони тоже входят в счётчики.
+        result = await session.stream(
+            union_all(*(
+                select(
+                    table.c.meetingroom_id,
+                    table.c.from_reserve,
+                    table.c.to_reserve,
+                )
+                for table in (
+                    Reservation.__table__, ReservationArchive.__table__
+                )
+            )).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            for meetingroom_id, from_reserve, to_reserve in partition:
+                delta.add(meetingroom_id, from_reserve, to_reserve)
+        rows = delta.rows()
+        await session.execute(delete(RoomDailyStats))
+        if rows:
+            await session.execute(insert(RoomDailyStats), rows)
+        await session.commit()
+        return len(rows)
+
+    # Число броней и занятые минуты по переговоркам за дни периода:
+    # запрос читает не больше (переговорки x дни) строк,
+    # сколько бы броней ни было.
+    async def get_totals(
+            self,
+            from_day: date,
+            to_day: date,
+            session: AsyncSession,
+    ):
+        totals = await session.execute(
+            select(
+                RoomDailyStats.meetingroom_id,
+                func.sum(RoomDailyStats.count).label('count'),
+                func.sum(RoomDailyStats.booked_minutes).label(
+                    'booked_minutes'
+                ),
+            ).where(
+                RoomDailyStats.day >= from_day,
+                RoomDailyStats.day <= to_day,
+            ).group_by(
+                RoomDailyStats.meetingroom_id
+            ).having(
+                func.sum(RoomDailyStats.count) > 0
+            ).order_by(RoomDailyStats.meetingroom_id)
+        )
+        return totals.all()
+
+
+room_daily_stats_crud = CRUDRoomDailyStats(RoomDailyStats)
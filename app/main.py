@@ -1,20 +1,88 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.api.routers import main_router
 from app.core.config import settings
+from app.core.conflict_index import conflict_index
+from app.core.db import AsyncSessionLocal
+from app.core.events import event_hub
+from app.core.google_client import google_client
+from app.core.metrics import MetricsMiddleware
+from app.core.query_budget import QueryBudgetMiddleware
+from app.crud.meeting_room import MeetingRoomNameTaken
+from app.crud.reservation import ReservationConflictError
+from app.services.archive import reservation_archiver
+from app.services.report_jobs import report_jobs
 # Импортируем корутину для создания первого суперюзера.
 from app.core.init_db import create_first_superuser
 
 
 app = FastAPI(
     title=settings.app_title,
-    description=settings.description
+    description=settings.description,
+    # Ответы кодируются в JSON через orjson. Большие списки эндпоинты
+    # собирают сами из строк столбцов (app/core/serialization.py).
+    default_response_class=ORJSONResponse,
 )
 
 # Подключаем главный роутер.
 app.include_router(main_router)
+# Время и статусы запросов по маршрутам для /metrics.
+app.add_middleware(MetricsMiddleware)
+if settings.query_budget_enabled:
+    # Подсчёт SQL-запросов на HTTP-запрос (режим разработки и тестов).
+    app.add_middleware(QueryBudgetMiddleware)
+
+
+# Пересечение, найденное при атомарной записи брони, отдаём тем же
+# ответом 422, что и проверка check_reservation_intersections.
+@app.exception_handler(ReservationConflictError)
+async def reservation_conflict_handler(
+        request: Request, exc: ReservationConflictError
+):
+    return JSONResponse(
+        status_code=422,
+        content={
+            'detail': str(exc.reservations) if exc.reservations
+            else 'Это время уже забронировано, повторите попытку'
+        },
+    )
+
+
+# Имя, занятое мимо кэша каталога (другой воркер), - тот же ответ 422,
+# что и у проверки check_name_duplicate.
+@app.exception_handler(MeetingRoomNameTaken)
+async def meeting_room_name_taken_handler(
+        request: Request, exc: MeetingRoomNameTaken
+):
+    return JSONResponse(
+        status_code=422,
+        content={'detail': 'Переговорка с таким именем уже существует!'},
+    )
+
 
 # При старте приложения запускаем корутину create_first_superuser.
 @app.on_event('startup')
 async def startup():
     await create_first_superuser()
+    if settings.conflict_index_enabled:
+        # Индекс доверяет своим промахам, поэтому допустим только в одном
+        # процессе: второй воркер упадёт здесь с ConflictIndexLocked.
+        conflict_index.acquire(settings.conflict_index_lock_file)
+        # Загружаем бронирования в индекс пересечений.
+        async with AsyncSessionLocal() as session:
+            await conflict_index.load(session)
+    # Воркеры фоновых задач отчётов.
+    report_jobs.start()
+    # Периодический перенос прошедших броней в архив.
+    reservation_archiver.start()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    await reservation_archiver.stop()
+    await event_hub.stop()
+    await report_jobs.stop()
+    conflict_index.release()
+    # HTTP-сессия клиента Google открывается при первом отчёте.
+    await google_client.close()
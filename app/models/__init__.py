@@ -1,3 +1,6 @@
 from .meeting_room import MeetingRoom # noqa
 from .reservation import Reservation # noqa
-from .user import User # noqa
\ No newline at end of file
+from .reservation_archive import ReservationArchive # noqa
+from .reservation_series import ReservationSeries # noqa
+from .room_daily_stats import RoomDailyStats # noqa
+from .user import User # noqa
@@ -1,12 +1,19 @@
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, UniqueConstraint
 # импорт функции для связи между моделями
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
 
+# Имя ограничения уникальности имени: по нему CRUDMeetingRoom
+# отличает повтор имени от других ошибок целостности.
+NAME_UNIQUE_NAME = 'uq_meetingroom_name'
+
 
 class MeetingRoom(Base):
-    name = Column(String(100), unique=True, nullable=False)
+    name = Column(String(100), nullable=False)
     description = Column(Text)
     # Установите связь между моделями через функцию relationship.
     reservations = relationship('Reservation', cascade='delete')
+    reservation_series = relationship('ReservationSeries', cascade='delete')
+
+    __table_args__ = (UniqueConstraint('name', name=NAME_UNIQUE_NAME),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, event
 
 from app.core.db import Base
 
@@ -9,8 +9,49 @@ class Reservation(Base):
     # Столбец с внешним ключом: ссылка на таблицу meetingroom.
     meetingroom_id = Column(Integer, ForeignKey('meetingroom.id'))
     user_id = Column(Integer, ForeignKey('user.id'))
+    # Серия, к которой относится бронь, если она повторяющаяся.
+    series_id = Column(Integer, ForeignKey('reservationseries.id'))
+
+    # Составные индексы под «горячие» запросы CRUDReservation:
+    # - поиск пересечений бронирований в переговорке;
+    # - будущие бронирования переговорки;
+    # - бронирования пользователя.
+    __table_args__ = (
+        Index(
+            'ix_reservation_room_from_to',
+            'meetingroom_id', 'from_reserve', 'to_reserve'
+        ),
+        Index('ix_reservation_room_to', 'meetingroom_id', 'to_reserve'),
+        Index('ix_reservation_user_from', 'user_id', 'from_reserve'),
+        # id не переиспользуются в SQLite, даже если архиватор перенёс
+        # все брони: иначе новая бронь получила бы id архивной.
+        {'sqlite_autoincrement': True},
+    )
 
     def __repr__(self):
         return (
             f'Уже забронировано с {self.from_reserve} по {self.to_reserve}'
         )
+
+
+# В PostgreSQL пересечения броней одной переговорки запрещены на уровне
+# базы: ограничение-исключение по (переговорка, tsrange). Границы
+# включительные, как в проверке CRUDReservation.
+EXCLUDE_OVERLAPS_NAME = 'reservation_no_overlap'
+
+event.listen(
+    Reservation.__table__,
+    'after_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(
+        dialect='postgresql'
+    ),
+)
+event.listen(
+    Reservation.__table__,
+    'after_create',
+    DDL(
+        f'ALTER TABLE reservation ADD CONSTRAINT {EXCLUDE_OVERLAPS_NAME} '
+        'EXCLUDE USING gist (meetingroom_id WITH =, '
+        "tsrange(from_reserve, to_reserve, '[]') WITH &&)"
+    ).execute_if(dialect='postgresql'),
+)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from app.core.db import Base
+
+
+# Прошедшие брони, перенесённые из reservation архиватором
+# (app/services/archive.py). id сохраняется прежним, поэтому архивная
+# бронь отдаётся клиентам с тем же id, что и до переноса.
+class ReservationArchive(Base):
+    __tablename__ = 'reservation_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    from_reserve = Column(DateTime)
+    to_reserve = Column(DateTime)
+    meetingroom_id = Column(Integer, ForeignKey('meetingroom.id'))
+    user_id = Column(Integer, ForeignKey('user.id'))
+    series_id = Column(Integer, ForeignKey('reservationseries.id'))
+
+    __table_args__ = (
+        Index(
+            'ix_reservation_archive_user_from', 'user_id', 'from_reserve'
+        ),
+        Index('ix_reservation_archive_room', 'meetingroom_id'),
+    )
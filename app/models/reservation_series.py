@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.core.db import Base
+
+
+# Повторяющееся бронирование. Сами вхождения серии хранятся
+# обычными строками Reservation со ссылкой series_id.
+class ReservationSeries(Base):
+    # Первое вхождение серии.
+    from_reserve = Column(DateTime, nullable=False)
+    to_reserve = Column(DateTime, nullable=False)
+    meetingroom_id = Column(Integer, ForeignKey('meetingroom.id'))
+    user_id = Column(Integer, ForeignKey('user.id'))
+    # Правило повторения: daily/weekly, шаг, дни недели (0 - понедельник),
+    # и одно из ограничений - дата окончания или число вхождений.
+    freq = Column(String(10), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    weekdays = Column(String(13))
+    until = Column(DateTime)
+    count = Column(Integer)
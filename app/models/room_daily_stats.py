@@ -0,0 +1,29 @@
+from sqlalchemy import (
+    Column, Date, ForeignKey, Index, Integer, UniqueConstraint
+)
+
+from app.core.db import Base
+
+
+# Счётчики бронирований переговорки по дням. Их поддерживает
+# CRUDReservation в той же транзакции, что и запись брони, поэтому
+# отчёты читают эту таблицу, а не пересчитывают таблицу броней.
+class RoomDailyStats(Base):
+    __tablename__ = 'room_daily_stats'
+
+    meetingroom_id = Column(
+        Integer, ForeignKey('meetingroom.id'), nullable=False
+    )
+    day = Column(Date, nullable=False)
+    # Число броней, начинающихся в этот день.
+    count = Column(Integer, nullable=False, default=0)
+    # Сколько минут этого дня переговорка занята (бронь через полночь
+    # делится между днями).
+    booked_minutes = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'meetingroom_id', 'day', name='uq_room_daily_stats_room_day'
+        ),
+        Index('ix_room_daily_stats_day', 'day'),
+    )
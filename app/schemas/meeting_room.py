@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, Field, validator
@@ -39,3 +40,25 @@ class MeetingRoomUpdate(MeetingRoomBase):
         if value is None:
             raise ValueError('Поле не может быть пустым')
         return value
+
+
+# свободные слоты переговорки
+class RoomAvailability(BaseModel):
+    meetingroom_id: int
+    # Моменты, с которых слот нужной длительности свободен.
+    starts: list[datetime]
+
+
+# загрузка переговорок за период; списки идут в порядке room_ids
+class RoomAnalytics(BaseModel):
+    room_ids: list[int]
+    # Доля занятых минут по часам недели (0 - понедельник 00:00-01:00),
+    # строка на переговорку.
+    occupancy: list[list[float]]
+    booked_minutes: list[int]
+    # Доля занятых минут за весь период.
+    utilization: list[float]
+    # Самые загруженные часы недели, по убыванию загрузки.
+    peak_hours: list[int]
+    # Переговорки без единой брони за период.
+    idle_rooms: list[int]
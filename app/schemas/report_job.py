@@ -0,0 +1,30 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# состояние задачи формирования отчёта
+class ReportJobStatus(str, Enum):
+    queued = 'queued'
+    running = 'running'
+    done = 'done'
+    failed = 'failed'
+
+
+# задача отчёта в ответах POST /google/ и GET /google/jobs/{job_id}
+class ReportJobDB(BaseModel):
+    id: str
+    status: ReportJobStatus
+    from_reserve: datetime
+    to_reserve: datetime
+    # Заполняется, когда таблица создана.
+    spreadsheet_id: Optional[str]
+    attempts: int
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Optional
 from datetime import datetime, timedelta
 
@@ -63,3 +64,125 @@ class ReservationDB(ReservationBase):
 
     class Config:
         orm_mode = True
+
+
+# Максимальное число вхождений одной серии бронирований.
+MAX_OCCURRENCES = 500
+
+
+# частота повторения бронирования
+class RecurrenceFrequency(str, Enum):
+    daily = 'daily'
+    weekly = 'weekly'
+
+
+# правило повторения (упрощённый RRULE)
+class Recurrence(BaseModel):
+    freq: RecurrenceFrequency
+    # Каждый interval-й день или неделя.
+    interval: int = Field(1, ge=1, le=52)
+    # Дни недели для weekly: 0 - понедельник, 6 - воскресенье.
+    # По умолчанию - день недели первого вхождения.
+    weekdays: Optional[list[int]]
+    until: Optional[datetime]
+    count: Optional[int] = Field(None, ge=1, le=MAX_OCCURRENCES)
+
+    class Config:
+        extra = Extra.forbid
+
+    @validator('weekdays')
+    def check_weekdays(cls, value: Optional[list[int]]):
+        if value is None:
+            return value
+        if not value or any(day not in range(7) for day in value):
+            raise ValueError('Дни недели задаются числами от 0 до 6')
+        return sorted(set(value))
+
+    @root_validator(skip_on_failure=True)
+    def check_until_or_count(cls, values):
+        if (values['until'] is None) == (values['count'] is None):
+            raise ValueError(
+                'Укажите либо дату окончания (until), либо число повторов'
+                ' (count)'
+            )
+        if (values['weekdays'] is not None
+                and values['freq'] != RecurrenceFrequency.weekly):
+            raise ValueError('Дни недели задаются только для weekly')
+        return values
+
+
+# схема для создания повторяющегося бронирования:
+# from_reserve и to_reserve задают первое вхождение серии
+class ReservationSeriesCreate(ReservationCreate):
+    recurrence: Recurrence
+
+    @root_validator(skip_on_failure=True)
+    def check_until_after_start(cls, values):
+        until = values['recurrence'].until
+        if until is not None and until < values['from_reserve']:
+            raise ValueError(
+                'Дата окончания серии не может быть раньше первого вхождения'
+            )
+        return values
+
+    # Первое вхождение - само from_reserve, поэтому оно должно приходиться
+    # на один из дней недели серии, иначе его пришлось бы молча сдвинуть.
+    @root_validator(skip_on_failure=True)
+    def check_start_on_weekday(cls, values):
+        weekdays = values['recurrence'].weekdays
+        if (weekdays is not None
+                and values['from_reserve'].weekday() not in weekdays):
+            raise ValueError(
+                'Начало серии должно приходиться на один из дней weekdays'
+            )
+        return values
+
+
+# схема для возврата серии из БД вместе с её вхождениями
+class ReservationSeriesDB(ReservationBase):
+    id: int
+    meetingroom_id: int
+    user_id: Optional[int]
+    freq: RecurrenceFrequency
+    interval: int
+    weekdays: Optional[list[int]]
+    until: Optional[datetime]
+    count: Optional[int]
+    reservations: list[ReservationDB]
+
+    class Config:
+        orm_mode = True
+
+    # В базе дни недели хранятся строкой вида '0,2,4'.
+    @validator('weekdays', pre=True)
+    def split_weekdays(cls, value):
+        if isinstance(value, str):
+            return [int(day) for day in value.split(',')]
+        return value
+
+
+# режим массового бронирования
+class BulkMode(str, Enum):
+    # Ошибка в любом элементе отменяет всё бронирование.
+    all_or_nothing = 'all_or_nothing'
+    # Создаются все брони без ошибок, остальные попадают в отчёт.
+    best_effort = 'best_effort'
+
+
+# схема для массового создания
+class ReservationBulkCreate(BaseModel):
+    items: list[ReservationCreate] = Field(..., min_items=1, max_items=500)
+    mode: BulkMode = BulkMode.all_or_nothing
+
+
+# ошибка по одному элементу массового бронирования
+class ReservationBulkError(BaseModel):
+    # Позиция элемента в списке items.
+    index: int
+    detail: str
+
+
+# схема для возврата результата массового бронирования
+class ReservationBulkResult(BaseModel):
+    created: list[ReservationDB]
+    errors: list[ReservationBulkError]
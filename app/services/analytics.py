@@ -0,0 +1,149 @@
+"""
+Аналитика загрузки переговорок за период.
+
+Брони приходят из базы столбцами NumPy (id переговорки, начало, конец),
+и все матрицы считаются векторно, без циклов по броням:
+- брони обрезаются по окну периода;
+- занятые минуты каждого часа периода - разность накопленных сумм
+  по границам часов (bincount + cumsum), поминутные массивы не нужны;
+- часы периода складываются в 168 часов недели.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.reservation import reservation_crud
+from app.services.meeting_room_cache import meeting_room_cache
+
+# Самый длинный период аналитики.
+MAX_WINDOW = timedelta(days=366)
+HOURS_PER_WEEK = 7 * 24
+# Сколько самых загруженных часов недели возвращать.
+PEAK_HOURS = 5
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def epoch_minutes(moment: datetime) -> int:
+    return int((moment - EPOCH).total_seconds() // 60)
+
+
+def hourly_booked_minutes(
+        rows: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        rooms: int,
+        hours: int,
+) -> np.ndarray:
+    """
+    Матрица «переговорка × час периода» с числом занятых минут.
+
+    starts и ends - минуты от начала первого часа периода, уже обрезанные
+    по окну; rows - номера строк матрицы (переговорок).
+    Занятость до границы часа t = 60k равна
+    Σ max(t - начало, 0) - Σ max(t - конец, 0), а сумма
+    Σ max(t - x, 0) по x <= t - это t * N(k) - S(k), где N и S -
+    накопленные число и сумма моментов x до k-й границы.
+    """
+    boundaries = hours + 1
+
+    def accumulated(moments: np.ndarray) -> np.ndarray:
+        # Первая граница часа, не раньше момента.
+        index = rows * boundaries + -(-moments // 60)
+        number = np.bincount(index, minlength=rooms * boundaries)
+        total = np.bincount(
+            index, weights=moments, minlength=rooms * boundaries
+        )
+        number = number.reshape(rooms, boundaries).cumsum(axis=1)
+        total = total.reshape(rooms, boundaries).cumsum(axis=1)
+        return 60 * np.arange(boundaries) * number - total
+
+    booked = accumulated(starts) - accumulated(ends)
+    return np.rint(np.diff(booked, axis=1)).astype(np.int64)
+
+
+def utilization_stats(
+        room_ids: list[int],
+        room_column: np.ndarray,
+        start_column: np.ndarray,
+        end_column: np.ndarray,
+        from_time: datetime,
+        to_time: datetime,
+) -> dict:
+    """Считает аналитику по столбцам броней (времена - секунды эпохи)."""
+    origin = from_time.replace(minute=0, second=0, microsecond=0)
+    origin_minute = epoch_minutes(origin)
+    window_start = epoch_minutes(from_time) - origin_minute
+    window_end = epoch_minutes(to_time) - origin_minute
+    hours = -(-window_end // 60)
+
+    # Строка матрицы для каждой брони; брони переговорок,
+    # которых нет в каталоге, отбрасываются.
+    ids = np.array(room_ids, dtype=np.int64)
+    order = np.argsort(ids)
+    position = np.searchsorted(ids[order], room_column)
+    position = np.minimum(position, max(len(ids) - 1, 0))
+    known = (
+        ids[order][position] == room_column if len(ids)
+        else np.zeros(len(room_column), dtype=bool)
+    )
+    starts = np.clip(
+        start_column[known] // 60 - origin_minute, window_start, window_end
+    )
+    ends = np.clip(
+        end_column[known] // 60 - origin_minute, window_start, window_end
+    )
+    booked = hourly_booked_minutes(
+        order[position[known]], starts, ends, len(ids), hours
+    )
+
+    # Минуты каждого часа периода, попадающие в окно.
+    hour_starts = 60 * np.arange(hours)
+    capacity = np.clip(
+        np.minimum(hour_starts + 60, window_end)
+        - np.maximum(hour_starts, window_start),
+        0, 60,
+    )
+    # Час недели: 0 - понедельник 00:00-01:00.
+    hour_of_week = (
+        origin.weekday() * 24 + origin.hour + np.arange(hours)
+    ) % HOURS_PER_WEEK
+    week_capacity = np.bincount(
+        hour_of_week, weights=capacity, minlength=HOURS_PER_WEEK
+    )
+    week_booked = np.zeros((len(ids), HOURS_PER_WEEK))
+    np.add.at(week_booked, (slice(None), hour_of_week), booked)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        occupancy = np.where(
+            week_capacity > 0, week_booked / week_capacity, 0.0
+        )
+        overall = np.where(
+            week_capacity > 0,
+            week_booked.sum(axis=0) / (week_capacity * max(len(ids), 1)),
+            0.0,
+        )
+    booked_minutes = booked.sum(axis=1)
+    peak_hours = np.argsort(-overall, kind='stable')[:PEAK_HOURS]
+    return {
+        'room_ids': ids.tolist(),
+        'occupancy': np.round(occupancy, 3).tolist(),
+        'booked_minutes': booked_minutes.tolist(),
+        'utilization': np.round(
+            booked_minutes / max(capacity.sum(), 1), 3
+        ).tolist(),
+        'peak_hours': peak_hours[overall[peak_hours] > 0].tolist(),
+        'idle_rooms': ids[booked_minutes == 0].tolist(),
+    }
+
+
+async def get_room_analytics(
+        from_time: datetime,
+        to_time: datetime,
+        session: AsyncSession,
+) -> dict:
+    room_ids = await meeting_room_cache.get_all_ids(session)
+    columns = await reservation_crud.get_interval_arrays(
+        from_time, to_time, session
+    )
+    return utilization_stats(room_ids, *columns, from_time, to_time)
@@ -0,0 +1,81 @@
+"""
+Перенос прошедших броней в архив (таблица reservation_archive).
+
+Почти все частые запросы к reservation смотрят в будущее: проверка
+пересечений, будущие брони переговорки. Брони, закончившиеся больше
+settings.archive_after_days дней назад, переносятся в архив, и горячая
+таблица с её индексами не растёт вместе с историей.
+
+Перенос идёт пачками по archive_batch_size строк, каждая - отдельной
+короткой транзакцией, чтобы не держать блокировку записи долго.
+Фоновая задача процесса запускает перенос раз в archive_interval секунд;
+то же делает команда python -m app.cli archive-reservations.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.crud.reservation import reservation_crud
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationArchiver:
+
+    def __init__(self, after_days: int, batch_size: int, interval: int):
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def cutoff(self, after_days: Optional[int] = None) -> datetime:
+        if after_days is None:
+            after_days = self.after_days
+        return datetime.now() - timedelta(days=after_days)
+
+    async def archive(self, after_days: Optional[int] = None) -> int:
+        """Переносит все подходящие брони; возвращает их число."""
+        cutoff = self.cutoff(after_days)
+        moved = 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                batch = await reservation_crud.archive_batch(
+                    cutoff, self.batch_size, session
+                )
+            moved += batch
+            if batch < self.batch_size:
+                return moved
+            # Между пачками даём выполниться запросам приложения.
+            await asyncio.sleep(0)
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                moved = await self.archive()
+                if moved:
+                    logger.info('В архив перенесено броней: %d', moved)
+            except Exception:
+                logger.exception('Не удалось перенести брони в архив')
+            await asyncio.sleep(self.interval)
+
+
+reservation_archiver = ReservationArchiver(
+    after_days=settings.archive_after_days,
+    batch_size=settings.archive_batch_size,
+    interval=settings.archive_interval,
+)
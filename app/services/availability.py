@@ -0,0 +1,72 @@
+"""
+Поиск свободных слотов сразу во всех переговорках.
+
+Сетки занятости (app/core/occupancy.py) склеиваются в матрицу
+«переговорка × минута», и все кандидаты начала слота проверяются
+одной векторной операцией скользящего окна.
+"""
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.occupancy import (
+    day_start, free_slot_starts, minutes_since, occupancy_grids
+)
+from app.services.meeting_room_cache import meeting_room_cache
+
+# Самое длинное окно поиска.
+MAX_WINDOW = timedelta(days=31)
+
+DURATION_RE = re.compile(r'^(\d+)\s*(m|min|h)?$')
+
+
+def parse_minutes(value: str) -> int:
+    """Разбирает длительность вида '90', '15m' или '2h' в минуты."""
+    match = DURATION_RE.match(value.strip().lower())
+    if match is None or int(match.group(1)) <= 0:
+        raise ValueError(
+            f'Некорректная длительность {value!r}: ожидается, например,'
+            ' 15m или 1h'
+        )
+    minutes = int(match.group(1))
+    return minutes * 60 if match.group(2) == 'h' else minutes
+
+
+async def find_available_slots(
+        from_time: datetime,
+        to_time: datetime,
+        duration: int,
+        granularity: int,
+        session: AsyncSession,
+) -> list[dict]:
+    """
+    Возвращает для каждой переговорки моменты начала слотов длиной
+    duration минут внутри [from_time, to_time] с шагом granularity минут.
+    """
+    first_day = from_time.date()
+    days = [
+        first_day + timedelta(days=number)
+        for number in range((to_time.date() - first_day).days + 1)
+    ]
+    await occupancy_grids.ensure_days(session, days)
+    room_ids = await meeting_room_cache.get_all_ids(session)
+    busy = occupancy_grids.busy_matrix(room_ids, days)
+
+    origin = day_start(first_day)
+    # Кандидаты выравниваются по сетке granularity от начала суток.
+    first_minute = -(-minutes_since(from_time, origin, ceil=True)
+                     // granularity) * granularity
+    last_minute = minutes_since(to_time, origin)
+    candidates, free = free_slot_starts(
+        busy, first_minute, last_minute, duration, granularity
+    )
+    starts = (
+        np.datetime64(origin) + candidates.astype('timedelta64[m]')
+    ).astype('datetime64[us]').astype(datetime)
+    return [
+        {'meetingroom_id': room_id, 'starts': starts[row_free].tolist()}
+        for room_id, row_free in zip(room_ids, free)
+        if row_free.any()
+    ]
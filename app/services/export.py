@@ -0,0 +1,62 @@
+"""
+Форматирование потоковой выгрузки бронирований в NDJSON и CSV.
+
+Функции принимают асинхронный поток пачек строк-кортежей
+(CRUDReservation.stream_rows) и отдают по одному текстовому фрагменту
+на пачку, так что в памяти находится не больше одной пачки.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator
+
+from app.crud.reservation import EXPORT_COLUMNS
+
+FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+class ExportFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv',
+}
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def to_ndjson(batches: AsyncIterator[list[tuple]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield ''.join(
+            json.dumps(dict(zip(FIELDS, map(_plain, row)))) + '\n'
+            for row in batch
+        )
+
+
+async def to_csv(batches: AsyncIterator[list[tuple]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    async for batch in batches:
+        writer.writerows(
+            [_plain(value) for value in row] for row in batch
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Заголовок пустой выгрузки.
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+FORMATTERS = {
+    ExportFormat.ndjson: to_ndjson,
+    ExportFormat.csv: to_csv,
+}
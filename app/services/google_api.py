@@ -5,16 +5,23 @@ spreadsheets_update_value() — для записи данных, получен
 """
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from aiogoogle import Aiogoogle
 # В секретах лежит адрес вашего личного гугл-аккаунта
 from app.core.config import settings
+# Документы discovery берём из кэша клиента, а не скачиваем каждый раз
+from app.core.google_client import google_client
+
+# Сам aiogoogle нужен только для аннотаций: он загружается лениво
+# в google_client.
+if TYPE_CHECKING:
+    from aiogoogle import Aiogoogle
 
 # Константа с форматом строкового представления времени
 FORMAT = "%Y/%m/%d %H:%M:%S"
 
 
-async def spreadsheets_create(wrapper_services: Aiogoogle) -> str:
+async def spreadsheets_create(wrapper_services: 'Aiogoogle') -> str:
     """
     функция создания документ
     Функция создания таблицы spreadsheets_create()
@@ -24,7 +31,7 @@ async def spreadsheets_create(wrapper_services: Aiogoogle) -> str:
     # Получаем текущую дату для заголовка документа
     now_date_time = datetime.now().strftime(FORMAT)
     # Создаём экземпляр класса Resource
-    service = await wrapper_services.discover('sheets', 'v4')
+    service = await google_client.discover('sheets', 'v4')
     # Формируем тело запроса
     spreadsheet_body = {
         'properties': {'title': f'Отчёт на {now_date_time}',
@@ -46,7 +53,7 @@ async def spreadsheets_create(wrapper_services: Aiogoogle) -> str:
 
 async def set_user_permissions(
         spreadsheetid: str,
-        wrapper_services: Aiogoogle
+        wrapper_services: 'Aiogoogle'
 ) -> None:
     """
     Функция для предоставления прав доступа вашему личному
@@ -58,7 +65,7 @@ async def set_user_permissions(
     permissions_body = {'type': 'user',
                         'role': 'writer',
                         'emailAddress': settings.email}
-    service = await wrapper_services.discover('drive', 'v3')
+    service = await google_client.discover('drive', 'v3')
     await wrapper_services.as_service_account(
         service.permissions.create(
             fileId=spreadsheetid,
@@ -70,7 +77,7 @@ async def set_user_permissions(
 async def spreadsheets_update_value(
         spreadsheetid: str,
         reservations: list,
-        wrapper_services: Aiogoogle
+        wrapper_services: 'Aiogoogle'
 ) -> None:
     """
     записывать полученную из базы данных информацию в документ с таблицами.
@@ -78,16 +85,20 @@ async def spreadsheets_update_value(
     информацию из базы и объект Aiogoogle.
     """
     now_date_time = datetime.now().strftime(FORMAT)
-    service = await wrapper_services.discover('sheets', 'v4')
+    service = await google_client.discover('sheets', 'v4')
     # Здесь формируется тело таблицы
     table_values = [
         ['Отчёт от', now_date_time],
         ['Количество регистраций переговорок'],
-        ['ID переговорки', 'Кол-во бронирований']
+        ['ID переговорки', 'Кол-во бронирований', 'Занято минут']
     ]
     # Здесь в таблицу добавляются строчки
     for res in reservations:
-        new_row = [str(res['meetingroom_id']), str(res['count'])]
+        new_row = [
+            str(res['meetingroom_id']),
+            str(res['count']),
+            str(res['booked_minutes']),
+        ]
         table_values.append(new_row)
 
     update_body = {
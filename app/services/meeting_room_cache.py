@@ -0,0 +1,135 @@
+"""
+Кэш каталога переговорок в памяти процесса.
+
+Каталог маленький и меняется редко, поэтому он загружается из базы
+целиком одним запросом (строками столбцов, без ORM-объектов), а страницы
+списка собираются из этих строк через orjson и хранятся уже
+сериализованными в JSON вместе с ETag. Эндпоинты создания, изменения и удаления переговорок
+вызывают invalidate(); изменения из других воркеров станут видны
+не позже чем через settings.room_cache_ttl секунд.
+"""
+import hashlib
+import time
+from bisect import bisect_right
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.serialization import dump_rows, schema_fields
+from app.crud.base import decode_cursor, encode_cursor
+from app.models import MeetingRoom
+from app.schemas.meeting_room import MeetingRoomDB
+
+# Столбцы каталога - поля MeetingRoomDB в порядке вывода.
+FIELDS = schema_fields(MeetingRoomDB)
+
+
+class CachedPage:
+
+    def __init__(self, body: bytes, next_cursor: Optional[str]):
+        self.body = body
+        self.next_cursor = next_cursor
+        self.etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+
+
+class MeetingRoomCache:
+
+    def __init__(self):
+        # Номер версии растёт при каждой инвалидации.
+        self.version = 0
+        self._loaded_at: Optional[float] = None
+        self._rows: list = []
+        self._ids: list[int] = []
+        self._by_id: dict[int, MeetingRoomDB] = {}
+        self._by_name: dict[str, MeetingRoomDB] = {}
+        self._pages: dict[tuple[int, Optional[str]], CachedPage] = {}
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._loaded_at = None
+        self._pages.clear()
+
+    async def _ensure_loaded(self, session: AsyncSession) -> None:
+        if (self._loaded_at is not None and time.monotonic()
+                - self._loaded_at < settings.room_cache_ttl):
+            return
+        version = self.version
+        rows = await session.execute(
+            select(
+                *(MeetingRoom.__table__.c[field] for field in FIELDS)
+            ).order_by(MeetingRoom.id)
+        )
+        rows = rows.all()
+        if version != self.version:
+            # Каталог изменился, пока шёл запрос: не кэшируем, отдаём как есть.
+            self._fill(rows)
+            self._loaded_at = None
+            return
+        self._fill(rows)
+        self._pages.clear()
+        self._loaded_at = time.monotonic()
+
+    def _fill(self, rows: list) -> None:
+        self._rows = rows
+        # Значения пришли из базы - схема собирается без проверки.
+        rooms = [MeetingRoomDB.construct(**row._mapping) for row in rows]
+        self._ids = [room.id for room in rooms]
+        self._by_id = {room.id: room for room in rooms}
+        self._by_name = {room.name: room for room in rooms}
+
+    async def get(
+            self, room_id: int, session: AsyncSession
+    ) -> Optional[MeetingRoomDB]:
+        await self._ensure_loaded(session)
+        return self._by_id.get(room_id)
+
+    async def get_room_id_by_name(
+            self, room_name: str, session: AsyncSession
+    ) -> Optional[int]:
+        await self._ensure_loaded(session)
+        room = self._by_name.get(room_name)
+        return None if room is None else room.id
+
+    async def get_all_ids(self, session: AsyncSession) -> list[int]:
+        await self._ensure_loaded(session)
+        return list(self._ids)
+
+    async def get_existing_ids(
+            self, room_ids: set[int], session: AsyncSession
+    ) -> set[int]:
+        await self._ensure_loaded(session)
+        return {room_id for room_id in room_ids if room_id in self._by_id}
+
+    async def get_page(
+            self,
+            limit: int,
+            cursor: Optional[str],
+            session: AsyncSession,
+    ) -> CachedPage:
+        """
+        Страница списка переговорок в том же порядке и с тем же курсором,
+        что и CRUDBase.get_page (по id).
+        """
+        await self._ensure_loaded(session)
+        key = (limit, cursor)
+        page = self._pages.get(key)
+        if page is not None:
+            return page
+        start = 0
+        if cursor is not None:
+            (last_id,) = decode_cursor(cursor, (MeetingRoom.id,))
+            start = bisect_right(self._ids, last_id)
+        rows = self._rows[start:start + limit]
+        next_cursor = None
+        if start + limit < len(self._rows):
+            next_cursor = encode_cursor([rows[-1].id])
+        body = dump_rows(rows, FIELDS, exclude_none=True)
+        page = CachedPage(body, next_cursor)
+        if self._loaded_at is not None:
+            self._pages[key] = page
+        return page
+
+
+meeting_room_cache = MeetingRoomCache()
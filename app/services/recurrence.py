@@ -0,0 +1,99 @@
+"""
+Развёртывание повторяющихся бронирований и поиск их пересечений
+с уже существующими бронями.
+
+Все вычисления — операции над массивами NumPy: вхождения серии строятся
+сложением массивов смещений, а пересечения ищутся одним searchsorted по
+бронированиям переговорки, выбранным из базы одним запросом.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from app.schemas.reservation import (
+    MAX_OCCURRENCES, Recurrence, RecurrenceFrequency
+)
+
+DAY = np.timedelta64(1, 'D')
+WEEK = np.timedelta64(7, 'D')
+
+
+def to_datetime64(values) -> np.ndarray:
+    return np.array(values, dtype='datetime64[us]')
+
+
+def to_datetimes(values: np.ndarray) -> list[datetime]:
+    return values.astype('datetime64[us]').astype(datetime).tolist()
+
+
+def expand_occurrences(
+        from_reserve: datetime,
+        to_reserve: datetime,
+        recurrence: Recurrence,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Возвращает массивы начал и окончаний всех вхождений серии."""
+    first = to_datetime64(from_reserve)
+    duration = to_datetime64(to_reserve) - first
+    if recurrence.freq == RecurrenceFrequency.daily:
+        step = DAY * recurrence.interval
+        day_offsets = np.zeros(1, dtype='timedelta64[D]')
+    else:
+        step = WEEK * recurrence.interval
+        # День первого вхождения всегда среди weekdays
+        # (ReservationSeriesCreate.check_start_on_weekday).
+        weekdays = recurrence.weekdays or [from_reserve.weekday()]
+        # Смещения выбранных дней недели от дня первого вхождения.
+        day_offsets = (
+            np.array(weekdays) - from_reserve.weekday()
+        ).astype('timedelta64[D]')
+
+    per_period = len(day_offsets)
+    # Лишний период в конце: дни недели раньше дня первого вхождения
+    # попадают в первую неделю до начала серии и отбрасываются ниже.
+    if recurrence.count is not None:
+        periods = -(-recurrence.count // per_period) + 1
+    else:
+        periods = (
+            to_datetime64(recurrence.until) - first
+        ) // step + 2
+    periods = int(min(periods, MAX_OCCURRENCES // per_period + 2))
+
+    starts = (
+        first + np.arange(periods)[:, None] * step + day_offsets[None, :]
+    ).ravel()
+    starts = np.sort(starts[starts >= first])
+    if recurrence.until is not None:
+        starts = starts[starts <= to_datetime64(recurrence.until)]
+    if recurrence.count is not None:
+        starts = starts[:recurrence.count]
+    elif len(starts) > MAX_OCCURRENCES:
+        raise ValueError(
+            f'Серия не может содержать больше {MAX_OCCURRENCES} вхождений'
+        )
+    return starts, starts + duration
+
+
+def find_conflicts(
+        starts: np.ndarray,
+        ends: np.ndarray,
+        existing_starts: np.ndarray,
+        existing_ends: np.ndarray,
+) -> np.ndarray:
+    """
+    Возвращает булеву маску вхождений, пересекающихся с существующими
+    бронями. Границы включительные, как в CRUDReservation.
+    """
+    if not len(existing_starts):
+        return np.zeros(len(starts), dtype=bool)
+    order = np.argsort(existing_starts)
+    existing_starts = existing_starts[order]
+    # Самое позднее окончание среди броней, начавшихся не позже i-й.
+    max_ends = np.maximum.accumulate(existing_ends[order])
+    # Число существующих броней, начавшихся не позже конца вхождения.
+    started = np.searchsorted(existing_starts, ends, side='right')
+    return (started > 0) & (max_ends[np.maximum(started - 1, 0)] >= starts)
+
+
+def has_self_overlaps(starts: np.ndarray, ends: np.ndarray) -> bool:
+    """Пересекаются ли соседние вхождения самой серии."""
+    return bool(np.any(starts[1:] <= ends[:-1]))
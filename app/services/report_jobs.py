@@ -0,0 +1,181 @@
+"""
+Фоновые задачи формирования отчёта в Google Таблицах.
+
+POST /google/ только ставит задачу в очередь и сразу возвращает её id,
+а отчёт собирают фоновые воркеры процесса (не больше report_workers
+одновременно). Состояние задачи отдаёт GET /google/jobs/{job_id}.
+
+- Одинаковые запросы (тот же период), пока задача не завершена,
+  получают ту же задачу - отчёт строится один раз.
+- Упавшая задача ставится в очередь повторно с растущей паузой,
+  всего не больше report_job_attempts попыток. Уже выполненные шаги
+  (агрегация, создание таблицы, выдача прав) при повторе не повторяются,
+  поэтому лишних таблиц не появляется.
+- Незавершённые задачи хранятся, пока не завершатся: срок хранения
+  не отсчитывается, пока задача в очереди или ждёт повтора.
+  Завершённые задачи хранятся report_job_ttl секунд.
+- При остановке отложенные повторы отменяются, а незавершённые
+  задачи помечаются упавшими.
+"""
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.google_client import google_client
+from app.crud.reservation import reservation_crud
+from app.schemas.report_job import ReportJobStatus
+from app.services.google_api import (
+    set_user_permissions, spreadsheets_create, spreadsheets_update_value
+)
+
+
+@dataclass
+class ReportJob:
+    from_reserve: datetime
+    to_reserve: datetime
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: ReportJobStatus = ReportJobStatus.queued
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    # Результаты выполненных шагов - для повторной попытки.
+    reservations: Optional[list[dict]] = None
+    spreadsheet_id: Optional[str] = None
+    permissions_set: bool = False
+
+    @property
+    def key(self) -> tuple[datetime, datetime]:
+        return self.from_reserve, self.to_reserve
+
+
+async def build_report(job: ReportJob) -> None:
+    if job.reservations is None:
+        async with AsyncSessionLocal() as session:
+            rows = await reservation_crud.get_count_res_at_the_same_time(
+                job.from_reserve, job.to_reserve, session
+            )
+        job.reservations = [dict(row._mapping) for row in rows]
+    wrapper_services = await google_client.bind()
+    if job.spreadsheet_id is None:
+        job.spreadsheet_id = await spreadsheets_create(wrapper_services)
+    if not job.permissions_set:
+        await set_user_permissions(job.spreadsheet_id, wrapper_services)
+        job.permissions_set = True
+    await spreadsheets_update_value(
+        job.spreadsheet_id, job.reservations, wrapper_services
+    )
+
+
+class ReportJobs:
+
+    def __init__(self, workers: int, attempts: int, retry_delay: float):
+        self.workers = workers
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+        self._jobs: TTLCache = TTLCache(
+            maxsize=10000, ttl=settings.report_job_ttl
+        )
+        # Незавершённые задачи - по id и по периоду отчёта.
+        self._running: dict[str, ReportJob] = {}
+        self._in_flight: dict[tuple, ReportJob] = {}
+        # Отложенные повторы по id задачи.
+        self._retries: dict[str, asyncio.TimerHandle] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Очередь создаётся заново при старте - задачи из неё
+        # уже не выполнятся.
+        for job in list(self._running.values()):
+            job.status = ReportJobStatus.failed
+            job.error = 'Формирование отчёта остановлено'
+            self._finish(job)
+
+    def submit(self, from_reserve: datetime, to_reserve: datetime):
+        """Ставит отчёт в очередь или возвращает такую же текущую задачу."""
+        job = self._in_flight.get((from_reserve, to_reserve))
+        if job is not None:
+            return job
+        # Воркеры запускаются при первой задаче, если не запущены
+        # при старте приложения.
+        self.start()
+        job = ReportJob(from_reserve, to_reserve)
+        self._running[job.id] = job
+        self._in_flight[job.key] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        job = self._running.get(job_id)
+        if job is not None:
+            return job
+        return self._jobs.get(job_id)
+
+    def _finish(self, job: ReportJob) -> None:
+        job.finished_at = datetime.now()
+        self._running.pop(job.id, None)
+        self._in_flight.pop(job.key, None)
+        self._jobs[job.id] = job
+
+    def _retry(self, job: ReportJob) -> None:
+        del self._retries[job.id]
+        self._queue.put_nowait(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ReportJob) -> None:
+        job.status = ReportJobStatus.running
+        job.attempts += 1
+        try:
+            await build_report(job)
+        except Exception as error:
+            job.error = f'{type(error).__name__}: {error}'
+            if job.attempts < self.attempts:
+                # Повтор - через паузу, не занимая воркер.
+                job.status = ReportJobStatus.queued
+                self._retries[job.id] = asyncio.get_running_loop().call_later(
+                    self.retry_delay * 2 ** (job.attempts - 1),
+                    self._retry, job,
+                )
+                return
+            job.status = ReportJobStatus.failed
+        else:
+            job.status = ReportJobStatus.done
+            job.error = None
+        self._finish(job)
+
+
+report_jobs = ReportJobs(
+    workers=settings.report_workers,
+    attempts=settings.report_job_attempts,
+    retry_delay=settings.report_retry_delay,
+)
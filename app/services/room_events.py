@@ -0,0 +1,75 @@
+"""
+Потоки событий броней переговорки для табло и виджетов календаря.
+
+- SSE (GET /meeting_rooms/{id}/events): события приходят как
+  `id/event/data`, «пульс» - строкой-комментарием. При отключении
+  сервером (медленный клиент, удалённая переговорка) EventSource
+  переподключится сам через RETRY_MS.
+- WebSocket (/meeting_rooms/{id}/events/ws): те же события JSON-объектами
+  {"id", "type", "data"}, «пульс» - {"type": "heartbeat"}.
+
+Соединение с базой на время потока не держится: подписчику нужна
+только очередь в app/core/events.py.
+"""
+import asyncio
+from typing import AsyncIterator, Optional
+
+from fastapi import WebSocket
+
+from app.core.events import Subscription, event_hub
+
+# Через сколько миллисекунд EventSource переподключается.
+RETRY_MS = 3000
+
+Message = Optional[tuple[int, str, str]]
+
+
+def format_sse(message: Message) -> str:
+    if message is None:
+        return ': heartbeat\n\n'
+    event_id, event_type, data = message
+    return f'id: {event_id}\nevent: {event_type}\ndata: {data}\n\n'
+
+
+def format_websocket(message: Message) -> str:
+    if message is None:
+        return '{"type": "heartbeat"}'
+    event_id, event_type, data = message
+    return f'{{"id": {event_id}, "type": "{event_type}", "data": {data}}}'
+
+
+async def sse_stream(room_id: int) -> AsyncIterator[str]:
+    subscription = event_hub.subscribe(room_id)
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        async for message in subscription.messages():
+            yield format_sse(message)
+    finally:
+        # Клиент отключился (генератор отменён) или подписчика отключили.
+        event_hub.unsubscribe(subscription)
+
+
+async def _send_events(
+        websocket: WebSocket, subscription: Subscription
+) -> None:
+    async for message in subscription.messages():
+        await websocket.send_text(format_websocket(message))
+    # Подписчика отключили - закрываем соединение, клиент переподключится.
+    await websocket.close()
+
+
+async def websocket_stream(websocket: WebSocket, room_id: int) -> None:
+    await websocket.accept()
+    subscription = event_hub.subscribe(room_id)
+    sender = asyncio.create_task(_send_events(websocket, subscription))
+    try:
+        # Клиент ничего не присылает; чтение нужно, чтобы сразу заметить
+        # закрытие соединения, а не ждать ошибки отправки.
+        while True:
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                return
+    finally:
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        event_hub.unsubscribe(subscription)
@@ -0,0 +1,46 @@
+"""
+Расписание переговорки за окно времени (GET /meeting_rooms/{id}/reservations).
+
+Ответ собирается один раз на (переговорку, окно) и дальше отдаётся
+из кэша app/core/timeline_cache.py уже сериализованным, с ETag.
+Окно расширяется до границ интервалов settings.timeline_bucket, поэтому
+в ответ попадают брони, задевающие расширенное окно. Окно без конца
+(to_time=None) - все брони, заканчивающиеся после его начала.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.serialization import dump_rows, schema_fields
+from app.core.timeline_cache import (
+    TimelineEntry, bucket_window, timeline_cache
+)
+from app.crud.reservation import reservation_crud
+from app.schemas.reservation import ReservationDB
+
+# Самое длинное окно с заданным концом.
+MAX_WINDOW = timedelta(days=31)
+# Поля ответа - как у ReservationDB без user_id.
+FIELDS = schema_fields(ReservationDB, exclude={'user_id'})
+
+
+async def get_room_timeline(
+        room_id: int,
+        from_time: datetime,
+        to_time: Optional[datetime],
+        session: AsyncSession,
+) -> TimelineEntry:
+    window = bucket_window(from_time, to_time, settings.timeline_bucket)
+    entry = timeline_cache.get(room_id, window)
+    if entry is not None:
+        return entry
+    # Версия берётся до чтения: если брони изменятся во время запроса,
+    # устаревший ответ в кэш не попадёт.
+    version = timeline_cache.version(room_id)
+    reservations = await reservation_crud.get_for_room_window(
+        room_id, *window, session, keys=FIELDS
+    )
+    body = dump_rows(reservations, FIELDS)
+    return timeline_cache.put(room_id, window, body, version)
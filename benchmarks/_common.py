@@ -0,0 +1,44 @@
+"""
+Общие помощники бенчмарков и тестов.
+
+Настройки и движок читают DATABASE_URL при импорте app, поэтому
+use_temp_database вызывается до импорта приложения:
+    from benchmarks._common import use_temp_database
+    DB_PATH = use_temp_database('bench.db')
+    from app.main import app  # noqa: E402
+Сам модуль app не импортирует.
+"""
+import os
+import socket
+import tempfile
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def sqlite_url(path: str) -> str:
+    return f'sqlite+aiosqlite:///{path}'
+
+
+def use_temp_database(name: str) -> str:
+    """Направляет приложение на новый файл SQLite во временном каталоге
+    и возвращает путь к нему."""
+    path = os.path.join(tempfile.mkdtemp(), name)
+    os.environ['DATABASE_URL'] = sqlite_url(path)
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def private_key_pem() -> str:
+    """Новый ключ RSA в PEM - для поддельного сервисного аккаунта Google."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
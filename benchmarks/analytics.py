@@ -0,0 +1,151 @@
+"""
+Аналитика загрузки переговорок (GET /meeting_rooms/analytics)
+на большом числе броней.
+
+База - временный файл SQLite, заполняется заданным числом броней
+(по умолчанию 1 000 000) в ROOMS переговорках за год. Измеряется:
+- выборка столбцов броней из базы (get_interval_arrays);
+- векторный расчёт матриц (app/services/analytics.py);
+- для сравнения - тот же расчёт циклом Python по броням;
+- весь эндпоинт через ASGI-клиент, с сериализацией ответа.
+Запуск:
+    python -m benchmarks.analytics [брони]
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks._common import use_temp_database
+
+use_temp_database('analytics.db')
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.crud.reservation import reservation_crud  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+from app.services.analytics import (  # noqa: E402
+    EPOCH, HOURS_PER_WEEK, get_room_analytics, utilization_stats
+)
+
+ROOMS = 100
+START = datetime(2024, 1, 1)
+FROM_TIME = START
+TO_TIME = START + timedelta(days=365)
+BATCH = 50000
+
+
+def make_reservations(count: int, rng: random.Random):
+    """Брони по 10-45 минут через каждые 50 минут в каждой переговорке."""
+    for number in range(count):
+        start = START + timedelta(minutes=50 * (number // ROOMS))
+        yield {
+            'meetingroom_id': number % ROOMS + 1,
+            'from_reserve': start,
+            'to_reserve': start + timedelta(minutes=rng.randint(10, 45)),
+        }
+
+
+async def fill(count: int) -> None:
+    rng = random.Random(20)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {'name': f'Room {number}'} for number in range(1, ROOMS + 1)
+        ])
+        batch = []
+        for row in make_reservations(count, rng):
+            batch.append(row)
+            if len(batch) == BATCH:
+                await conn.execute(insert(Reservation), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(Reservation), batch)
+
+
+def python_loop(room_ids, rooms, starts, ends):
+    """Занятые минуты по часам недели циклом по броням и часам."""
+    row_of = {room_id: row for row, room_id in enumerate(room_ids)}
+    week = np.zeros((len(room_ids), HOURS_PER_WEEK))
+    window_start = (FROM_TIME - EPOCH).total_seconds() // 60
+    window_end = (TO_TIME - EPOCH).total_seconds() // 60
+    for room, start, end in zip(rooms.tolist(), starts.tolist(),
+                                ends.tolist()):
+        start = max(start // 60, window_start)
+        end = min(end // 60, window_end)
+        while start < end:
+            hour_end = min((start // 60 + 1) * 60, end)
+            moment = EPOCH + timedelta(minutes=start)
+            week[row_of[room], moment.weekday() * 24 + moment.hour] += (
+                hour_end - start
+            )
+            start = hour_end
+    return week
+
+
+def timed(label: str, started: float) -> float:
+    elapsed = time.perf_counter() - started
+    print(f'{label:<34} {elapsed * 1000:9.1f} мс')
+    return elapsed
+
+
+async def main(count: int):
+    started = time.perf_counter()
+    await fill(count)
+    timed(f'заполнение базы ({count} броней)', started)
+    room_ids = list(range(1, ROOMS + 1))
+
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        columns = await reservation_crud.get_interval_arrays(
+            FROM_TIME, TO_TIME, session
+        )
+        timed('выборка столбцов из базы', started)
+
+    started = time.perf_counter()
+    stats = utilization_stats(room_ids, *columns, FROM_TIME, TO_TIME)
+    vectorized = timed('расчёт NumPy', started)
+
+    started = time.perf_counter()
+    week = python_loop(room_ids, *columns)
+    loop = timed('расчёт циклом Python', started)
+    assert np.array_equal(week.sum(axis=1), stats['booked_minutes'])
+    print(f'{"ускорение расчёта":<34} {loop / vectorized:9.1f} раз')
+
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        await get_room_analytics(FROM_TIME, TO_TIME, session)
+        timed('сервис целиком (база + расчёт)', started)
+
+    await create_user('admin@example.com', 'adminpassword', True)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+            transport=transport, base_url='http://analytics'
+    ) as client:
+        response = await client.post('/auth/jwt/login', data={
+            'username': 'admin@example.com', 'password': 'adminpassword'
+        })
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        started = time.perf_counter()
+        response = await client.get('/meeting_rooms/analytics', params={
+            'from': FROM_TIME.isoformat(), 'to': TO_TIME.isoformat()
+        }, headers=headers)
+        response.raise_for_status()
+        timed('GET /meeting_rooms/analytics', started)
+        print(f'{"размер ответа":<34} {len(response.content):9d} байт')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    asyncio.run(main(int(arguments[0]) if arguments else 1_000_000))
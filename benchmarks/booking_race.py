@@ -0,0 +1,95 @@
+"""
+Стресс-проверка атомарности бронирования: сотни параллельных
+POST /reservations/ на пересекающиеся интервалы одной переговорки.
+Успешно (200) должен завершиться ровно один запрос, остальные - 422,
+а в базе должна остаться ровно одна бронь.
+
+Запросы идут в приложение через ASGI-транспорт httpx
+(pip install httpx), база - временный файл SQLite. Внутри одного
+процесса запросы выстраивает в очередь room_locks, поэтому скрипт
+измеряет весь путь запроса; саму атомарность записи без блокировки
+и из нескольких процессов проверяет tests/test_booking_race.py.
+Запуск:
+    python -m benchmarks.booking_race [запросов] [пользователей]
+"""
+import asyncio
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks._common import use_temp_database
+
+use_temp_database('race.db')
+
+import httpx  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+
+PASSWORD = 'racepassword'
+START = datetime(2030, 1, 1, 9)
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post(
+        '/auth/jwt/login', data={'username': email, 'password': PASSWORD}
+    )
+    response.raise_for_status()
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+def booking(number: int) -> dict:
+    # Все интервалы пересекаются с отрезком 10:00-10:30.
+    shift = timedelta(minutes=number % 30)
+    return {
+        'meetingroom_id': 1,
+        'from_reserve': (START + shift).isoformat(),
+        'to_reserve': (START + timedelta(hours=1) + shift).isoformat(),
+    }
+
+
+async def main(requests: int, users: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [{'name': 'Race room'}])
+    emails = [f'user{number}@example.com' for number in range(users)]
+    for email in emails:
+        await create_user(email, PASSWORD)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+            transport=transport, base_url='http://race'
+    ) as client:
+        headers = [await login(client, email) for email in emails]
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post(
+                '/reservations/',
+                json=booking(number),
+                headers=headers[number % users],
+            )
+            for number in range(requests)
+        ))
+        elapsed = time.perf_counter() - started
+
+    statuses = Counter(response.status_code for response in responses)
+    async with AsyncSessionLocal() as session:
+        stored = await session.scalar(
+            select(func.count()).select_from(Reservation)
+        )
+    await engine.dispose()
+    print(f'{requests} запросов за {elapsed:.2f} с, ответы: {dict(statuses)},'
+          f' броней в базе: {stored}')
+    assert statuses[200] == 1, 'успешным должен быть ровно один запрос'
+    assert statuses[422] == requests - 1, 'остальные должны получить 422'
+    assert stored == 1, 'в базе должна остаться ровно одна бронь'
+
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(arguments or [300, 10])))
@@ -0,0 +1,122 @@
+"""
+Сравнение проверки пересечений бронирований: SQL-запрос
+CRUDReservation.get_reservations_at_the_same_time против индекса в памяти
+(app/core/conflict_index.py).
+
+База — временный файл SQLite, заполняется заданным числом бронирований.
+Запуск:
+    python -m benchmarks.conflict_index 10000 100000 1000000
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks._common import use_temp_database
+
+DB_PATH = use_temp_database('bench.db')
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.conflict_index import conflict_index  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.crud.reservation import reservation_crud  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+
+ROOMS = 50
+QUERIES = 2000
+START = datetime(2024, 1, 1, 8)
+
+
+def make_reservations(count: int) -> list[dict]:
+    """Непересекающиеся брони по 30 минут с шагом в час в каждой комнате."""
+    return [
+        {
+            'meetingroom_id': number % ROOMS + 1,
+            'from_reserve': START + timedelta(hours=number // ROOMS),
+            'to_reserve': START + timedelta(
+                hours=number // ROOMS, minutes=30
+            ),
+        }
+        for number in range(count)
+    ]
+
+
+def make_queries(count: int, minutes: int) -> list[dict]:
+    hours = max(count // ROOMS, 1)
+    queries = []
+    for _ in range(QUERIES):
+        start = START + timedelta(
+            hours=random.randrange(hours), minutes=minutes
+        )
+        queries.append({
+            'meetingroom_id': random.randint(1, ROOMS),
+            'from_reserve': start,
+            'to_reserve': start + timedelta(minutes=15),
+        })
+    return queries
+
+
+async def run_queries(queries: list[dict]) -> float:
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        for query in queries:
+            await reservation_crud.get_reservations_at_the_same_time(
+                **query, session=session
+            )
+        return time.perf_counter() - started
+
+
+async def bench(count: int):
+    async with engine.begin() as conn:
+        await conn.execute(delete(Reservation))
+        await conn.execute(
+            insert(Reservation), make_reservations(count)
+        )
+    # Свободные слоты (обычное бронирование) и занятые слоты,
+    # которые индекс передаёт на проверку SQL-запросу.
+    free = make_queries(count, minutes=40)
+    busy = make_queries(count, minutes=10)
+
+    conflict_index.clear()
+    sql_free = await run_queries(free)
+    sql_busy = await run_queries(busy)
+
+    conflict_index.acquire(
+        os.path.join(os.path.dirname(DB_PATH), 'conflict_index.lock')
+    )
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        await conflict_index.load(session)
+    load_time = time.perf_counter() - started
+    index_free = await run_queries(free)
+    index_busy = await run_queries(busy)
+
+    def per_query(seconds: float) -> str:
+        return f'{seconds / QUERIES * 1e6:8.1f}'
+
+    print(
+        f'{count:>9} броней | мкс/запрос свободно: SQL {per_query(sql_free)},'
+        f' индекс {per_query(index_free)} | занято: SQL {per_query(sql_busy)},'
+        f' индекс {per_query(index_busy)} | загрузка индекса {load_time:.2f} с'
+    )
+
+
+async def main(sizes: list[int]):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(MeetingRoom),
+            [{'name': f'Room {number}'} for number in range(1, ROOMS + 1)],
+        )
+    for count in sizes:
+        await bench(count)
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    asyncio.run(main(sizes))
@@ -0,0 +1,115 @@
+"""
+Пропускная способность конкурентного создания бронирований
+до и после настройки движка в app/core/db.py.
+
+- baseline: create_async_engine(url) без параметров (для файловой SQLite -
+  NullPool и журнал по умолчанию), expire_on_commit=True и refresh после
+  commit, как раньше делал CRUDBase.create;
+- tuned: app.core.db.create_engine (пул, PRAGMA WAL и др.),
+  expire_on_commit=False и текущий CRUDReservation.create.
+
+Каждое бронирование - проверка пересечений и вставка, как в эндпоинте.
+Запуск:
+    python -m benchmarks.db_engine [задач] [броней_на_задачу]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks._common import sqlite_url, use_temp_database
+
+if 'DATABASE_URL' not in os.environ:
+    use_temp_database('unused.db')
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession, create_async_engine
+)
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import create_engine  # noqa: E402
+from app.crud.reservation import reservation_crud  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+from app.schemas.reservation import ReservationCreate  # noqa: E402
+
+START = datetime(2030, 1, 1, 8)
+
+
+def booking(task: int, number: int) -> ReservationCreate:
+    # Каждая задача бронирует свою переговорку, слоты не пересекаются.
+    return ReservationCreate.construct(
+        meetingroom_id=task + 1,
+        from_reserve=START + timedelta(hours=number),
+        to_reserve=START + timedelta(hours=number, minutes=30),
+    )
+
+
+async def create_baseline(session: AsyncSession, reservation):
+    await reservation_crud.get_reservations_at_the_same_time(
+        **reservation.dict(), session=session
+    )
+    db_obj = Reservation(**reservation.dict())
+    session.add(db_obj)
+    await session.commit()
+    await session.refresh(db_obj)
+
+
+async def create_tuned(session: AsyncSession, reservation):
+    await reservation_crud.get_reservations_at_the_same_time(
+        **reservation.dict(), session=session
+    )
+    await reservation_crud.create(reservation, session)
+
+
+async def run(name, engine, session_factory, create, tasks, per_task):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(MeetingRoom),
+            [{'name': f'Room {number}'} for number in range(tasks)],
+        )
+
+    async def worker(task: int):
+        for number in range(per_task):
+            # Новая сессия на каждое бронирование - как на HTTP-запрос.
+            async with session_factory() as session:
+                await create(session, booking(task, number))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(task) for task in range(tasks)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    total = tasks * per_task
+    print(f'{name:>8}: {total} броней за {elapsed:.2f} с,'
+          f' {total / elapsed:.0f} броней/с')
+
+
+async def main(tasks: int, per_task: int):
+    directory = tempfile.mkdtemp()
+
+    baseline = create_async_engine(
+        sqlite_url(os.path.join(directory, 'baseline.db'))
+    )
+    await run(
+        'baseline', baseline,
+        sessionmaker(baseline, class_=AsyncSession),
+        create_baseline, tasks, per_task,
+    )
+
+    tuned = create_engine(
+        sqlite_url(os.path.join(directory, 'tuned.db'))
+    )
+    await run(
+        'tuned', tuned,
+        sessionmaker(tuned, class_=AsyncSession, expire_on_commit=False),
+        create_tuned, tasks, per_task,
+    )
+
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(arguments or [20, 50])))
@@ -0,0 +1,235 @@
+"""
+Нагрузка на поток событий GET /meeting_rooms/{id}/events тысячами
+неактивных подписчиков.
+
+Приложение запускается отдельным процессом uvicorn на временной базе
+SQLite, чтобы его память мерилась отдельно от клиентов. Скрипт:
+- открывает заданное число SSE-соединений к ROOMS переговоркам;
+- сравнивает память сервера (VmRSS) до и после подключения
+  и выводит расход на одно соединение;
+- ждёт «пульса» на всех соединениях;
+- создаёт бронь и измеряет, за сколько её получили все подписчики
+  переговорки;
+- закрывает соединения и проверяет, что сервер отписал всех.
+Скрипт падает (AssertionError), если на соединение уходит больше
+MAX_KB_PER_CONNECTION КБ памяти, событие дошло не всем подписчикам
+переговорки или подписчики остались после закрытия соединений.
+Запуск:
+    python -m benchmarks.events_soak [подписчиков] [пульс_сек]
+"""
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from benchmarks._common import free_port, sqlite_url
+
+ROOMS = 10
+# Предел памяти сервера на одно соединение; сейчас расход около 26 КБ.
+MAX_KB_PER_CONNECTION = 64
+ADMIN = {'username': 'admin@example.com', 'password': 'adminpassword'}
+
+
+def rss_kb(pid: int) -> int:
+    with open(f'/proc/{pid}/status') as status:
+        return int(re.search(r'VmRSS:\s+(\d+)', status.read()).group(1))
+
+
+def gauge(metrics: str, stat: str) -> float:
+    match = re.search(
+        rf'^reservation_events{{stat="{stat}"}} (\S+)$', metrics, re.M
+    )
+    return float(match.group(1)) if match else 0.0
+
+
+class Subscriber:
+
+    def __init__(self, room_id: int):
+        self.room_id = room_id
+        self.heartbeats = 0
+        self.created_at = None
+        self.connected = asyncio.Event()
+        self.heartbeat = asyncio.Event()
+        self.event = asyncio.Event()
+
+    async def listen(self, client: aiohttp.ClientSession, url: str):
+        async with client.get(
+                f'{url}/meeting_rooms/{self.room_id}/events'
+        ) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if line.startswith(b'retry:'):
+                    self.connected.set()
+                elif line.startswith(b': heartbeat'):
+                    self.heartbeats += 1
+                    self.heartbeat.set()
+                elif line.startswith(b'event: created'):
+                    self.created_at = time.perf_counter()
+                    self.event.set()
+
+
+async def wait_all(events, timeout: float) -> None:
+    await asyncio.wait_for(
+        asyncio.gather(*(event.wait() for event in events)), timeout
+    )
+
+
+async def prepare_database(environment: dict) -> None:
+    """Схема и переговорки - до запуска сервера."""
+    os.environ.update(environment)
+    from sqlalchemy import insert
+
+    from app.core.base import Base
+    from app.core.db import engine
+    from app.models import MeetingRoom
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {'name': f'Room {number}'} for number in range(1, ROOMS + 1)
+        ])
+    await engine.dispose()
+
+
+async def main(subscribers: int, heartbeat: float):
+    directory = tempfile.mkdtemp()
+    port = free_port()
+    url = f'http://127.0.0.1:{port}'
+    environment = {
+        'DATABASE_URL': sqlite_url(os.path.join(directory, 'events.db')),
+        'FIRST_SUPERUSER_EMAIL': ADMIN['username'],
+        'FIRST_SUPERUSER_PASSWORD': ADMIN['password'],
+        'EVENTS_HEARTBEAT': str(heartbeat),
+        'ARCHIVE_INTERVAL': '0',
+    }
+    await prepare_database(environment)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app',
+         '--port', str(port), '--log-level', 'warning',
+         '--backlog', str(max(subscribers, 2048))],
+        env=dict(os.environ, **environment),
+    )
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None)
+    try:
+        async with aiohttp.ClientSession(
+                connector=connector, timeout=timeout
+        ) as client:
+            for _ in range(100):
+                try:
+                    async with client.get(f'{url}/metrics') as response:
+                        if response.status == 200:
+                            break
+                except aiohttp.ClientConnectionError:
+                    await asyncio.sleep(0.1)
+            # Прогрев: одно соединение, чтобы код потока был загружен.
+            warmup = Subscriber(1)
+            warmup_task = asyncio.create_task(warmup.listen(client, url))
+            await wait_all([warmup.connected], 10)
+            warmup_task.cancel()
+            await asyncio.sleep(0.5)
+            rss_before = rss_kb(server.pid)
+
+            started = time.perf_counter()
+            listeners = [
+                Subscriber(number % ROOMS + 1)
+                for number in range(subscribers)
+            ]
+            tasks = [
+                asyncio.create_task(listener.listen(client, url))
+                for listener in listeners
+            ]
+            await wait_all(
+                [listener.connected for listener in listeners], 120
+            )
+            connect_time = time.perf_counter() - started
+            await asyncio.sleep(0.5)
+            rss_after = rss_kb(server.pid)
+            async with client.get(f'{url}/metrics') as response:
+                metrics = await response.text()
+            connected = gauge(metrics, 'subscribers')
+            per_connection = (rss_after - rss_before) / subscribers
+            print(f'подписчиков на сервере:      {connected:.0f}'
+                  f' (подключение за {connect_time:.1f} с)')
+            print(f'память сервера:              {rss_before / 1024:.1f}'
+                  f' -> {rss_after / 1024:.1f} МБ')
+            print(f'на одно соединение:          {per_connection:.1f} КБ')
+            assert connected == subscribers, connected
+            assert per_connection <= MAX_KB_PER_CONNECTION, (
+                f'{per_connection:.1f} КБ на соединение,'
+                f' предел {MAX_KB_PER_CONNECTION} КБ'
+            )
+
+            await wait_all(
+                [listener.heartbeat for listener in listeners],
+                heartbeat * 3,
+            )
+            print(f'пульс получили:              {len(listeners)}')
+
+            async with client.post(
+                    f'{url}/auth/jwt/login', data=ADMIN
+            ) as response:
+                token = (await response.json())['access_token']
+            start = datetime.now() + timedelta(days=1)
+            published = time.perf_counter()
+            async with client.post(
+                    f'{url}/reservations/',
+                    json={
+                        'meetingroom_id': 1,
+                        'from_reserve': start.isoformat(),
+                        'to_reserve': (
+                            start + timedelta(hours=1)
+                        ).isoformat(),
+                    },
+                    headers={'Authorization': f'Bearer {token}'},
+            ) as response:
+                response.raise_for_status()
+            room_listeners = [
+                listener for listener in listeners if listener.room_id == 1
+            ]
+            await wait_all(
+                [listener.event for listener in room_listeners], 30
+            )
+            latency = max(
+                listener.created_at for listener in room_listeners
+            ) - published
+            others = sum(
+                listener.event.is_set() for listener in listeners
+                if listener.room_id != 1
+            )
+            print(f'событие получили:            {len(room_listeners)}'
+                  f' подписчиков за {latency * 1000:.1f} мс'
+                  f' (чужих переговорок: {others})')
+            assert others == 0, f'событие получили {others} чужих'
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Отключение клиента сервер замечает не сразу - самое
+            # позднее при следующем «пульсе».
+            deadline = time.perf_counter() + heartbeat * 3 + 5
+            while True:
+                async with client.get(f'{url}/metrics') as response:
+                    left = gauge(await response.text(), 'subscribers')
+                if left == 0 or time.perf_counter() > deadline:
+                    break
+                await asyncio.sleep(0.2)
+            print(f'подписчиков после закрытия:  {left:.0f}')
+            assert left == 0, f'не отписано подписчиков: {left:.0f}'
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    asyncio.run(main(
+        int(arguments[0]) if arguments else 5000,
+        float(arguments[1]) if len(arguments) > 1 else 2,
+    ))
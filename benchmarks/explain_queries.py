@@ -0,0 +1,79 @@
+"""
+Печатает план выполнения (EXPLAIN) «горячих» запросов к таблице reservation,
+чтобы убедиться, что СУБД использует составные индексы.
+
+Запросы не переписываются вручную: скрипт вызывает настоящие методы
+CRUDReservation, перехватывает отправленный в базу SQL и выполняет
+для каждого из них EXPLAIN QUERY PLAN (SQLite) или EXPLAIN (PostgreSQL).
+
+Запуск (база берётся из DATABASE_URL / .env):
+    python -m benchmarks.explain_queries
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from app.core.db import AsyncSessionLocal, engine
+from app.crud.reservation import reservation_crud
+
+
+async def capture_statements() -> list[tuple[str, str, object]]:
+    """Выполняет горячие запросы и возвращает их SQL и параметры."""
+    captured = []
+    label = None
+
+    def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+    ):
+        captured.append((label, statement, parameters))
+
+    now = datetime.now()
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    try:
+        async with AsyncSessionLocal() as session:
+            label = 'get_reservations_at_the_same_time'
+            await reservation_crud.get_reservations_at_the_same_time(
+                from_reserve=now,
+                to_reserve=now + timedelta(hours=1),
+                meetingroom_id=1,
+                session=session,
+            )
+            label = 'get_future_reservations_for_room'
+            await reservation_crud.get_future_reservations_for_room(
+                room_id=1, session=session
+            )
+            label = 'get_by_user'
+            await reservation_crud.get_by_user(
+                user=SimpleNamespace(id=1), session=session
+            )
+    finally:
+        event.remove(
+            engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+        )
+    return captured
+
+
+async def main():
+    captured = await capture_statements()
+    if engine.dialect.name == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        prefix = 'EXPLAIN '
+    async with engine.connect() as conn:
+        for label, statement, parameters in captured:
+            plan = await conn.exec_driver_sql(prefix + statement, parameters)
+            print(f'--- {label}')
+            print(statement.strip())
+            for row in plan:
+                # В SQLite описание шага лежит в последнем столбце.
+                print('   ', row[-1])
+            print()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,217 @@
+"""
+Локальный поддельный сервер Google API для офлайн-проверки отчётов.
+
+Отвечает на запросы, которые делает app/services/google_api.py:
+- документы discovery sheets v4 и drive v3 (rootUrl - адрес этого сервера);
+- выдачу токена сервисного аккаунта (token_uri);
+- создание таблицы, запись значений и выдачу прав.
+Каждый ответ задерживается на latency секунд, как сетевой запрос,
+а счётчик requests показывает, сколько запросов сделал клиент.
+Записанные значения таблиц (values) и выданные права (permissions)
+сохраняются - по ним тесты проверяют содержимое отчёта.
+
+Приложение направляется на сервер настройками:
+    TOKEN_URI=http://127.0.0.1:8765/token
+    GOOGLE_DISCOVERY_URL=http://127.0.0.1:8765/discovery/{api}/{version}
+Запуск отдельно:
+    python -m benchmarks.fake_google [порт] [задержка_мс]
+"""
+import asyncio
+import sys
+from collections import Counter
+from itertools import count
+
+from aiohttp import web
+
+
+def sheets_document(root_url: str) -> dict:
+    return {
+        'kind': 'discovery#restDescription',
+        'name': 'sheets',
+        'version': 'v4',
+        'rootUrl': root_url,
+        'servicePath': '',
+        'batchPath': 'batch',
+        'parameters': {},
+        'schemas': {},
+        'resources': {
+            'spreadsheets': {
+                'methods': {
+                    'create': {
+                        'httpMethod': 'POST',
+                        'path': 'v4/spreadsheets',
+                        'parameters': {},
+                        'parameterOrder': [],
+                    },
+                },
+                'resources': {
+                    'values': {
+                        'methods': {
+                            'update': {
+                                'httpMethod': 'PUT',
+                                'path': (
+                                    'v4/spreadsheets/{spreadsheetId}'
+                                    '/values/{range}'
+                                ),
+                                'parameters': {
+                                    'spreadsheetId': {
+                                        'type': 'string',
+                                        'location': 'path',
+                                        'required': True,
+                                    },
+                                    'range': {
+                                        'type': 'string',
+                                        'location': 'path',
+                                        'required': True,
+                                    },
+                                    'valueInputOption': {
+                                        'type': 'string',
+                                        'location': 'query',
+                                    },
+                                },
+                                'parameterOrder': ['spreadsheetId', 'range'],
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    }
+
+
+def drive_document(root_url: str) -> dict:
+    return {
+        'kind': 'discovery#restDescription',
+        'name': 'drive',
+        'version': 'v3',
+        'rootUrl': root_url,
+        'servicePath': 'drive/v3/',
+        'batchPath': 'batch/drive/v3',
+        'parameters': {},
+        'schemas': {},
+        'resources': {
+            'permissions': {
+                'methods': {
+                    'create': {
+                        'httpMethod': 'POST',
+                        'path': 'files/{fileId}/permissions',
+                        'parameters': {
+                            'fileId': {
+                                'type': 'string',
+                                'location': 'path',
+                                'required': True,
+                            },
+                            'fields': {
+                                'type': 'string',
+                                'location': 'query',
+                            },
+                        },
+                        'parameterOrder': ['fileId'],
+                    },
+                },
+            },
+        },
+    }
+
+
+class FakeGoogle:
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.requests: Counter = Counter()
+        # id таблицы -> строки последней записи значений
+        self.values: dict[str, list[list]] = {}
+        # (id таблицы, тело запроса прав)
+        self.permissions: list[tuple[str, dict]] = []
+        self._ids = count(1)
+        self.runner = None
+        self.url = None
+
+    def reset_counts(self) -> None:
+        self.requests.clear()
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._delay])
+        app.add_routes([
+            web.get('/discovery/{api}/{version}', self.discovery),
+            web.post('/token', self.token),
+            web.post('/v4/spreadsheets', self.create_spreadsheet),
+            web.put(
+                '/v4/spreadsheets/{spreadsheet_id}/values/{range}',
+                self.update_values,
+            ),
+            web.post(
+                '/drive/v3/files/{file_id}/permissions',
+                self.create_permission,
+            ),
+        ])
+        return app
+
+    @web.middleware
+    async def _delay(self, request, handler):
+        self.requests[request.match_info.route.resource.canonical] += 1
+        await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def discovery(self, request):
+        documents = {
+            ('sheets', 'v4'): sheets_document,
+            ('drive', 'v3'): drive_document,
+        }
+        key = (request.match_info['api'], request.match_info['version'])
+        if key not in documents:
+            raise web.HTTPNotFound()
+        return web.json_response(documents[key](f'{self.url}/'))
+
+    async def token(self, request):
+        return web.json_response({
+            'access_token': f'fake-token-{next(self._ids)}',
+            'expires_in': 3600,
+            'token_type': 'Bearer',
+        })
+
+    async def create_spreadsheet(self, request):
+        return web.json_response(
+            {'spreadsheetId': f'spreadsheet-{next(self._ids)}'}
+        )
+
+    async def update_values(self, request):
+        body = await request.json()
+        spreadsheet_id = request.match_info['spreadsheet_id']
+        self.values[spreadsheet_id] = body.get('values', [])
+        return web.json_response({
+            'spreadsheetId': spreadsheet_id,
+            'updatedRows': len(body.get('values', [])),
+        })
+
+    async def create_permission(self, request):
+        self.permissions.append(
+            (request.match_info['file_id'], await request.json())
+        )
+        return web.json_response({'id': f'permission-{next(self._ids)}'})
+
+    async def start(self, port: int = 0) -> str:
+        self.runner = web.AppRunner(self.make_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f'http://127.0.0.1:{port}'
+        return self.url
+
+    async def stop(self) -> None:
+        await self.runner.cleanup()
+
+
+async def main(port: int, latency_ms: float):
+    server = FakeGoogle(latency_ms / 1000)
+    print(f'Поддельный Google API: {await server.start(port)}')
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    asyncio.run(main(
+        int(arguments[0]) if arguments else 8765,
+        float(arguments[1]) if len(arguments) > 1 else 50,
+    ))
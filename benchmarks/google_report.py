@@ -0,0 +1,110 @@
+"""
+Задержка отчёта POST /google/ (от постановки задачи до её завершения)
+с холодным и тёплым клиентом Google.
+
+Google API подменяет локальный сервер benchmarks/fake_google.py
+с искусственной задержкой ответа, сеть не нужна.
+- cold: перед каждым отчётом кэш discovery и токен сбрасываются
+  (google_client.clear()), как было, когда клиент создавался заново;
+- warm: документы discovery и токен переиспользуются.
+Для каждого режима выводится задержка отчёта и число запросов к Google.
+Запуск:
+    python -m benchmarks.google_report [отчётов] [задержка_мс]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from benchmarks._common import free_port, private_key_pem, use_temp_database
+
+PORT = free_port()
+FAKE_URL = f'http://127.0.0.1:{PORT}'
+DIRECTORY = os.path.dirname(use_temp_database('report.db'))
+os.environ.update({
+    'TYPE': 'service_account',
+    'PRIVATE_KEY': private_key_pem(),
+    'CLIENT_EMAIL': 'reports@fake.iam.gserviceaccount.com',
+    'TOKEN_URI': f'{FAKE_URL}/token',
+    'EMAIL': 'owner@example.com',
+    'GOOGLE_DISCOVERY_URL': FAKE_URL + '/discovery/{api}/{version}',
+    'GOOGLE_DISCOVERY_CACHE_DIR': os.path.join(DIRECTORY, 'discovery'),
+})
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.core.google_client import google_client  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom  # noqa: E402
+from app.services.report_jobs import report_jobs  # noqa: E402
+from benchmarks.fake_google import FakeGoogle  # noqa: E402
+
+REPORT_PARAMS = {
+    'from_reserve': '2020-01-01T00:00',
+    'to_reserve': '2040-01-01T00:00',
+}
+
+
+async def run(name, client, headers, fake, reports: int, cold: bool):
+    latencies = []
+    fake.reset_counts()
+    for _ in range(reports):
+        if cold:
+            google_client.clear()
+        started = time.perf_counter()
+        response = await client.post(
+            '/google/', params=REPORT_PARAMS, headers=headers
+        )
+        response.raise_for_status()
+        job = response.json()
+        # Отчёт строится в фоне - ждём завершения задачи.
+        while job['status'] not in ('done', 'failed'):
+            await asyncio.sleep(0.005)
+            job = (await client.get(
+                f'/google/jobs/{job["id"]}', headers=headers
+            )).json()
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert job['status'] == 'done', job['error']
+    upstream = sum(fake.requests.values()) / reports
+    print(f'{name:>5}: отчёт в среднем {statistics.mean(latencies):.1f} мс,'
+          f' медиана {statistics.median(latencies):.1f} мс,'
+          f' запросов к Google на отчёт {upstream:.1f}')
+
+
+async def main(reports: int, latency_ms: float):
+    fake = FakeGoogle(latency_ms / 1000)
+    await fake.start(PORT)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [{'name': 'Room'}])
+    await create_user('admin@example.com', 'adminpassword', True)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+            transport=transport, base_url='http://report'
+    ) as client:
+        response = await client.post('/auth/jwt/login', data={
+            'username': 'admin@example.com', 'password': 'adminpassword'
+        })
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        await run('cold', client, headers, fake, reports, cold=True)
+        await run('warm', client, headers, fake, reports, cold=False)
+    await report_jobs.stop()
+    await google_client.close()
+    await fake.stop()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    asyncio.run(main(
+        int(arguments[0]) if arguments else 20,
+        float(arguments[1]) if len(arguments) > 1 else 50,
+    ))
@@ -0,0 +1,15 @@
+"""
+Нагрузочный прогон API бронирования внутри процесса.
+
+Приложение app.main.app вызывается через ASGI-транспорт httpx
+(pip install httpx) без сети и сервера; база - временный файл SQLite,
+заполненный заданным числом переговорок, пользователей и броней.
+Сценарии выполняются по очереди с фиксированной параллельностью,
+результат - JSON с p50/p95/p99 задержки и запросами в секунду.
+
+При одинаковых параметрах и --seed данные и последовательность запросов
+совпадают, поэтому JSON разных коммитов можно сравнивать.
+Запуск:
+    python -m benchmarks.load --rooms 50 --users 200 --reservations 20000
+    python -m benchmarks.load --scenarios booking_storm mixed -o before.json
+"""
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime
+
+from benchmarks._common import use_temp_database
+
+use_temp_database('load.db')
+
+import httpx  # noqa: E402
+import sqlalchemy  # noqa: E402
+
+from app.core.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.load.runner import run_scenario  # noqa: E402
+from benchmarks.load.scenarios import SCENARIOS  # noqa: E402
+from benchmarks.load.seed import seed  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load')
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--reservations', type=int, default=10000)
+    parser.add_argument(
+        '--requests', type=int, default=500,
+        help='запросов на сценарий'
+    )
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument(
+        '--warmup', type=int, default=20,
+        help='запросов перед замером каждого сценария'
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument(
+        '--scenarios', nargs='+', choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+    )
+    parser.add_argument(
+        '-o', '--output', help='файл для JSON (по умолчанию stdout)'
+    )
+    return parser.parse_args()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args) -> dict:
+    data = await seed(
+        args.rooms, args.users, args.reservations, random.Random(args.seed)
+    )
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+            transport=transport, base_url='http://load'
+    ) as client:
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            if args.warmup:
+                await run_scenario(
+                    scenario, client, data,
+                    args.warmup, args.concurrency, -args.seed,
+                )
+            results[name] = await run_scenario(
+                scenario, client, data,
+                args.requests, args.concurrency, args.seed,
+            )
+            print(
+                f'{name}: {results[name]["rps"]} rps,'
+                f' p95 {results[name]["latency_ms"]["p95"]} мс',
+                file=sys.stderr,
+            )
+    await engine.dispose()
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'params': {
+                key: value for key, value in vars(args).items()
+                if key != 'output'
+            },
+        },
+        'scenarios': results,
+    }
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    report = json.dumps(asyncio.run(main(args)), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
@@ -0,0 +1,73 @@
+"""Выполнение сценария с фиксированной параллельностью и статистика."""
+import asyncio
+import random
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+from benchmarks.load.seed import LoadData
+
+PERCENTILES = (50, 95, 99)
+
+
+async def run_scenario(
+        scenario,
+        client: httpx.AsyncClient,
+        data: LoadData,
+        requests: int,
+        concurrency: int,
+        seed: int,
+) -> dict:
+    """Выполняет requests запросов сценария в concurrency потоков.
+
+    У каждого потока свой генератор случайных чисел, так что
+    последовательность запросов зависит только от seed.
+    """
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker(number: int):
+        rng = random.Random(seed * 1000 + number)
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status = await scenario(client, data, rng)
+            except Exception as error:
+                status = type(error).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, statuses, elapsed)
+
+
+def summarize(latencies: list[float], statuses: Counter, elapsed: float):
+    milliseconds = np.array(latencies) * 1000
+    # Ошибками считаются 5xx и исключения; 4xx (например, 422 при
+    # занятом слоте) - ожидаемые ответы сценария.
+    errors = sum(
+        count for status, count in statuses.items()
+        if not isinstance(status, int) or status >= 500
+    )
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'elapsed_s': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            **{
+                f'p{percentile}': round(float(value), 2)
+                for percentile, value in zip(
+                    PERCENTILES, np.percentile(milliseconds, PERCENTILES)
+                )
+            },
+            'mean': round(float(milliseconds.mean()), 2),
+            'max': round(float(milliseconds.max()), 2),
+        },
+    }
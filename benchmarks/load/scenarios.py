@@ -0,0 +1,99 @@
+"""
+Сценарии нагрузки. Каждый сценарий - корутина, выполняющая один
+запрос и возвращающая его HTTP-статус.
+"""
+import random
+from datetime import timedelta
+
+import httpx
+
+from app.core.db import AsyncSessionLocal
+from app.crud.reservation import reservation_crud
+from benchmarks.load.seed import (
+    MIN_DAYS, SLOT, SLOTS_PER_DAY, LoadData, slot_start
+)
+
+# Слоты завтрашнего дня и дальше: бронировать можно только будущее.
+FIRST_FUTURE_SLOT = (MIN_DAYS // 2 + 1) * SLOTS_PER_DAY
+
+
+async def booking_storm(
+        client: httpx.AsyncClient, data: LoadData, rng: random.Random
+) -> int:
+    """Бронь случайной переговорки на случайный будущий слот.
+
+    Часть слотов уже занята, а сдвиг на 0-20 минут даёт пересечения
+    между запросами самого прогона, поэтому часть ответов - 422.
+    """
+    start = slot_start(rng.randrange(FIRST_FUTURE_SLOT, data.slots))
+    start += timedelta(minutes=rng.choice((0, 10, 20)))
+    response = await client.post(
+        '/reservations/',
+        json={
+            'meetingroom_id': rng.choice(data.room_ids),
+            'from_reserve': start.isoformat(),
+            'to_reserve': (start + SLOT).isoformat(),
+        },
+        headers=rng.choice(data.headers),
+    )
+    return response.status_code
+
+
+async def room_listing(
+        client: httpx.AsyncClient, data: LoadData, rng: random.Random
+) -> int:
+    response = await client.get('/meeting_rooms/')
+    return response.status_code
+
+
+async def my_reservations(
+        client: httpx.AsyncClient, data: LoadData, rng: random.Random
+) -> int:
+    response = await client.get(
+        '/reservations/my_reservations', headers=rng.choice(data.headers)
+    )
+    return response.status_code
+
+
+async def report_aggregation(
+        client: httpx.AsyncClient, data: LoadData, rng: random.Random
+) -> int:
+    """Подсчёт броней по переговоркам за случайную неделю.
+
+    Эндпоинт /google/ дополнительно ходит в Google API, поэтому
+    сценарий измеряет только его обращение к базе.
+    """
+    start = slot_start(rng.randrange(data.slots - 7 * SLOTS_PER_DAY))
+    async with AsyncSessionLocal() as session:
+        await reservation_crud.get_count_res_at_the_same_time(
+            start, start + timedelta(days=7), session
+        )
+    return 200
+
+
+SCENARIOS = {
+    'booking_storm': booking_storm,
+    'room_listing': room_listing,
+    'my_reservations': my_reservations,
+    'report_aggregation': report_aggregation,
+}
+
+# Доли сценариев в смешанной нагрузке: в основном чтение.
+MIX_WEIGHTS = {
+    'booking_storm': 2,
+    'room_listing': 5,
+    'my_reservations': 3,
+    'report_aggregation': 1,
+}
+
+
+async def mixed(
+        client: httpx.AsyncClient, data: LoadData, rng: random.Random
+) -> int:
+    name = rng.choices(
+        list(MIX_WEIGHTS), weights=list(MIX_WEIGHTS.values())
+    )[0]
+    return await SCENARIOS[name](client, data, rng)
+
+
+SCENARIOS['mixed'] = mixed
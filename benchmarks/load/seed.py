@@ -0,0 +1,99 @@
+"""Заполнение временной базы для нагрузочного прогона."""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import insert
+
+from app.core.base import Base
+from app.core.db import engine
+from app.core.user import get_jwt_strategy
+from app.models import MeetingRoom, Reservation, User
+
+PASSWORD = 'loadpassword'
+# Брони раскладываются по сетке получасовых слотов рабочего дня
+# вокруг START: часть в прошлом, часть в будущем.
+START = datetime.now().replace(
+    hour=0, minute=0, second=0, microsecond=0
+) - timedelta(days=30)
+SLOTS_PER_DAY = 20
+# Сетка занимает не меньше двух месяцев: месяц прошлого и месяц будущего.
+MIN_DAYS = 60
+WORK_DAY_START = timedelta(hours=8)
+SLOT = timedelta(minutes=30)
+
+
+def slot_start(slot: int) -> datetime:
+    day, number = divmod(slot, SLOTS_PER_DAY)
+    return START + timedelta(days=day) + WORK_DAY_START + SLOT * number
+
+
+@dataclass
+class LoadData:
+    room_ids: list[int]
+    user_ids: list[int]
+    # Заголовки Authorization по пользователям; первый - суперюзер.
+    headers: list[dict] = field(default_factory=list)
+    # Сколько слотов на переговорку занимает сетка.
+    slots: int = 0
+
+
+async def seed(
+        rooms: int,
+        users: int,
+        reservations: int,
+        rng: random.Random,
+) -> LoadData:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(MeetingRoom),
+            [
+                {'name': f'Room {number}', 'description': 'Нагрузочный тест'}
+                for number in range(1, rooms + 1)
+            ],
+        )
+        # Один хэш пароля на всех: bcrypt на каждого занял бы минуты.
+        hashed_password = PasswordHelper().hash(PASSWORD)
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    'email': f'user{number}@example.com',
+                    'hashed_password': hashed_password,
+                    'is_active': True,
+                    'is_superuser': number == 1,
+                    'is_verified': True,
+                }
+                for number in range(1, users + 1)
+            ],
+        )
+        # Случайные различные слоты сетки: брони не пересекаются.
+        slots = max(reservations // rooms * 2, MIN_DAYS * SLOTS_PER_DAY)
+        taken = rng.sample(
+            range(rooms * slots), min(reservations, rooms * slots)
+        )
+        rows = [
+            {
+                'meetingroom_id': cell % rooms + 1,
+                'from_reserve': slot_start(cell // rooms),
+                'to_reserve': slot_start(cell // rooms) + SLOT
+                - timedelta(seconds=1),
+                'user_id': rng.randint(1, users),
+            }
+            for cell in taken
+        ]
+        for start in range(0, len(rows), 10000):
+            await conn.execute(insert(Reservation), rows[start:start + 10000])
+
+    data = LoadData(
+        room_ids=list(range(1, rooms + 1)),
+        user_ids=list(range(1, users + 1)),
+        slots=slots,
+    )
+    strategy = get_jwt_strategy()
+    for user_id in data.user_ids:
+        token = await strategy.write_token(User(id=user_id))
+        data.headers.append({'Authorization': f'Bearer {token}'})
+    return data
@@ -0,0 +1,104 @@
+"""
+Пропускная способность бронирования с блокировкой по переговоркам
+(app/core/room_locks.py) против одной общей блокировки на процесс.
+
+Каждое бронирование - проверка пересечений и вставка под блокировкой,
+как в эндпоинте create_reservation; задачи распределены по переговоркам.
+База - временный файл SQLite.
+Запуск:
+    python -m benchmarks.room_locks [задач] [броней_на_задачу] [переговорок]
+"""
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from benchmarks._common import use_temp_database
+
+use_temp_database('locks.db')
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.room_locks import RoomLockManager  # noqa: E402
+from app.crud.reservation import reservation_crud  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+from app.schemas.reservation import ReservationCreate  # noqa: E402
+
+START = datetime(2030, 1, 1, 8)
+
+
+class GlobalLock:
+    """Одна блокировка на все переговорки с тем же интерфейсом."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.acquisitions = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @asynccontextmanager
+    async def lock(self, meetingroom_id: int, session=None):
+        if self._lock.locked() and session is not None:
+            await session.commit()
+        started = time.perf_counter()
+        async with self._lock:
+            waited = time.perf_counter() - started
+            self.acquisitions += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            yield
+
+
+def booking(task: int, number: int, rooms: int) -> ReservationCreate:
+    # Задачи одной переговорки бронируют разные непересекающиеся слоты.
+    slot = task // rooms * 1000 + number
+    return ReservationCreate.construct(
+        meetingroom_id=task % rooms + 1,
+        from_reserve=START + timedelta(hours=slot),
+        to_reserve=START + timedelta(hours=slot, minutes=30),
+    )
+
+
+async def run(name, locks, tasks, per_task, rooms):
+    async def worker(task: int):
+        for number in range(per_task):
+            reservation = booking(task, number, rooms)
+            async with AsyncSessionLocal() as session:
+                async with locks.lock(reservation.meetingroom_id, session):
+                    await reservation_crud.get_reservations_at_the_same_time(
+                        **reservation.dict(), session=session
+                    )
+                    await reservation_crud.create(reservation, session)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(task) for task in range(tasks)))
+    elapsed = time.perf_counter() - started
+    total = tasks * per_task
+    print(f'{name:>6}: {total / elapsed:6.0f} броней/с,'
+          f' ожидание блокировки в среднем'
+          f' {locks.wait_total / locks.acquisitions * 1000:.2f} мс,'
+          f' максимум {locks.wait_max * 1000:.2f} мс')
+
+
+async def main(tasks: int, per_task: int, rooms: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(MeetingRoom),
+            [{'name': f'Room {number}'} for number in range(rooms)],
+        )
+    for name, locks in (
+            ('global', GlobalLock()), ('room', RoomLockManager())
+    ):
+        await run(name, locks, tasks, per_task, rooms)
+        async with engine.begin() as conn:
+            await conn.execute(delete(Reservation))
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(arguments or [50, 20, 10])))
@@ -0,0 +1,161 @@
+"""
+Стоимость выдачи большого списка броней (10 000 строк по умолчанию).
+
+База - временный файл SQLite. Для одного и того же набора броней
+сравниваются:
+- orm: ORM-объекты и обычный путь FastAPI - проверка каждого объекта
+  схемой list[ReservationDB] (serialize_response), jsonable_encoder
+  и JSONResponse;
+- orm+orjson: тот же путь, но с ORJSONResponse;
+- rows: кортежи столбцов и dump_rows (app/core/serialization.py).
+Отдельно выводятся выборка из базы и сериализация, тела ответов
+сравниваются как JSON. В конце - весь GET /reservations/my_reservations
+(все брони принадлежат суперюзеру, постраничности у него нет) через
+ASGI-клиент.
+Запуск:
+    python -m benchmarks.serialization [строк] [повторов]
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks._common import use_temp_database
+
+use_temp_database('serialization.db')
+
+import httpx  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.api.endpoints.reservation import RESERVATION_FIELDS  # noqa: E402
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.core.serialization import dump_rows  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+from app.schemas.reservation import ReservationDB  # noqa: E402
+
+ROOMS = 50
+START = datetime(2030, 1, 1, 9)
+ADMIN = {'username': 'admin@example.com', 'password': 'adminpassword'}
+
+
+async def fill(count: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {'name': f'Room {number}'} for number in range(1, ROOMS + 1)
+        ])
+        await conn.execute(insert(Reservation), [
+            {
+                'meetingroom_id': number % ROOMS + 1,
+                # id суперюзера, которого создаёт fill.
+                'user_id': 1,
+                'from_reserve': START + timedelta(hours=number // ROOMS),
+                'to_reserve': START + timedelta(
+                    hours=number // ROOMS, minutes=45
+                ),
+            }
+            for number in range(count)
+        ])
+    await create_user(ADMIN['username'], ADMIN['password'], True)
+
+
+async def fetch_objects(count: int) -> list[Reservation]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Reservation).order_by(Reservation.id).limit(count)
+        )
+        return result.scalars().all()
+
+
+async def fetch_rows(count: int) -> list:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(
+                *(Reservation.__table__.c[key] for key in RESERVATION_FIELDS)
+            ).order_by(Reservation.id).limit(count)
+        )
+        return result.all()
+
+
+async def render_fastapi(objects, field, response_class) -> bytes:
+    content = await serialize_response(field=field, response_content=objects)
+    return response_class(content).body
+
+
+async def timed(repeats: int, function, *arguments):
+    """Медиана времени (мс) и результат последнего вызова."""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await function(*arguments)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), result
+
+
+async def main(count: int, repeats: int):
+    await fill(count)
+    field = create_response_field(
+        name='benchmark_response', type_=list[ReservationDB]
+    )
+
+    async def dump(rows):
+        return dump_rows(rows, RESERVATION_FIELDS)
+
+    fetch_orm, objects = await timed(repeats, fetch_objects, count)
+    fetch_lean, rows = await timed(repeats, fetch_rows, count)
+    orm, orm_body = await timed(
+        repeats, render_fastapi, objects, field, JSONResponse
+    )
+    orm_orjson, orjson_body = await timed(
+        repeats, render_fastapi, objects, field, ORJSONResponse
+    )
+    lean, lean_body = await timed(repeats, dump, rows)
+    same = json.loads(orm_body) == json.loads(orjson_body) == json.loads(
+        lean_body
+    )
+    print(f'строк: {count}, медиана {repeats} повторов, мс')
+    print(f'{"":12}{"выборка":>10}{"сериализация":>15}{"всего":>10}')
+    for name, fetch, serialize in (
+            ('orm', fetch_orm, orm),
+            ('orm+orjson', fetch_orm, orm_orjson),
+            ('rows', fetch_lean, lean),
+    ):
+        print(f'{name:12}{fetch:10.1f}{serialize:15.1f}'
+              f'{fetch + serialize:10.1f}')
+    print(f'ответы совпадают: {same}, размер rows: {len(lean_body)} байт')
+
+    async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        response = await client.post('/auth/jwt/login', data=ADMIN)
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+
+        async def request():
+            response = await client.get(
+                '/reservations/my_reservations', headers=headers
+            )
+            response.raise_for_status()
+            return response.json()
+
+        endpoint, body = await timed(repeats, request)
+    print(f'GET /reservations/my_reservations: {endpoint:.1f} мс'
+          f' ({len(body)} броней)')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    asyncio.run(main(
+        int(arguments[0]) if arguments else 10000,
+        int(arguments[1]) if len(arguments) > 1 else 5,
+    ))
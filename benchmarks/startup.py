@@ -0,0 +1,130 @@
+"""
+Время запуска приложения: импорт app.main и время до первого ответа.
+
+- import: `python -X importtime -c "import app.main"` в отдельном
+  процессе; выводится общее время импорта, самые тяжёлые пакеты
+  и загружен ли при импорте стек Google (aiogoogle, aiohttp);
+- first request: запуск uvicorn и опрос GET /metrics до первого
+  ответа 200. Первый запуск создаёт суперюзера (хэш пароля bcrypt),
+  последующие находят его и стартуют без хэширования.
+База SQLite создаётся во временном каталоге.
+Запуск:
+    python -m benchmarks.startup [запусков]
+"""
+import asyncio
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks._common import free_port, sqlite_url
+
+ADMIN = {'email': 'admin@example.com', 'password': 'adminpassword'}
+# Сколько самых тяжёлых импортов app.main выводить.
+TOP = 8
+GOOGLE_MODULES = ('aiogoogle', 'aiohttp')
+
+
+async def prepare_database(environment: dict) -> None:
+    os.environ.update(environment)
+    from app.core.base import Base
+    from app.core.db import engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+def import_times(environment: dict) -> tuple[dict[str, int], list]:
+    """
+    Накопленное время импорта (мкс) всех модулей и список
+    (модуль, время) модулей, которые импортирует сам app.main.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app.main'],
+        env=environment, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    children = []
+    app_children = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        if match is None:
+            continue
+        microseconds, name = int(match.group(1)), match.group(3)
+        times[name] = microseconds
+        # Каждый уровень вложенности - два пробела отступа, а вложенные
+        # модули выводятся раньше того, кто их импортировал.
+        depth = len(match.group(2)) // 2
+        if depth == 1:
+            children.append((name, microseconds))
+        elif depth == 0:
+            if name == 'app.main':
+                app_children = children
+            children = []
+    return times, app_children
+
+
+def time_to_first_request(environment: dict) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app',
+         '--port', str(port), '--log-level', 'warning'],
+        env=environment,
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(
+                        f'http://127.0.0.1:{port}/metrics', timeout=1
+                ) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+            if server.poll() is not None:
+                raise RuntimeError('uvicorn завершился при старте')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(runs: int):
+    directory = tempfile.mkdtemp()
+    environment = {
+        'DATABASE_URL': sqlite_url(os.path.join(directory, 'startup.db')),
+        'FIRST_SUPERUSER_EMAIL': ADMIN['email'],
+        'FIRST_SUPERUSER_PASSWORD': ADMIN['password'],
+        'ARCHIVE_INTERVAL': '0',
+    }
+    asyncio.run(prepare_database(environment))
+    environment = dict(os.environ, **environment)
+
+    times, app_children = import_times(environment)
+    print(f'импорт app.main:            {times["app.main"] / 1000:.0f} мс')
+    heaviest = sorted(
+        app_children, key=lambda item: item[1], reverse=True
+    )[:TOP]
+    for name, microseconds in heaviest:
+        print(f'  {name:<26}{microseconds / 1000:.0f} мс')
+    loaded = [name for name in GOOGLE_MODULES if name in times] or ['нет']
+    print(f'стек Google при импорте:    {", ".join(loaded)}')
+
+    first = time_to_first_request(environment)
+    print(f'первый ответ, новая база:   {first * 1000:.0f} мс'
+          ' (создание суперюзера)')
+    later = [time_to_first_request(environment) for _ in range(runs)]
+    print(f'первый ответ, повторно:     '
+          f'{statistics.median(later) * 1000:.0f} мс'
+          f' (медиана {runs} запусков)')
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    main(int(arguments[0]) if arguments else 5)
@@ -0,0 +1,104 @@
+"""
+Общие фикстуры тестов.
+
+Приложение работает с временным файлом SQLite (DATABASE_URL задаётся
+до импорта app), запросы идут через ASGI-транспорт httpx. Перед каждым
+тестом схема создаётся заново, а кэши процесса очищаются.
+Бюджеты SQL-запросов включены в строгом режиме: эндпоинт, превысивший
+свой @query_budget, роняет тест с QueryBudgetExceeded.
+Асинхронные тесты помечаются pytest.mark.anyio (плагин anyio).
+Запуск:
+    pytest
+"""
+import os
+from contextlib import asynccontextmanager
+
+from benchmarks._common import use_temp_database
+
+use_temp_database('tests.db')
+os.environ['QUERY_BUDGET_ENABLED'] = '1'
+os.environ['QUERY_BUDGET_STRICT'] = '1'
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.api.endpoints import reservation as reservation_endpoints  # noqa
+from app.core.base import Base  # noqa: E402
+from app.core.conflict_index import conflict_index  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.core.init_db import create_user  # noqa: E402
+from app.core.occupancy import occupancy_grids  # noqa: E402
+from app.core.room_locks import room_locks  # noqa: E402
+from app.core.timeline_cache import timeline_cache  # noqa: E402
+from app.core.user_cache import user_cache  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.meeting_room_cache import meeting_room_cache  # noqa: E402
+
+ADMIN = ('admin@example.com', 'adminpassword')
+USER = ('user@example.com', 'userpassword')
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+async def database():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    conflict_index.clear()
+    occupancy_grids.clear()
+    timeline_cache.clear()
+    user_cache.clear()
+    meeting_room_cache.invalidate()
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(database):
+    async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        yield client
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post(
+        '/auth/jwt/login', data={'username': email, 'password': password}
+    )
+    response.raise_for_status()
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+@pytest.fixture
+async def admin_headers(client):
+    await create_user(*ADMIN, is_superuser=True)
+    return await login(client, *ADMIN)
+
+
+@pytest.fixture
+async def user_headers(client):
+    await create_user(*USER)
+    return await login(client, *USER)
+
+
+@pytest.fixture
+def without_room_lock(monkeypatch):
+    """
+    Отключает блокировку переговорки и предварительную проверку
+    пересечений: запросы одного процесса доходят до базы одновременно.
+    """
+    @asynccontextmanager
+    async def no_lock(meetingroom_id, session=None):
+        yield
+
+    async def no_check(**kwargs):
+        return None
+
+    monkeypatch.setattr(room_locks, 'lock', no_lock)
+    monkeypatch.setattr(
+        reservation_endpoints, 'check_reservation_intersections', no_check
+    )
@@ -0,0 +1,39 @@
+"""
+begin_immediate не фиксирует незавершённые изменения вызывающего.
+"""
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.core.db import AsyncSessionLocal, PendingWritesError, begin_immediate
+from app.models import MeetingRoom
+
+pytestmark = pytest.mark.anyio
+
+
+async def count_rooms() -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(func.count(MeetingRoom.id)))
+
+
+async def test_read_only_transaction_is_closed(database):
+    async with AsyncSessionLocal() as session:
+        await session.execute(select(MeetingRoom.id))
+        await begin_immediate(session)
+        await session.execute(insert(MeetingRoom).values(name='Room'))
+        await session.commit()
+    assert await count_rooms() == 1
+
+
+@pytest.mark.parametrize('orm', (False, True))
+async def test_pending_writes_are_not_committed(database, orm):
+    async with AsyncSessionLocal() as session:
+        if orm:
+            session.add(MeetingRoom(name='Room'))
+        else:
+            await session.execute(insert(MeetingRoom).values(name='Room'))
+        with pytest.raises(PendingWritesError):
+            await begin_immediate(session)
+        await session.rollback()
+        # После rollback транзакцию для записи открыть можно.
+        await begin_immediate(session)
+    assert await count_rooms() == 0
@@ -0,0 +1,103 @@
+"""
+Атомарность бронирования: из параллельных броней на пересекающиеся
+интервалы одной переговорки создаётся ровно одна.
+
+Блокировка переговорки (room_locks) и предварительная проверка
+пересечений выстраивают запросы одного процесса в очередь ещё до базы,
+поэтому здесь они отключены: гарантию должна дать сама запись -
+INSERT ... SELECT ... WHERE NOT EXISTS (SQLite) или ограничение-исключение
+(PostgreSQL). Второй тест гоняет запись из нескольких процессов
+со своими движками, как при нескольких воркерах.
+"""
+import asyncio
+import multiprocessing
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.core.db import AsyncSessionLocal
+from app.models import MeetingRoom, Reservation
+
+pytestmark = pytest.mark.anyio
+
+REQUESTS = 30
+PROCESSES = 4
+START = datetime(2030, 1, 7, 9)
+
+
+def booking(number: int) -> dict:
+    # Все интервалы пересекаются с отрезком 9:30-10:00.
+    shift = timedelta(minutes=number % 30)
+    return {
+        'meetingroom_id': 1,
+        'from_reserve': (START + shift).isoformat(),
+        'to_reserve': (START + timedelta(hours=1) + shift).isoformat(),
+    }
+
+
+async def create_room() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(MeetingRoom).values(name='Room'))
+        await session.commit()
+
+
+async def count_reservations() -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(func.count(Reservation.id)))
+
+
+async def test_only_one_overlapping_booking_wins(
+        client, user_headers, without_room_lock
+):
+    await create_room()
+    responses = await asyncio.gather(*(
+        client.post(
+            '/reservations/', json=booking(number), headers=user_headers
+        )
+        for number in range(REQUESTS)
+    ))
+    statuses = Counter(response.status_code for response in responses)
+    assert statuses == {200: 1, 422: REQUESTS - 1}
+    assert await count_reservations() == 1
+
+
+def book_in_process(number: int, barrier) -> str:
+    """Бронь из отдельного процесса со своим движком и пулом."""
+    from app.core.db import AsyncSessionLocal, engine
+    from app.crud.reservation import (
+        ReservationConflictError, reservation_crud
+    )
+    from app.schemas.reservation import ReservationCreate
+
+    async def book() -> str:
+        barrier.wait()
+        async with AsyncSessionLocal() as session:
+            try:
+                await reservation_crud.create(
+                    ReservationCreate(**booking(number)), session
+                )
+            except ReservationConflictError:
+                return 'conflict'
+        await engine.dispose()
+        return 'created'
+
+    return asyncio.run(book())
+
+
+async def test_only_one_booking_wins_across_processes(database):
+    await create_room()
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Manager().Barrier(PROCESSES)
+    # DATABASE_URL дочерние процессы наследуют из окружения.
+    assert 'DATABASE_URL' in os.environ
+    with context.Pool(PROCESSES) as pool:
+        results = await asyncio.to_thread(
+            pool.starmap,
+            book_in_process,
+            [(number, barrier) for number in range(PROCESSES)],
+        )
+    assert Counter(results) == {'created': 1, 'conflict': PROCESSES - 1}
+    assert await count_reservations() == 1
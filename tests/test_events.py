@@ -0,0 +1,33 @@
+"""
+Шина событий бронирований (app/core/events.py).
+"""
+import asyncio
+
+import pytest
+
+from app.core.events import EventHub
+
+pytestmark = pytest.mark.anyio
+
+
+async def collect(subscription) -> list:
+    return [message async for message in subscription.messages()]
+
+
+async def test_stop_releases_all_subscriptions():
+    hub = EventHub(queue_size=10, heartbeat=3600)
+    subscriptions = [hub.subscribe(room_id) for room_id in (1, 1, 2)]
+    listeners = [
+        asyncio.create_task(collect(subscription))
+        for subscription in subscriptions
+    ]
+    hub.publish(1, 'created', '{}')
+    await asyncio.sleep(0)
+
+    await hub.stop()
+    # Потоки событий завершаются, а не ждут вечно.
+    results = await asyncio.wait_for(asyncio.gather(*listeners), 1)
+    assert results == [[(1, 'created', '{}')], [(1, 'created', '{}')], []]
+    assert hub.stats()['subscribers'] == 0
+    assert hub.stats()['rooms'] == 0
+    assert hub._heartbeat_task is None
@@ -0,0 +1,104 @@
+"""
+Отчёт в Google Таблицах (POST /google/) против поддельного Google API
+benchmarks/fake_google.py: содержимое записанной таблицы и повторное
+использование документов discovery и токена между отчётами.
+"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.google_client import SCOPES, google_client
+from app.services.report_jobs import report_jobs
+from benchmarks._common import private_key_pem
+from benchmarks.fake_google import FakeGoogle
+
+pytestmark = pytest.mark.anyio
+
+REPORT_PARAMS = {
+    'from_reserve': '2030-01-01T00:00',
+    'to_reserve': '2030-12-31T00:00',
+}
+OWNER_EMAIL = 'owner@example.com'
+DISCOVERY = '/discovery/{api}/{version}'
+TOKEN = '/token'
+
+
+@pytest.fixture
+async def fake_google(database, monkeypatch, tmp_path):
+    from aiogoogle.auth.creds import ServiceAccountCreds
+
+    fake = FakeGoogle(latency=0)
+    url = await fake.start()
+    key = private_key_pem()
+    monkeypatch.setattr(google_client, 'creds_factory', lambda: (
+        ServiceAccountCreds(
+            scopes=SCOPES,
+            type='service_account',
+            private_key=key,
+            client_email='reports@fake.iam.gserviceaccount.com',
+            token_uri=f'{url}{TOKEN}',
+        )
+    ))
+    monkeypatch.setattr(google_client, 'cache_dir', tmp_path / 'discovery')
+    monkeypatch.setattr(google_client, '_aiogoogle', None)
+    monkeypatch.setattr(google_client, '_apis', {})
+    monkeypatch.setattr(settings, 'google_discovery_url', url + DISCOVERY)
+    monkeypatch.setattr(settings, 'email', OWNER_EMAIL)
+    yield fake
+    await report_jobs.stop()
+    await google_client.close()
+    await fake.stop()
+
+
+async def make_report(client, headers) -> dict:
+    response = await client.post(
+        '/google/', params=REPORT_PARAMS, headers=headers
+    )
+    assert response.status_code == 202
+    job = response.json()
+    while job['status'] not in ('done', 'failed'):
+        await asyncio.sleep(0.01)
+        job = (await client.get(
+            f'/google/jobs/{job["id"]}', headers=headers
+        )).json()
+    assert job['status'] == 'done', job['error']
+    return job
+
+
+async def test_report_content_and_discovery_cache(
+        client, admin_headers, fake_google
+):
+    response = await client.post(
+        '/meeting_rooms/', json={'name': 'Room'}, headers=admin_headers
+    )
+    room_id = response.json()['id']
+    for start, end in (('09:00', '10:00'), ('11:00', '11:30')):
+        response = await client.post('/reservations/', json={
+            'meetingroom_id': room_id,
+            'from_reserve': f'2030-01-07T{start}',
+            'to_reserve': f'2030-01-07T{end}',
+        }, headers=admin_headers)
+        assert response.status_code == 200
+
+    job = await make_report(client, admin_headers)
+    values = fake_google.values[job['spreadsheet_id']]
+    assert values[0][0] == 'Отчёт от'
+    assert values[1:] == [
+        ['Количество регистраций переговорок'],
+        ['ID переговорки', 'Кол-во бронирований', 'Занято минут'],
+        [str(room_id), '2', '90'],
+    ]
+    assert fake_google.permissions == [(job['spreadsheet_id'], {
+        'type': 'user', 'role': 'writer', 'emailAddress': OWNER_EMAIL,
+    })]
+    # Discovery sheets и drive и токен - по одному запросу.
+    assert fake_google.requests[DISCOVERY] == 2
+    assert fake_google.requests[TOKEN] == 1
+
+    fake_google.reset_counts()
+    second = await make_report(client, admin_headers)
+    assert second['spreadsheet_id'] != job['spreadsheet_id']
+    assert fake_google.requests[DISCOVERY] == 0
+    assert fake_google.requests[TOKEN] == 0
+    assert sum(fake_google.requests.values()) == 3
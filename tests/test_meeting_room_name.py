@@ -0,0 +1,61 @@
+"""
+Повтор имени переговорки распознаётся по ограничению uq_meetingroom_name,
+а не по тексту ошибки.
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.db import AsyncSessionLocal
+from app.crud.meeting_room import is_name_violation
+from app.models import MeetingRoom
+
+pytestmark = pytest.mark.anyio
+
+
+class DriverError(Exception):
+    """Ошибка драйвера с именем ограничения, как у asyncpg."""
+
+    def __init__(self, constraint_name):
+        super().__init__(f'violates constraint "{constraint_name}"')
+        self.constraint_name = constraint_name
+
+
+def adapted(cause: Exception) -> IntegrityError:
+    orig = Exception(str(cause))
+    orig.__cause__ = cause
+    return IntegrityError('INSERT', {}, orig)
+
+
+async def violation(values: dict) -> IntegrityError:
+    async with AsyncSessionLocal() as session:
+        with pytest.raises(IntegrityError) as error:
+            await session.execute(insert(MeetingRoom).values(**values))
+        return error.value
+
+
+async def test_sqlite_errors(database):
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(MeetingRoom).values(name='Room'))
+        await session.commit()
+    assert is_name_violation(await violation({'name': 'Room'}))
+    # NOT NULL по тому же столбцу - не повтор имени.
+    assert not is_name_violation(await violation({'name': None}))
+
+
+def test_postgres_constraint_name():
+    assert is_name_violation(adapted(DriverError('uq_meetingroom_name')))
+    assert not is_name_violation(adapted(DriverError('meetingroom_pkey')))
+    assert not is_name_violation(
+        adapted(DriverError('reservation_no_overlap'))
+    )
+
+
+def test_unrelated_message_mentioning_name():
+    error = IntegrityError(
+        'INSERT', {},
+        sqlite3.IntegrityError('UNIQUE constraint failed: user.username'),
+    )
+    assert not is_name_violation(error)
@@ -0,0 +1,52 @@
+"""
+Удаление переговорки: структуры в памяти (индекс пересечений, кэш
+расписаний) меняются только после commit.
+"""
+from datetime import datetime
+
+import pytest
+
+from app.core.conflict_index import conflict_index
+from app.core.db import AsyncSessionLocal
+from app.core.timeline_cache import timeline_cache
+from app.crud.meeting_room import meeting_room_crud
+
+pytestmark = pytest.mark.anyio
+
+FROM = datetime(2030, 1, 7, 9)
+TO = datetime(2030, 1, 7, 10)
+
+
+@pytest.fixture
+async def reservation(client, admin_headers):
+    response = await client.post(
+        '/meeting_rooms/', json={'name': 'Room'}, headers=admin_headers
+    )
+    room_id = response.json()['id']
+    response = await client.post('/reservations/', json={
+        'meetingroom_id': room_id,
+        'from_reserve': FROM.isoformat(),
+        'to_reserve': TO.isoformat(),
+    }, headers=admin_headers)
+    return room_id, response.json()['id']
+
+
+async def test_failed_commit_keeps_index(reservation, monkeypatch):
+    room_id, reservation_id = reservation
+    version = timeline_cache.version(room_id)
+    async with AsyncSessionLocal() as session:
+        async def failing_commit():
+            raise RuntimeError('commit не удался')
+
+        monkeypatch.setattr(session, 'commit', failing_commit)
+        with pytest.raises(RuntimeError):
+            await meeting_room_crud.remove_by_id(room_id, session)
+    assert conflict_index.overlaps(room_id, FROM, TO) == [reservation_id]
+    assert timeline_cache.version(room_id) == version
+
+
+async def test_committed_removal_updates_index(reservation):
+    room_id, reservation_id = reservation
+    async with AsyncSessionLocal() as session:
+        await meeting_room_crud.remove_by_id(room_id, session)
+    assert conflict_index.overlaps(room_id, FROM, TO) == []
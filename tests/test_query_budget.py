@@ -0,0 +1,36 @@
+"""
+Бюджет SQL-запросов эндпоинта (app/core/query_budget.py): превышение
+в строгом режиме должно ронять тест, а не только попадать в лог.
+"""
+import logging
+
+import pytest
+
+from app.api.endpoints.meeting_room import get_all_meeting_rooms
+from app.core.config import settings
+from app.core.query_budget import QueryBudgetExceeded
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_endpoint_within_budget_passes(client):
+    # Холодный кэш каталога - один запрос при бюджете 1.
+    response = await client.get('/meeting_rooms/')
+    assert response.status_code == 200
+
+
+async def test_exceeded_budget_raises_in_strict_mode(client, monkeypatch):
+    monkeypatch.setattr(get_all_meeting_rooms, 'query_budget', 0)
+    with pytest.raises(QueryBudgetExceeded, match='при бюджете 0'):
+        await client.get('/meeting_rooms/')
+
+
+async def test_exceeded_budget_is_logged_when_not_strict(
+        client, monkeypatch, caplog
+):
+    monkeypatch.setattr(get_all_meeting_rooms, 'query_budget', 0)
+    monkeypatch.setattr(settings, 'query_budget_strict', False)
+    with caplog.at_level(logging.ERROR, logger='app.core.query_budget'):
+        response = await client.get('/meeting_rooms/')
+    assert response.status_code == 200
+    assert 'при бюджете 0' in caplog.text
@@ -0,0 +1,63 @@
+"""
+Фоновые задачи отчёта (app/services/report_jobs.py): срок хранения
+и отложенные повторы. Google не нужен - build_report подменён.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from cachetools import TTLCache
+
+from app.schemas.report_job import ReportJobStatus
+from app.services import report_jobs as report_jobs_module
+from app.services.report_jobs import ReportJobs
+
+pytestmark = pytest.mark.anyio
+
+TTL = 60
+
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+
+@pytest.fixture
+def jobs(clock, monkeypatch):
+    async def failing(job):
+        raise ConnectionError('Google недоступен')
+
+    monkeypatch.setattr(report_jobs_module, 'build_report', failing)
+    jobs = ReportJobs(workers=1, attempts=3, retry_delay=3600)
+    jobs._jobs = TTLCache(maxsize=100, ttl=TTL, timer=lambda: clock[0])
+    return jobs
+
+
+async def wait_for_retry(jobs, job) -> None:
+    while job.id not in jobs._retries:
+        await asyncio.sleep(0)
+
+
+async def test_job_waiting_for_retry_outlives_ttl(jobs, clock):
+    job = jobs.submit(datetime(2030, 1, 1), datetime(2030, 2, 1))
+    await wait_for_retry(jobs, job)
+    clock[0] += TTL * 10
+    assert jobs.get(job.id) is job
+    assert job.status == ReportJobStatus.queued
+    await jobs.stop()
+
+
+async def test_stop_cancels_pending_retries(jobs):
+    job = jobs.submit(datetime(2030, 1, 1), datetime(2030, 2, 1))
+    await wait_for_retry(jobs, job)
+    handle = jobs._retries[job.id]
+    await jobs.stop()
+    assert handle.cancelled()
+    assert not jobs._retries
+    assert job.status == ReportJobStatus.failed
+    assert job.attempts == 1
+    # Завершённая задача доступна по id, а тот же период - новая задача.
+    assert jobs.get(job.id) is job
+    again = jobs.submit(job.from_reserve, job.to_reserve)
+    assert again is not job
+    await jobs.stop()
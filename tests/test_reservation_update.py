@@ -0,0 +1,55 @@
+"""
+Изменение брони: параллельные PATCH одной брони оставляют счётчики
+room_daily_stats согласованными с итоговой бронью.
+"""
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+from app.core.db import AsyncSessionLocal
+from app.crud.room_daily_stats import room_daily_stats_crud
+
+pytestmark = pytest.mark.anyio
+
+REQUESTS = 10
+DAY = date(2030, 1, 7)
+
+
+async def test_concurrent_updates_keep_stats(
+        client, admin_headers, without_room_lock
+):
+    response = await client.post(
+        '/meeting_rooms/', json={'name': 'Room'}, headers=admin_headers
+    )
+    room_id = response.json()['id']
+    response = await client.post('/reservations/', json={
+        'meetingroom_id': room_id,
+        'from_reserve': f'{DAY}T08:00',
+        'to_reserve': f'{DAY}T08:30',
+    }, headers=admin_headers)
+    reservation_id = response.json()['id']
+
+    # Каждый PATCH - своей длительности: 10, 20, ... минут.
+    responses = await asyncio.gather(*(
+        client.patch(f'/reservations/{reservation_id}', json={
+            'from_reserve': f'{DAY}T09:00',
+            'to_reserve': f'{DAY}T{9 + minutes // 60:02}:{minutes % 60:02}',
+        }, headers=admin_headers)
+        for minutes in range(10, 10 * (REQUESTS + 1), 10)
+    ))
+    assert {response.status_code for response in responses} == {200}
+
+    final = (await client.get(
+        '/reservations/my_reservations', headers=admin_headers
+    )).json()
+    assert len(final) == 1
+    duration = (
+        datetime.fromisoformat(final[0]['to_reserve'])
+        - datetime.fromisoformat(final[0]['from_reserve'])
+    )
+    minutes = duration.seconds // 60
+    async with AsyncSessionLocal() as session:
+        totals = await room_daily_stats_crud.get_totals(DAY, DAY, session)
+    assert [tuple(row) for row in totals] == [(room_id, 1, minutes)]
+
@@ -0,0 +1,52 @@
+"""
+Расписание переговорки GET /meeting_rooms/{id}/reservations.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def room_id(client, admin_headers):
+    response = await client.post(
+        '/meeting_rooms/', json={'name': 'Room'}, headers=admin_headers
+    )
+    room_id = response.json()['id']
+    response = await client.post('/reservations/', json={
+        'meetingroom_id': room_id,
+        'from_reserve': '2030-01-07T09:00',
+        'to_reserve': '2030-01-07T10:00',
+    }, headers=admin_headers)
+    assert response.status_code == 200
+    return room_id
+
+
+async def test_without_window_returns_all_future_reservations(
+        client, room_id
+):
+    response = await client.get(f'/meeting_rooms/{room_id}/reservations')
+    assert response.status_code == 200
+    assert [item['from_reserve'] for item in response.json()] == [
+        '2030-01-07T09:00:00'
+    ]
+    response = await client.get(
+        f'/meeting_rooms/{room_id}/reservations',
+        params={'from': '2030-01-07T09:30'},
+    )
+    assert len(response.json()) == 1
+
+
+async def test_window_limits_reservations(client, room_id):
+    url = f'/meeting_rooms/{room_id}/reservations'
+    inside = await client.get(
+        url, params={'from': '2030-01-07T00:00', 'to': '2030-01-08T00:00'}
+    )
+    assert len(inside.json()) == 1
+    outside = await client.get(
+        url, params={'from': '2030-01-08T00:00', 'to': '2030-01-09T00:00'}
+    )
+    assert outside.json() == []
+    too_long = await client.get(
+        url, params={'from': '2030-01-01T00:00', 'to': '2030-03-01T00:00'}
+    )
+    assert too_long.status_code == 422